@@ -0,0 +1,451 @@
+## @package ATNF
+# A module used to maintain a binary columnar cache of the ATNF pulsar
+# catalog database file.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     ATNF Catalog Cache Version 1.0                     |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Maintains a compiled, binary columnar copy of the values extracted     |
+    | from an ATNF pulsar catalog database file by ATNFDataExtractor.py. The |
+    | cache is a numpy structured array saved in .npy format, which can be   |
+    | memory mapped by later pipeline stages instead of re-parsing text.     |
+    |                                                                        |
+    | The cache file is keyed by the SHA-1 hash of the catalog file and the  |
+    | version of the catalog parser. If either changes, the cache is rebuilt |
+    | automatically the next time it is loaded.                              |
+    |                                                                        |
+    | Requires numpy. Building the cache also requires pyephem and astropy.  |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (string) full path to a ATNF pulsar catalog database file.          |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -c (string) full path to the directory to store the cache in. By       |
+    |             default the directory containing the catalog file is used. |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys, datetime, hashlib
+
+from ParserVersion import PARSER_VERSION
+
+# Numpy Imports:
+from numpy import load
+from numpy import save
+from numpy import zeros
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## ATNF Catalog Cache Version 1.0
+#
+# Maintains a compiled, binary columnar copy of the values extracted
+# from an ATNF pulsar catalog database file by ATNFDataExtractor.py. The
+# cache is a numpy structured array saved in .npy format, which can be
+# memory mapped by later pipeline stages instead of re-parsing text.
+#
+# The cache file is keyed by the SHA-1 hash of the catalog file and the
+# version of the catalog parser. If either changes, the cache is rebuilt
+# automatically the next time it is loaded. The cache file is named:
+#
+# <catalog file name>.<SHA-1 prefix>.v<parser version>.npy
+#
+# and contains one row per catalog entry, with the columns:
+#
+# PSRJ, RAJ, DECJ (strings) and GL, GB, P0, F0, DM, W10, W50 (float64).
+#
+# Requires numpy. Building the cache also requires pyephem and astropy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -p (string) full path to a ATNF pulsar catalog database file.
+#
+# Optional Command Line Arguments:
+#
+# -c (string) full path to the directory to store the cache in. By
+#             default the directory containing the catalog file is used.
+#
+# -v (boolean) verbose debugging flag.
+#
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class CatalogCache:
+    """
+    Description:
+
+    Maintains a compiled, binary columnar copy of the values extracted
+    from an ATNF pulsar catalog database file by ATNFDataExtractor.py. The
+    cache is a numpy structured array saved in .npy format, which can be
+    memory mapped by later pipeline stages instead of re-parsing text.
+
+    The cache file is keyed by the SHA-1 hash of the catalog file and the
+    version of the catalog parser. If either changes, the cache is rebuilt
+    automatically the next time it is loaded. The cache file is named:
+
+    <catalog file name>.<SHA-1 prefix>.v<parser version>.npy
+
+    and contains one row per catalog entry, with the columns:
+
+    PSRJ, RAJ, DECJ (strings) and GL, GB, P0, F0, DM, W10, W50 (float64).
+
+    Examples
+    --------
+
+    >>> catalog = CatalogCache("/Users/rob/psrcat.db").load()
+    >>> print catalog["PSRJ"][0], catalog["P0"][0]
+    J0006+1834 0.69374767047
+    """
+
+    ## The columns stored in the cache, and their numpy types. The string
+    # columns are sized to their longest value when the cache is built.
+    columns = [("PSRJ","S"),("RAJ","S"),("DECJ","S"),("GL","f8"),("GB","f8"),
+               ("P0","f8"),("F0","f8"),("DM","f8"),("W10","f8"),("W50","f8")]
+
+    ## Creates a new cache object for the specified catalog file.
+    #
+    #  @param self The object pointer.
+    #  @param catalogPath The full path to the ATNF pulsar catalog database file.
+    #  @param cacheDir The directory to store the cache in (optional). By default
+    #   the directory containing the catalog file is used.
+    #  @param verbose The verbose debugging flag.
+    def __init__(self,catalogPath="",cacheDir=None,verbose=False):
+        """
+        Creates a new cache object for the specified catalog file.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        catalogPath : str
+            The full path to the ATNF pulsar catalog database file.
+        cacheDir : str
+            The directory to store the cache in (optional). By default the
+            directory containing the catalog file is used.
+        verbose : bool
+            The verbose debugging flag.
+
+        """
+        self.catalogPath = catalogPath
+        self.verbose     = verbose
+
+        if(cacheDir):
+            self.cacheDir = cacheDir
+        else:
+            self.cacheDir = os.path.dirname(os.path.abspath(catalogPath))
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and builds the cache, if it is missing or out of date.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and builds the cache, if it is missing or out of date.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-p", action="store", dest="atnfPath",help='Path to a pulsar catalog file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-c", action="store", dest="cacheDir",help='Path to the directory to store the cache in (optional).',default="")
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.__init__(args.atnfPath,args.cacheDir,args.verbose)
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",self.verbose
+        print "\tPulsar catalog file path:",self.catalogPath
+        print "\tCache directory:",self.cacheDir
+
+        if(os.path.isfile(self.catalogPath) == False):
+            print "\n\tCatalog file not found at: ", self.catalogPath
+            print "\tYou must supply a valid catalog file via the -p flag."
+            print "\tExiting..."
+            sys.exit()
+
+        start = datetime.datetime.now()
+        catalog = self.load()
+        end = datetime.datetime.now()
+
+        print "\n\tCache file:", self.cachePath()
+        print "\tCatalog entries cached:", len(catalog)
+        print "\tExecution time: ", str(end - start)
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Loads the cached catalog, building the cache first if it is missing or out of date.
+    #
+    #  @param self The object pointer.
+    #  @param mmap If True the cache is memory mapped read-only, else it is read into memory.
+    #  @returns the catalog as a numpy structured array, one row per catalog entry.
+    def load(self,mmap=True):
+        """
+        Loads the cached catalog, building the cache first if it is missing or
+        out of date, i.e. if the catalog file or parser version have changed
+        since the cache was created.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        mmap : bool
+            If True the cache is memory mapped read-only, else it is read into memory.
+
+        Returns
+        -------
+        numpy.ndarray
+            The catalog as a numpy structured array, one row per catalog entry.
+
+        """
+        path = self.cachePath()
+
+        if(os.path.isfile(path) == False):
+            if(self.verbose):
+                print "\tCatalog cache missing or out of date, rebuilding: ", path
+            self.build(path)
+
+        if(mmap):
+            return load(path,mmap_mode='r')
+        else:
+            return load(path)
+
+    # ****************************************************************************************************
+
+    ## Builds the cache file, replacing any stale cache files for the same catalog.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the cache file to create.
+    def build(self,path):
+        """
+        Builds the cache file by extracting the catalog with ATNFDataExtractor,
+        replacing any stale cache files for the same catalog. The file is written
+        to a temporary path and renamed into place, so readers never observe a
+        partially written cache. The string columns are sized to their longest
+        value, so no value is truncated.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the cache file to create.
+
+        """
+
+        # Imported here so that loading an existing cache does not require
+        # pyephem or astropy.
+        from ATNFDataExtractor import ATNFDataExtractor
+
+        records = list(ATNFDataExtractor().iterBatchedRecords(self.catalogPath))
+
+        columns = []
+        for name, columnType in self.columns:
+            if(columnType.startswith("S")):
+                columnType = "S" + str(max([len(record[name]) for record in records] + [1]))
+            columns.append((name,columnType))
+
+        catalog = zeros(len(records),dtype=columns)
+
+        for name, columnType in self.columns:
+            if(columnType.startswith("S")):
+                catalog[name] = [record[name] for record in records]
+            else:
+                catalog[name] = [float(record[name]) for record in records]
+
+        if(os.path.exists(self.cacheDir) == False):
+            os.makedirs(self.cacheDir)
+
+        temporaryPath = path + "." + str(os.getpid()) + ".tmp"
+        temporaryFile = open(temporaryPath,'wb')
+        try:
+            save(temporaryFile,catalog)
+        finally:
+            temporaryFile.close()
+
+        os.rename(temporaryPath,path)
+
+        # Remove caches built from previous versions of the catalog or parser.
+        prefix = os.path.basename(self.catalogPath) + "."
+        for filename in os.listdir(self.cacheDir):
+            stalePath = os.path.join(self.cacheDir,filename)
+            if(filename.startswith(prefix) and filename.endswith(".npy") and stalePath != path):
+                os.remove(stalePath)
+
+    # ****************************************************************************************************
+
+    ## Gets the full path to the cache file for the current catalog file and parser version.
+    #
+    #  @param self The object pointer.
+    #  @returns the full path to the cache file.
+    def cachePath(self):
+        """
+        Gets the full path to the cache file for the current catalog file and
+        parser version, i.e.
+
+        <cache dir>/<catalog file name>.<SHA-1 prefix>.v<parser version>.npy
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The full path to the cache file.
+
+        """
+
+        digest = self.hashFile(self.catalogPath)[:16]
+        name = os.path.basename(self.catalogPath) + "." + digest + ".v" + str(self.parserVersion()) + ".npy"
+        return os.path.join(self.cacheDir,name)
+
+    # ****************************************************************************************************
+
+    ## Gets the version of the catalog parser in ATNFDataExtractor.py.
+    #
+    #  @param self The object pointer.
+    #  @returns the parser version, as a string.
+    def parserVersion(self):
+        """
+        Gets the version of the catalog parser in ATNFDataExtractor.py. The
+        version is held in ParserVersion.py, which has no dependencies, so
+        that checking whether the cache is up to date does not require pyephem
+        or astropy to be imported.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The parser version.
+
+        """
+        return str(PARSER_VERSION)
+
+    # ****************************************************************************************************
+
+    ## Computes the SHA-1 hash of a file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the file to hash.
+    #  @returns the hexadecimal SHA-1 digest of the file contents.
+    def hashFile(self,path):
+        """
+        Computes the SHA-1 hash of a file, reading it in 1 MB blocks.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the file to hash.
+
+        Returns
+        -------
+        str
+            The hexadecimal SHA-1 digest of the file contents.
+
+        """
+        digest = hashlib.sha1()
+        sourceFile = open(path,'rb')
+
+        try:
+            block = sourceFile.read(1048576)
+            while block:
+                digest.update(block)
+                block = sourceFile.read(1048576)
+        finally:
+            sourceFile.close()
+
+        return digest.hexdigest()
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    CatalogCache().main()
@@ -0,0 +1,677 @@
+## @package ATNF
+# A module used to select entries from the ATNF pulsar catalog, via
+# in-memory indexes over the extracted catalog values.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     ATNF Catalog Query Version 1.0                     |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Selects entries from the ATNF pulsar catalog using in-memory indexes   |
+    | built over the values extracted by ATNFDataExtractor.py. Supports      |
+    | lookups by pulsar name, range queries on period, DM and W50, and cone  |
+    | queries in galactic coordinates. Matching entries are printed in the   |
+    | same CSV format as the parsed catalog file.                            |
+    |                                                                        |
+    | Requires numpy and scipy.                                              |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (string) full path to a ATNF pulsar catalog database file (loaded   |
+    |             via the catalog cache, see CatalogCache.py), or to a       |
+    |             parsed catalog file created by ATNFDataExtractor.py.       |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | --name (string) the name of a single pulsar to select, e.g. J0437-4715.|
+    |                                                                        |
+    | --p0range (string) the period range to select in seconds, given as     |
+    |             <min>:<max>, e.g. 0.001:0.03 for millisecond pulsars.      |
+    |                                                                        |
+    | --dmrange (string) the DM range to select, given as <min>:<max>.       |
+    |                                                                        |
+    | --w50range (string) the W50 range to select in ms, as <min>:<max>.     |
+    |                                                                        |
+    | --cone (string) the sky region to select, given as <GL>:<GB>:<radius>  |
+    |             in degrees, e.g. 30:0:5.                                   |
+    |                                                                        |
+    |             If several criteria are given, only entries meeting all of |
+    |             them are selected.                                         |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys, datetime
+
+# Numpy Imports:
+from numpy import arange
+from numpy import argsort
+from numpy import array
+from numpy import cos
+from numpy import intersect1d
+from numpy import radians
+from numpy import sin
+from numpy import sort
+from numpy import zeros
+
+# Scipy Imports:
+from scipy.spatial import cKDTree
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## ATNF Catalog Query Version 1.0
+#
+# Selects entries from the ATNF pulsar catalog using in-memory indexes
+# built over the values extracted by ATNFDataExtractor.py. Three kinds
+# of index are built when the catalog is loaded:
+#
+# 1. a hash index mapping each pulsar name to its row in the catalog.
+# 2. sorted indexes on period (P0), DM and W50, answered by binary search.
+# 3. a KD-tree over the galactic coordinates (GL, GB) of each entry,
+#    converted to unit vectors so that cone queries are exact on the sphere.
+#
+# Queries return the row numbers of the matching entries, in catalog order.
+#
+# Requires numpy and scipy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -p (string) full path to a ATNF pulsar catalog database file (loaded
+#             via the catalog cache, see CatalogCache.py), or to a
+#             parsed catalog file created by ATNFDataExtractor.py.
+#
+# Optional Command Line Arguments:
+#
+# -v (boolean) verbose debugging flag.
+#
+# --name (string) the name of a single pulsar to select, e.g. J0437-4715.
+#
+# --p0range (string) the period range to select in seconds, given as
+#             <min>:<max>, e.g. 0.001:0.03 for millisecond pulsars.
+#
+# --dmrange (string) the DM range to select, given as <min>:<max>.
+#
+# --w50range (string) the W50 range to select in ms, as <min>:<max>.
+#
+# --cone (string) the sky region to select, given as <GL>:<GB>:<radius>
+#             in degrees, e.g. 30:0:5.
+#
+#             If several criteria are given, only entries meeting all of
+#             them are selected.
+#
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class CatalogQuery:
+    """
+    Description:
+
+    Selects entries from the ATNF pulsar catalog using in-memory indexes
+    built over the values extracted by ATNFDataExtractor.py. Three kinds
+    of index are built when the catalog is loaded:
+
+    1. a hash index mapping each pulsar name to its row in the catalog.
+    2. sorted indexes on period (P0), DM and W50, answered by binary search.
+    3. a KD-tree over the galactic coordinates (GL, GB) of each entry,
+       converted to unit vectors so that cone queries are exact on the sphere.
+
+    Queries return the row numbers of the matching entries, in catalog order.
+
+    Examples
+    --------
+
+    >>> query = CatalogQuery("/Users/rob/psrcat.db")
+    >>> rows = query.select(dmRange=[50,500],cone=[30,0,5])
+    >>> print query.names(rows)[0:3]
+    ['J1829+0000', 'J1830-0052', 'J1830-0131']
+    """
+
+    ## The columns with sorted indexes, which support range queries.
+    rangeColumns = ["P0","DM","W50"]
+
+    ## Creates a new query object, loading the catalog and building its indexes.
+    #
+    #  @param self The object pointer.
+    #  @param catalogPath The full path to a ATNF pulsar catalog database file,
+    #   or to a parsed catalog file created by ATNFDataExtractor.py (optional).
+    #  @param verbose The verbose debugging flag.
+    def __init__(self,catalogPath="",verbose=False):
+        """
+        Creates a new query object, loading the catalog and building its indexes.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        catalogPath : str
+            The full path to a ATNF pulsar catalog database file, or to a parsed
+            catalog file created by ATNFDataExtractor.py (optional).
+        verbose : bool
+            The verbose debugging flag.
+
+        """
+        self.catalogPath = catalogPath
+        self.verbose     = verbose
+
+        if(catalogPath):
+            self.setCatalog(self.loadCatalog(catalogPath))
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and prints the catalog entries matching the query.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and prints the catalog entries matching the query.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-p", action="store", dest="atnfPath",help='Path to a pulsar catalog file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--name", action="store", dest="name",help='The name of the pulsar to select (optional).',default="")
+        parser.add_option("--p0range", action="store", dest="p0Range",help='The period range to select, <min>:<max> (optional).',default="")
+        parser.add_option("--dmrange", action="store", dest="dmRange",help='The DM range to select, <min>:<max> (optional).',default="")
+        parser.add_option("--w50range", action="store", dest="w50Range",help='The W50 range to select, <min>:<max> (optional).',default="")
+        parser.add_option("--cone", action="store", dest="cone",help='The sky region to select, <GL>:<GB>:<radius> (optional).',default="")
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",args.verbose
+        print "\tPulsar catalog file path:",args.atnfPath
+        print "\tName:",args.name
+        print "\tPeriod range:",args.p0Range
+        print "\tDM range:",args.dmRange
+        print "\tW50 range:",args.w50Range
+        print "\tCone:",args.cone
+
+        if(os.path.isfile(args.atnfPath) == False):
+            print "\n\tCatalog file not found at: ", args.atnfPath
+            print "\tYou must supply a valid catalog file via the -p flag."
+            print "\tExiting..."
+            sys.exit()
+
+        try:
+            p0Range  = self.parseBounds(args.p0Range,2)
+            dmRange  = self.parseBounds(args.dmRange,2)
+            w50Range = self.parseBounds(args.w50Range,2)
+            cone     = self.parseBounds(args.cone,3)
+        except ValueError as e:
+            print "\tError parsing query parameters:", e
+            print "\tExiting..."
+            sys.exit()
+
+        start = datetime.datetime.now()
+        self.__init__(args.atnfPath,args.verbose)
+        indexed = datetime.datetime.now()
+
+        if(args.name):
+            row = self.byName(args.name)
+            rows = [] if row is None else [row]
+        else:
+            rows = self.select(p0Range,dmRange,w50Range,cone)
+
+        end = datetime.datetime.now()
+
+        print "\n\tName,RA,DEC,GL,GB,Period (s),Frequency (Hz),DM,W10 (ms),W50 (ms)"
+        for row in rows:
+            print "\t" + self.formatRow(row)
+
+        print "\n\tCatalog entries loaded:", len(self.catalog)
+        print "\tCatalog entries selected:", len(rows)
+        print "\tIndex build time: ", str(indexed - start)
+        print "\tQuery time: ", str(end - indexed)
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Loads the catalog values from a catalog database file or a parsed catalog file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to a ATNF pulsar catalog database file, or to a
+    #   parsed catalog file created by ATNFDataExtractor.py.
+    #  @returns the catalog as a numpy structured array, one row per catalog entry.
+    def loadCatalog(self,path):
+        """
+        Loads the catalog values from a catalog database file or a parsed catalog
+        file. Parsed catalog files are recognised by their CSV header, while
+        catalog database files are loaded via the binary catalog cache (see
+        CatalogCache.py). In both cases the returned array has the columns
+        listed in CatalogCache.columns.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to a ATNF pulsar catalog database file, or to a parsed
+            catalog file created by ATNFDataExtractor.py.
+
+        Returns
+        -------
+        numpy.ndarray
+            The catalog as a numpy structured array, one row per catalog entry.
+
+        """
+
+        # Imported here as the catalog cache lives alongside this script both
+        # in the repository and when deployed.
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from CatalogCache import CatalogCache
+
+        sourceFile = open(path,'r')
+
+        try:
+            header = sourceFile.readline()
+
+            if(header.startswith("Name,") == False):
+                return CatalogCache(path,verbose=self.verbose).load()
+
+            rows = [line.rstrip('\n').split(",") for line in sourceFile if line.strip()]
+        finally:
+            sourceFile.close()
+
+        catalog = zeros(len(rows),dtype=CatalogCache.columns)
+
+        for index, (name, columnType) in enumerate(CatalogCache.columns):
+            if(columnType.startswith("S")):
+                catalog[name] = [row[index] for row in rows]
+            else:
+                catalog[name] = [float(row[index]) for row in rows]
+
+        return catalog
+
+    # ****************************************************************************************************
+
+    ## Sets the catalog to query, and builds its indexes.
+    #
+    #  @param self The object pointer.
+    #  @param catalog The catalog as a numpy structured array, as returned by loadCatalog().
+    def setCatalog(self,catalog):
+        """
+        Sets the catalog to query, and builds its indexes.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        catalog : numpy.ndarray
+            The catalog as a numpy structured array, as returned by loadCatalog().
+
+        """
+        self.catalog = catalog
+
+        # Hash index by name. If a name appears more than once, the first entry is kept.
+        self.nameIndex = {}
+        for row, name in enumerate(catalog["PSRJ"].tolist()):
+            self.nameIndex.setdefault(name,row)
+
+        # Sorted indexes, stored as the row order and the sorted values.
+        self.sortedIndexes = {}
+        for column in self.rangeColumns:
+            order = argsort(catalog[column],kind='mergesort')
+            self.sortedIndexes[column] = (order,catalog[column][order])
+
+        # Spatial index over unit vectors, so that angular distance on the
+        # sky maps monotonically onto euclidean (chord) distance.
+        self.tree = cKDTree(self.unitVectors(catalog["GL"],catalog["GB"]))
+
+    # ****************************************************************************************************
+
+    ## Finds the catalog row of the pulsar with the specified name.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the pulsar, e.g. J0437-4715.
+    #  @returns the row number of the pulsar, or None if it is not in the catalog.
+    def byName(self,name):
+        """
+        Finds the catalog row of the pulsar with the specified name.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the pulsar, e.g. J0437-4715.
+
+        Returns
+        -------
+        int
+            The row number of the pulsar, or None if it is not in the catalog.
+
+        """
+        return self.nameIndex.get(name)
+
+    # ****************************************************************************************************
+
+    ## Finds the catalog rows with values of a column within a closed range.
+    #
+    #  @param self The object pointer.
+    #  @param column The column to query, one of rangeColumns.
+    #  @param low The lower bound of the range (inclusive).
+    #  @param high The upper bound of the range (inclusive).
+    #  @returns a numpy array containing the matching row numbers, in catalog order.
+    def rangeQuery(self,column,low,high):
+        """
+        Finds the catalog rows with values of a column within a closed range,
+        using binary search over the sorted index of the column.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        column : str
+            The column to query, one of rangeColumns.
+        low : float
+            The lower bound of the range (inclusive).
+        high : float
+            The upper bound of the range (inclusive).
+
+        Returns
+        -------
+        numpy.ndarray
+            The matching row numbers, in catalog order.
+
+        Examples
+        --------
+
+        >>> print len(rangeQuery("DM",50,500))
+        1676
+
+        """
+        order, values = self.sortedIndexes[column]
+        first = values.searchsorted(low,side='left')
+        last  = values.searchsorted(high,side='right')
+        return sort(order[first:last])
+
+    # ****************************************************************************************************
+
+    ## Finds the catalog rows within a cone on the sky, in galactic coordinates.
+    #
+    #  @param self The object pointer.
+    #  @param gl The galactic longitude of the centre of the cone (degrees).
+    #  @param gb The galactic latitude of the centre of the cone (degrees).
+    #  @param radius The radius of the cone (degrees).
+    #  @returns a numpy array containing the matching row numbers, in catalog order.
+    def coneQuery(self,gl,gb,radius):
+        """
+        Finds the catalog rows within a cone on the sky, in galactic coordinates.
+        The radius is converted to the chord length between unit vectors, which
+        is used to query the KD-tree.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        gl : float
+            The galactic longitude of the centre of the cone (degrees).
+        gb : float
+            The galactic latitude of the centre of the cone (degrees).
+        radius : float
+            The radius of the cone (degrees).
+
+        Returns
+        -------
+        numpy.ndarray
+            The matching row numbers, in catalog order.
+
+        """
+        centre = self.unitVectors(array([gl]),array([gb]))[0]
+        chord = 2.0 * sin(radians(min(radius,180.0)) / 2.0)
+        return sort(array(self.tree.query_ball_point(centre,chord),dtype=int))
+
+    # ****************************************************************************************************
+
+    ## Finds the catalog rows meeting all of the supplied criteria.
+    #
+    #  @param self The object pointer.
+    #  @param p0Range The [min, max] period range in seconds, or None.
+    #  @param dmRange The [min, max] DM range, or None.
+    #  @param w50Range The [min, max] W50 range in ms, or None.
+    #  @param cone The [GL, GB, radius] of a sky region in degrees, or None.
+    #  @returns a numpy array containing the matching row numbers, in catalog order.
+    def select(self,p0Range=None,dmRange=None,w50Range=None,cone=None):
+        """
+        Finds the catalog rows meeting all of the supplied criteria. Criteria
+        set to None are ignored. If no criteria are supplied, every row is
+        selected.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        p0Range : list
+            The [min, max] period range in seconds, or None.
+        dmRange : list
+            The [min, max] DM range, or None.
+        w50Range : list
+            The [min, max] W50 range in ms, or None.
+        cone : list
+            The [GL, GB, radius] of a sky region in degrees, or None.
+
+        Returns
+        -------
+        numpy.ndarray
+            The matching row numbers, in catalog order.
+
+        """
+        rows = arange(len(self.catalog))
+
+        for column, bounds in zip(self.rangeColumns,[p0Range,dmRange,w50Range]):
+            if(bounds is not None):
+                rows = intersect1d(rows,self.rangeQuery(column,bounds[0],bounds[1]))
+
+        if(cone is not None):
+            rows = intersect1d(rows,self.coneQuery(cone[0],cone[1],cone[2]))
+
+        return rows
+
+    # ****************************************************************************************************
+
+    ## Gets the names of the pulsars in the specified catalog rows.
+    #
+    #  @param self The object pointer.
+    #  @param rows The row numbers, e.g. as returned by select().
+    #  @returns a list of pulsar names.
+    def names(self,rows):
+        """
+        Gets the names of the pulsars in the specified catalog rows.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        rows : numpy.ndarray
+            The row numbers, e.g. as returned by select().
+
+        Returns
+        -------
+        list
+            The pulsar names.
+
+        """
+        return self.catalog["PSRJ"][rows].tolist()
+
+    # ****************************************************************************************************
+
+    ## Formats a single catalog row as a line of CSV text.
+    #
+    #  @param self The object pointer.
+    #  @param row The row number.
+    #  @returns the row as CSV text, in the format of the parsed catalog file.
+    def formatRow(self,row):
+        """
+        Formats a single catalog row as a line of CSV text, in the format of the
+        parsed catalog file, i.e.
+
+        Name,RA,DEC,GL,GB,Period (s),Frequency (Hz),DM,W10 (ms),W50 (ms)
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        row : int
+            The row number.
+
+        Returns
+        -------
+        str
+            The row as CSV text.
+
+        """
+        return ",".join([str(value) for value in self.catalog[row].tolist()])
+
+    # ****************************************************************************************************
+
+    ## Converts galactic coordinates to unit vectors.
+    #
+    #  @param self The object pointer.
+    #  @param gl The galactic longitudes (degrees).
+    #  @param gb The galactic latitudes (degrees).
+    #  @returns an N x 3 numpy array of unit vectors.
+    def unitVectors(self,gl,gb):
+        """
+        Converts galactic coordinates to unit vectors.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        gl : numpy.ndarray
+            The galactic longitudes (degrees).
+        gb : numpy.ndarray
+            The galactic latitudes (degrees).
+
+        Returns
+        -------
+        numpy.ndarray
+            An N x 3 array of unit vectors.
+
+        """
+        l = radians(gl)
+        b = radians(gb)
+        return array([cos(b) * cos(l),cos(b) * sin(l),sin(b)]).T
+
+    # ****************************************************************************************************
+
+    ## Parses query bounds supplied on the command line, e.g. "50:500".
+    #
+    #  @param self The object pointer.
+    #  @param text The bounds as colon separated values, or an empty string.
+    #  @param count The number of values expected.
+    #  @returns a list of floats, or None if the text is empty.
+    def parseBounds(self,text,count):
+        """
+        Parses query bounds supplied on the command line, e.g. "50:500" for a
+        range, or "30:0:5" for a cone.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        text : str
+            The bounds as colon separated values, or an empty string.
+        count : int
+            The number of values expected.
+
+        Returns
+        -------
+        list
+            A list of floats, or None if the text is empty.
+
+        Raises
+        ------
+        ValueError
+            If the text does not contain the expected number of numeric values.
+
+        """
+        if(not text):
+            return None
+
+        bounds = map(float,text.split(":"))
+
+        if(len(bounds) != count):
+            raise ValueError("expected " + str(count) + " values in '" + text + "'")
+
+        return bounds
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    CatalogQuery().main()
@@ -0,0 +1,592 @@
+## @package ATNF
+# A module used to measure how the ATNF catalog extraction scales, using
+# synthetic catalog files.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                  ATNF Extractor Benchmark Version 1.0                  |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Generates synthetic ATNF pulsar catalog database files of increasing   |
+    | size, and measures how ATNFDataExtractor.py scales when extracting     |
+    | them. For each catalog size and extraction method, the wall time, peak |
+    | resident memory (RSS) and entries processed per second are recorded.   |
+    | Each measurement is made in a fresh child process, so that memory use  |
+    | from one run does not affect the next. The results are written to a    |
+    | CSV file, so that changes to the parser or coordinate conversion code  |
+    | can be compared against each other. The Processes column records the   |
+    | number of processes actually used, as the parallel method parses       |
+    | catalogs smaller than 8 MB in a single process, whatever -j is set to. |
+    |                                                                        |
+    | Requires numpy, pyephem and astropy.                                   |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -d (string) full path to the directory to store synthetic catalog      |
+    |             files and extractor outputs in.                            |
+    |                                                                        |
+    | -w (string) full path to the CSV results file to create.               |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | -s (string) comma separated list of catalog sizes (number of entries)  |
+    |             to benchmark (default=1000,10000,100000,1000000).          |
+    |                                                                        |
+    | -m (string) comma separated list of extraction methods to benchmark.   |
+    |             Valid methods are:                                         |
+    |                                                                        |
+    |             records  - iterRecords(), converts coordinates per entry.  |
+    |             batched  - iterBatchedRecords(), converts in blocks.       |
+    |             parallel - iterParallelRecords(), see the -j flag.         |
+    |                                                                        |
+    |             The default is batched. Note that the records method is    |
+    |             very slow for large catalogs.                              |
+    |                                                                        |
+    | -j (int) the number of processes used by the parallel method (def=2).  |
+    |                                                                        |
+    | --noeq (float) the fraction of entries without RAJ/DECJ, which only    |
+    |             have ecliptic coordinates (ELONG/ELAT) listed (def=0.05).  |
+    |                                                                        |
+    | --nocoords (float) the fraction of entries with no coordinates at all, |
+    |             so that galactic coordinates cannot be computed (def=0.01).|
+    |                                                                        |
+    | --seed (int) the random seed used to generate catalogs (default=1).    |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys, time, resource
+
+from multiprocessing import Process
+from multiprocessing import Queue
+from Queue import Empty
+
+# Numpy Imports:
+from numpy import arcsin
+from numpy import degrees
+from numpy import random
+
+from ATNFDataExtractor import ATNFDataExtractor
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## ATNF Extractor Benchmark Version 1.0
+#
+# Generates synthetic ATNF pulsar catalog database files of increasing
+# size, and measures how ATNFDataExtractor.py scales when extracting
+# them. For each catalog size and extraction method, the wall time, peak
+# resident memory (RSS) and entries processed per second are recorded.
+# Each measurement is made in a fresh child process, so that memory use
+# from one run does not affect the next. The results are written to a
+# CSV file with the format:
+#
+# Entries,Method,Processes,Missing equatorial,Missing coordinates,File size (MB),Wall time (s),Peak RSS (MB),Records/s
+# 10000,batched,1,0.05,0.01,8.634,5.231,102.6,1911.7
+#
+# The Processes column records the number of processes actually used, as
+# the parallel method parses catalogs smaller than 8 MB in a single
+# process, whatever -j is set to.
+#
+# Synthetic catalog entries contain the keys used by the extractor,
+# together with several keys it ignores (P1, PEPOCH, S400, SURVEY), so
+# that the cost of skipping unwanted lines is also measured.
+#
+# Requires numpy, pyephem and astropy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -d (string) full path to the directory to store synthetic catalog
+#             files and extractor outputs in.
+#
+# -w (string) full path to the CSV results file to create.
+#
+# Optional Command Line Arguments:
+#
+# -v (boolean) verbose debugging flag.
+#
+# -s (string) comma separated list of catalog sizes (number of entries)
+#             to benchmark (default=1000,10000,100000,1000000).
+#
+# -m (string) comma separated list of extraction methods to benchmark.
+#             Valid methods are:
+#
+#             records  - iterRecords(), converts coordinates per entry.
+#             batched  - iterBatchedRecords(), converts in blocks.
+#             parallel - iterParallelRecords(), see the -j flag.
+#
+#             The default is batched. Note that the records method is
+#             very slow for large catalogs.
+#
+# -j (int) the number of processes used by the parallel method (def=2).
+#
+# --noeq (float) the fraction of entries without RAJ/DECJ, which only
+#             have ecliptic coordinates (ELONG/ELAT) listed (def=0.05).
+#
+# --nocoords (float) the fraction of entries with no coordinates at all,
+#             so that galactic coordinates cannot be computed (def=0.01).
+#
+# --seed (int) the random seed used to generate catalogs (default=1).
+#
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class ExtractorBenchmark:
+    """
+    Description:
+
+    Generates synthetic ATNF pulsar catalog database files of increasing
+    size, and measures how ATNFDataExtractor.py scales when extracting
+    them. For each catalog size and extraction method, the wall time, peak
+    resident memory (RSS) and entries processed per second are recorded.
+    Each measurement is made in a fresh child process, so that memory use
+    from one run does not affect the next.
+
+    """
+
+    ## The extraction methods which can be benchmarked.
+    methods = ["records","batched","parallel"]
+
+    ## The time (in seconds) to wait for a measurement, before checking that
+    # the child process making it is still running.
+    pollInterval = 5
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and runs the benchmark.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and runs the benchmark.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-d", action="store", dest="workDir",help='Path to a directory to store synthetic catalogs in.',default="")
+        parser.add_option("-w", action="store", dest="outputPath",help='Path to write the benchmark results to.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("-s", action="store", dest="sizes",help='Comma separated catalog sizes (optional).',default="1000,10000,100000,1000000")
+        parser.add_option("-m", action="store", dest="methods",help='Comma separated extraction methods (optional).',default="batched")
+        parser.add_option("-j", type="int", dest="processes",help='The number of processes used by the parallel method (optional).',default=2)
+        parser.add_option("--noeq", type="float", dest="noEquatorial",help='The fraction of entries without RAJ/DECJ (optional).',default=0.05)
+        parser.add_option("--nocoords", type="float", dest="noCoordinates",help='The fraction of entries without coordinates (optional).',default=0.01)
+        parser.add_option("--seed", type="int", dest="seed",help='The seed value for random number generation (optional).',default=1)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.verbose       = args.verbose
+        self.workDir       = args.workDir
+        self.outputPath    = args.outputPath
+        self.processes     = args.processes
+        self.noEquatorial  = args.noEquatorial
+        self.noCoordinates = args.noCoordinates
+        self.seed          = args.seed
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",self.verbose
+        print "\tWork directory:",self.workDir
+        print "\tResults file path:",self.outputPath
+        print "\tCatalog sizes:",args.sizes
+        print "\tExtraction methods:",args.methods
+        print "\tParallel processes:",self.processes
+        print "\tFraction missing RAJ/DECJ:",self.noEquatorial
+        print "\tFraction missing all coordinates:",self.noCoordinates
+        print "\tRandom seed:",self.seed
+
+        try:
+            sizes = map(int,args.sizes.split(","))
+        except ValueError:
+            print "\n\tCatalog sizes must be comma separated integers."
+            print "\tExiting..."
+            sys.exit()
+
+        methods = args.methods.split(",")
+
+        for method in methods:
+            if(method not in self.methods):
+                print "\n\tInvalid extraction method supplied: ", method
+                print "\tExiting..."
+                sys.exit()
+
+        if(self.noEquatorial < 0 or self.noCoordinates < 0 or self.noEquatorial + self.noCoordinates > 1):
+            print "\n\tSupplied missing coordinate fractions invalid - Exiting!"
+            sys.exit()
+
+        if(not self.workDir or not self.outputPath):
+            print "\n\tYou must supply a work directory via the -d flag, and a results file via the -w flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(os.path.exists(self.workDir) == False):
+            os.makedirs(self.workDir)
+
+        # ****************************************
+        #            Run the benchmark
+        # ****************************************
+
+        resultsFile = open(self.outputPath,'w')
+
+        try:
+            resultsFile.write("Entries,Method,Processes,Missing equatorial,Missing coordinates," +\
+                              "File size (MB),Wall time (s),Peak RSS (MB),Records/s\n")
+
+            for size in sizes:
+                catalogPath = os.path.join(self.workDir,"synthetic_psrcat_" + str(size) + ".db")
+
+                print "\n\tGenerating synthetic catalog with", size, "entries: ", catalogPath
+                self.generateCatalog(catalogPath,size,self.noEquatorial,self.noCoordinates,self.seed)
+
+                fileSize = os.path.getsize(catalogPath) / 1048576.0
+
+                for method in methods:
+                    processes = self.processes if method == "parallel" else 1
+                    outputPath = catalogPath.replace(".db","_" + method + ".txt")
+
+                    entries, wallTime, peakRSS, processes = self.measure(catalogPath,outputPath,method,processes)
+
+                    print "\t", method, "- Entries:", entries, " Wall time (s):", "%.3f" % wallTime,\
+                          " Peak RSS (MB):", "%.1f" % peakRSS, " Records/s:", "%.1f" % (entries / wallTime)
+
+                    resultsFile.write(str(size) + "," + method + "," + str(processes) + "," +\
+                                      str(self.noEquatorial) + "," + str(self.noCoordinates) + "," +\
+                                      "%.3f" % fileSize + "," + "%.3f" % wallTime + "," +\
+                                      "%.1f" % peakRSS + "," + "%.1f" % (entries / wallTime) + "\n")
+                    resultsFile.flush()
+
+                    os.remove(outputPath)
+        finally:
+            resultsFile.close()
+
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Generates a synthetic ATNF pulsar catalog database file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the catalog file to create.
+    #  @param entries The number of entries to generate.
+    #  @param noEquatorial The fraction of entries with only ecliptic coordinates.
+    #  @param noCoordinates The fraction of entries with no coordinates at all.
+    #  @param seed The random seed.
+    def generateCatalog(self,path,entries,noEquatorial,noCoordinates,seed):
+        """
+        Generates a synthetic ATNF pulsar catalog database file, in the format
+        of psrcat.db. Positions are uniform on the sky, while periods, DMs and
+        pulse widths are drawn from log-normal distributions roughly matching
+        the real catalog. Entries are generated and written in blocks, so
+        memory use does not grow with the size of the catalog.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the catalog file to create.
+        entries : int
+            The number of entries to generate.
+        noEquatorial : float
+            The fraction of entries without RAJ/DECJ, which only have ecliptic
+            coordinates (ELONG/ELAT) listed.
+        noCoordinates : float
+            The fraction of entries with no coordinates at all.
+        seed : int
+            The random seed.
+
+        """
+        generator = random.RandomState(seed)
+        blockSize = 10000
+
+        destinationFile = open(path,'w')
+
+        try:
+            destinationFile.write("#CATALOGUE 1.54\n#\n# Synthetic catalog generated by ExtractorBenchmark.py\n#\n")
+
+            for first in range(0,entries,blockSize):
+                count = min(blockSize,entries - first)
+
+                ra    = generator.uniform(0,24,count)                       # Hours.
+                dec   = degrees(arcsin(generator.uniform(-1,1,count)))      # Degrees.
+                p0    = generator.lognormal(-0.5,1.2,count)                 # Seconds.
+                p1    = generator.lognormal(-34,2,count)
+                dm    = generator.lognormal(4.5,1.0,count)
+                w50   = p0 * 1000.0 * generator.uniform(0.01,0.1,count)     # Milliseconds.
+                coord = generator.uniform(0,1,count)
+                useF0 = generator.uniform(0,1,count) < 0.3
+
+                for i in range(count):
+                    text = "PSRJ     J" + self.sexagesimal(ra[i],False)[0:5].replace(":","") +\
+                           self.sexagesimal(dec[i],True)[0:6].replace(":","") + "         syn\n"
+
+                    if(coord[i] >= noEquatorial + noCoordinates):
+                        text += "RAJ      " + self.sexagesimal(ra[i],False) + "    2  syn\n"
+                        text += "DECJ     " + self.sexagesimal(dec[i],True) + "    4  syn\n"
+                    elif(coord[i] >= noCoordinates):
+                        # Approximate ecliptic coordinates, the extractor only needs
+                        # plausible values to convert.
+                        text += "ELONG    " + "%.6f" % (ra[i] * 15.0) + "    3  syn\n"
+                        text += "ELAT     " + "%.6f" % dec[i] + "    3  syn\n"
+
+                    if(useF0[i]):
+                        text += "F0       " + "%.12f" % (1.0 / p0[i]) + "    14  syn\n"
+                    else:
+                        text += "P0       " + "%.12f" % p0[i] + "    14  syn\n"
+
+                    text += "P1       " + "%.3E" % p1[i] + "    12  syn\n"
+                    text += "PEPOCH   49079.5          syn\n"
+                    text += "DM       " + "%.3f" % dm[i] + "    6  syn\n"
+                    text += "S400     " + "%.1f" % (p0[i] + 0.1) + "          syn\n"
+                    text += "W50      " + "%.2f" % w50[i] + "          syn\n"
+                    text += "W10      " + "%.2f" % (w50[i] * 2.0) + "          syn\n"
+                    text += "SURVEY   syn\n"
+                    text += "@-----------------------------------------------------------------\n"
+
+                    destinationFile.write(text)
+        finally:
+            destinationFile.close()
+
+    # ****************************************************************************************************
+
+    ## Formats an angle in sexagesimal notation, as used in the catalog file.
+    #
+    #  @param self The object pointer.
+    #  @param value The angle, in hours or degrees.
+    #  @param signed If True a leading sign is included, as for declinations.
+    #  @returns the angle as a string, i.e. hh:mm:ss.ss or +dd:mm:ss.s.
+    def sexagesimal(self,value,signed):
+        """
+        Formats an angle in sexagesimal notation, as used in the catalog file.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        value : float
+            The angle, in hours or degrees.
+        signed : bool
+            If True a leading sign is included, as for declinations.
+
+        Returns
+        -------
+        str
+            The angle as a string, i.e. hh:mm:ss.ss or +dd:mm:ss.s.
+
+        Examples
+        --------
+
+        >>> print sexagesimal(-18.5825,True)
+        -18:34:57.0
+
+        """
+        sign = "-" if value < 0 else "+"
+        value = abs(value)
+        whole = int(value)
+        minutes = int((value - whole) * 60.0)
+        seconds = ((value - whole) * 60.0 - minutes) * 60.0
+
+        if(signed):
+            return sign + "%02d:%02d:%04.1f" % (whole,minutes,min(seconds,59.9))
+        else:
+            return "%02d:%02d:%05.2f" % (whole,minutes,min(seconds,59.99))
+
+    # ****************************************************************************************************
+
+    ## Measures the extraction of a catalog file in a child process.
+    #
+    #  @param self The object pointer.
+    #  @param catalogPath The full path to the catalog file to extract.
+    #  @param outputPath The full path to the extractor output file.
+    #  @param method The extraction method, one of methods.
+    #  @param processes The number of processes requested for the parallel method.
+    #  @returns a tuple containing the number of entries extracted, the wall time
+    #   in seconds, the peak RSS of the child process in MB, and the number of
+    #   processes used.
+    def measure(self,catalogPath,outputPath,method,processes):
+        """
+        Measures the extraction of a catalog file in a child process. Using a
+        new process for every measurement means that the peak RSS reported
+        belongs to a single run, and is not affected by earlier runs. Note the
+        peak RSS includes the memory used by the interpreter and the libraries
+        it has loaded. For the parallel method, the peak RSS of the worker
+        processes is reported if larger. If the child process exits without
+        reporting a measurement (e.g. it crashed), the benchmark exits rather
+        than waiting forever.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        catalogPath : str
+            The full path to the catalog file to extract.
+        outputPath : str
+            The full path to the extractor output file.
+        method : str
+            The extraction method, one of methods.
+        processes : int
+            The number of processes requested for the parallel method.
+
+        Returns
+        -------
+        tuple
+            The number of entries extracted, the wall time in seconds, the
+            peak RSS of the child process in MB, and the number of processes
+            used.
+
+        """
+        results = Queue()
+
+        child = Process(target=self.extract,args=(catalogPath,outputPath,method,processes,results))
+        child.start()
+
+        measurement = None
+        while measurement is None:
+            try:
+                measurement = results.get(timeout=self.pollInterval)
+            except Empty:
+                # The child may have reported just before exiting, so check the
+                # queue once more before giving up on it.
+                if(child.is_alive() == False):
+                    try:
+                        measurement = results.get(timeout=self.pollInterval)
+                    except Empty:
+                        print "\n\tExtraction child process exited without reporting a measurement (exit code ",\
+                              child.exitcode, ")"
+                        print "\tExiting..."
+                        sys.exit()
+
+        child.join()
+
+        return measurement
+
+    # ****************************************************************************************************
+
+    ## Extracts a catalog file, reporting the cost via a queue. Runs in the child process.
+    #
+    #  @param self The object pointer.
+    #  @param catalogPath The full path to the catalog file to extract.
+    #  @param outputPath The full path to the extractor output file.
+    #  @param method The extraction method, one of methods.
+    #  @param processes The number of processes requested for the parallel method.
+    #  @param results The queue to put the (entries, wall time, peak RSS, processes) tuple on.
+    def extract(self,catalogPath,outputPath,method,processes,results):
+        """
+        Extracts a catalog file using the specified method, reporting the number
+        of entries extracted, wall time and peak RSS via a queue. Runs in the
+        child process started by measure().
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        catalogPath : str
+            The full path to the catalog file to extract.
+        outputPath : str
+            The full path to the extractor output file.
+        method : str
+            The extraction method, one of methods.
+        processes : int
+            The number of processes requested for the parallel method.
+        results : multiprocessing.Queue
+            The queue to put the (entries, wall time, peak RSS, processes)
+            tuple on. Processes is the number of processes actually used.
+
+        """
+        extractor = ATNFDataExtractor()
+
+        start = time.time()
+
+        if(method == "records"):
+            entries = extractor.writeRecords(outputPath,extractor.iterRecords(catalogPath))
+        elif(method == "batched"):
+            entries = extractor.writeRecords(outputPath,extractor.iterBatchedRecords(catalogPath))
+        else:
+            processes = extractor.parallelProcesses(catalogPath,processes)
+            entries = extractor.writeRecords(outputPath,extractor.iterParallelRecords(catalogPath,processes))
+
+        wallTime = time.time() - start
+
+        # ru_maxrss is reported in kilobytes on Linux.
+        peakRSS = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                      resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024.0
+
+        results.put((entries,wallTime,peakRSS,processes))
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    ExtractorBenchmark().main()
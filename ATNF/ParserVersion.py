@@ -0,0 +1,44 @@
+## @package ATNF
+# A module holding the version of the ATNF catalog parser.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                          ATNF Parser Version 1.0                       |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Holds the version of the catalog parser in ATNFDataExtractor.py. It is |
+    | kept in its own module, with no dependencies, so that CatalogCache.py  |
+    | can check whether a cache is up to date without importing pyephem or   |
+    | astropy.                                                               |
+    |                                                                        |
+    | The version must be incremented whenever a change to the parser alters |
+    | the values it extracts, so that binary catalog caches (see             |
+    | CatalogCache.py) are rebuilt automatically.                            |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+## The version of the catalog parser. This must be incremented whenever a
+# change to the parser alters the values it extracts, so that binary
+# catalog caches (see CatalogCache.py) are rebuilt automatically.
+PARSER_VERSION = 3
@@ -54,6 +54,31 @@
     |             supplied determines what sort of profiles will be injected |
     |             into the noise file - the default value is 1400 MHz.       |
     |                                                                        |
+    | --catalog (string) full path to a ATNF pulsar catalog database file,   |
+    |             or parsed catalog file (see ATNFDataExtractor.py). If      |
+    |             supplied with any of the selection flags below, inject     |
+    |             commands are only created for the catalog pulsars meeting  |
+    |             the selection criteria (via ATNF/CatalogQuery.py).         |
+    |                                                                        |
+    | --p0range (string) the period (s) range to select, as <min>:<max>.     |
+    |                                                                        |
+    | --dmrange (string) the DM range to select, as <min>:<max>.             |
+    |                                                                        |
+    | --w50range (string) the W50 (ms) range to select, as <min>:<max>.      |
+    |                                                                        |
+    | --cone (string) the sky region to select, as <GL>:<GB>:<radius> in     |
+    |             degrees.                                                   |
+    |                                                                        |
+    | --manifest (string) full path to the fake pulsar manifest written by   |
+    |             PARS/CandidateParGenerator.py (FakePulsar.manifest.npy).   |
+    |             Fake pulsar predictors are joined on it by name, so their  |
+    |             S/N is read from the manifest at full precision, rather    |
+    |             than parsed from the file name. The manifest rows of the   |
+    |             fake pulsars injected, with the ASC profile and command    |
+    |             file used, are written to <out>/InjectPulsarManifest.npy,  |
+    |             so every parameter (e.g. duty cycle and width) is known    |
+    |             downstream. Without it, the S/N is parsed from file names. |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -71,7 +96,9 @@ from optparse import OptionParser
 import os, sys
 
 # Numpy Imports:
+from numpy import empty
 from numpy import random
+from numpy import save
 
 # ******************************
 #
@@ -121,6 +148,31 @@ from numpy import random
 #            supplied determines what sort of profiles will be injected
 #            into the noise file - the default value is 1400 MHz.
 #
+# --catalog (string) full path to a ATNF pulsar catalog database file,
+#             or parsed catalog file (see ATNFDataExtractor.py). If
+#             supplied with any of the selection flags below, inject
+#             commands are only created for the catalog pulsars meeting
+#             the selection criteria (via ATNF/CatalogQuery.py).
+#
+# --p0range (string) the period (s) range to select, as <min>:<max>.
+#
+# --dmrange (string) the DM range to select, as <min>:<max>.
+#
+# --w50range (string) the W50 (ms) range to select, as <min>:<max>.
+#
+# --cone (string) the sky region to select, as <GL>:<GB>:<radius> in
+#             degrees.
+#
+# --manifest (string) full path to the fake pulsar manifest written by
+#             PARS/CandidateParGenerator.py (FakePulsar.manifest.npy).
+#             Fake pulsar predictors are joined on it by name, so their
+#             S/N is read from the manifest at full precision, rather
+#             than parsed from the file name. The manifest rows of the
+#             fake pulsars injected, with the ASC profile and command
+#             file used, are written to <out>/InjectPulsarManifest.npy,
+#             so every parameter (e.g. duty cycle and width) is known
+#             downstream. Without it, the S/N is parsed from file names.
+#
 #
 # License:
 #
@@ -189,6 +241,12 @@ class InjectPulsarCommandCreator:
         parser.add_option("--seed", type="int", dest="seed",help='The seed value for random number generation (optional).',default=1)
         parser.add_option("--buffer", type="int", dest="buffer",help='The target frequency buffer.',default=100)
         parser.add_option("--batch", type="int", dest="batch",help='The target frequency buffer.',default=100000000000)
+        parser.add_option("--catalog", action="store", dest="catalogPath",help='Path to a pulsar catalog file, used to select pulsars (optional).',default="")
+        parser.add_option("--p0range", action="store", dest="p0Range",help='The period range of pulsars to select, <min>:<max> (optional).',default="")
+        parser.add_option("--dmrange", action="store", dest="dmRange",help='The DM range of pulsars to select, <min>:<max> (optional).',default="")
+        parser.add_option("--w50range", action="store", dest="w50Range",help='The W50 range of pulsars to select, <min>:<max> (optional).',default="")
+        parser.add_option("--cone", action="store", dest="cone",help='The sky region of pulsars to select, <GL>:<GB>:<radius> (optional).',default="")
+        parser.add_option("--manifest", action="store", dest="manifestPath",help='Path to the fake pulsar manifest (optional).',default="")
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
@@ -206,6 +264,13 @@ class InjectPulsarCommandCreator:
         self.extensions  = [predExt,ascExt]
         self.commandFilePrefix = "InjectPulsarCommands_"
         self.seed        = args.seed
+        self.catalogPath = args.catalogPath
+        self.p0Range     = args.p0Range
+        self.dmRange     = args.dmRange
+        self.w50Range    = args.w50Range
+        self.cone        = args.cone
+        self.manifestPath = args.manifestPath
+        self.injectManifestPath = self.outputDir + "/InjectPulsarManifest.npy"
 
         # Stores the commands used to inject data into a noise fil file.
         self.injectCommands = []
@@ -225,6 +290,12 @@ class InjectPulsarCommandCreator:
         print "\tOutput directory:", self.outputDir
         print "\tCommand batch size:", self.batch
         print "\tRandom seed:",self.seed
+        print "\tPulsar catalog file path:",self.catalogPath
+        print "\tCatalog period range:",self.p0Range
+        print "\tCatalog DM range:",self.dmRange
+        print "\tCatalog W50 range:",self.w50Range
+        print "\tCatalog sky region:",self.cone
+        print "\tFake pulsar manifest path:",self.manifestPath
         print "\n\tChecking user supplied parameters..."
 
         # First check user has supplied a asc directory path ...
@@ -279,6 +350,27 @@ class InjectPulsarCommandCreator:
             print "\n\tSupplied batch value invalid - Exiting!"
             sys.exit()
 
+        # Select the catalog pulsars to inject, if selection criteria were supplied.
+        self.selected = None
+        if(self.p0Range or self.dmRange or self.w50Range or self.cone):
+            if(os.path.isfile(self.catalogPath) == False):
+                print "\n\tYou must supply a valid catalog file via the --catalog flag to select pulsars."
+                sys.exit()
+
+            self.selected = self.selectCatalogEntries(self.catalogPath)
+            print "\tCatalog pulsars selected: ", len(self.selected)
+
+        # Load the fake pulsar manifest, if supplied.
+        self.manifest = None
+        if(self.manifestPath):
+            if(os.path.isfile(self.manifestPath) == False):
+                print "\n\tYou must supply a valid fake pulsar manifest file via the --manifest flag."
+                print "\tExiting..."
+                sys.exit()
+
+            self.manifest = self.loadManifest(self.manifestPath)
+            print "\tFake pulsars in manifest: ", len(self.manifest)
+
         # Now seed random number generator
         random.seed(seed=self.seed)
 
@@ -403,6 +495,10 @@ class InjectPulsarCommandCreator:
         # FIRST we process the predictor files belonging to real pulsars.
         # For each asc file...
         for key, value in ascPaths.iteritems():
+            # Skip pulsars not meeting the catalog selection criteria.
+            if(self.selected is not None and key not in self.selected):
+                continue
+
             # Get the predictor file path if it exists...
             predictor = pulsarPredPaths.get(key)
 
@@ -466,7 +562,21 @@ class InjectPulsarCommandCreator:
         # Get the keys in the asc path dictionary
         ascKeys = list(ascPaths.keys())
 
-        for key, value in fakePulsarPredPaths.iteritems():
+        fakePulsarNames = list(fakePulsarPredPaths.keys())
+
+        # Join the fake pulsar predictors on the manifest by name, in one pass.
+        if(self.manifest is not None):
+            manifestRows = self.manifest.lookup(fakePulsarNames)
+            manifestSNRs = self.manifest.load()["SNR"][manifestRows]
+            print "\tFake pulsar predictors not in manifest: ", int((manifestRows < 0).sum())
+        else:
+            manifestRows = None
+
+        # The manifest row, ASC profile and command file of each fake pulsar injected.
+        injectedRows, injectedAscs, injectedBatches = [], [], []
+
+        for index, key in enumerate(fakePulsarNames):
+            value = fakePulsarPredPaths[key]
 
             # choose a random asc file key
             random_index = random.randint(0, len(ascKeys))
@@ -480,17 +590,22 @@ class InjectPulsarCommandCreator:
             if(self.verbose):
                 print "\tkey: ", key, " value: ", value, " ASC: ", asc
 
-            # For fake pulsars, we have a pre-computed target SNR. Here we extract it
-            # from the name of the fakse pulsar, which is in a pre-determined format:
-            #
-            # FakePulsar_<number>_<period>_<DM>_<SNR>
-            #
-            # For example...
-            # FakePulsar_972_3.647749_8.3_9.0
-            #
-            # In both cases the SNR is the last component, so grab it.
-            varComponents = key.split("_")
-            SNR = varComponents[len(varComponents)-1]
+            # For fake pulsars, we have a pre-computed target SNR. This is read from
+            # the manifest when the fake pulsar is in it...
+            if(manifestRows is not None and manifestRows[index] >= 0):
+                SNR = repr(float(manifestSNRs[index]))
+            else:
+                # ... otherwise we extract it from the name of the fake pulsar, which
+                # is in a pre-determined format:
+                #
+                # FakePulsar_<number>_<period>_<DM>_<SNR>
+                #
+                # For example...
+                # FakePulsar_972_3.647749_8.3_9.0
+                #
+                # In both cases the SNR is the last component, so grab it.
+                varComponents = key.split("_")
+                SNR = varComponents[len(varComponents)-1]
 
             # inject_pulsar inputs:
             #
@@ -538,6 +653,14 @@ class InjectPulsarCommandCreator:
             # Write the command to the current batch output file
             self.appendToFile(commandFilePath,command+"\n")
 
+            if(manifestRows is not None and manifestRows[index] >= 0):
+                injectedRows.append(manifestRows[index])
+                injectedAscs.append(asc)
+                injectedBatches.append(commandBatchCount)
+
+        if(self.manifest is not None):
+            self.writeInjectManifest(self.injectManifestPath,injectedRows,injectedAscs,injectedBatches)
+            print "\n\tInjected fake pulsar manifest written to: ", self.injectManifestPath
 
         print "\n\tCommands created: ", commandCount
 
@@ -546,6 +669,133 @@ class InjectPulsarCommandCreator:
 
     # ****************************************************************************************************
 
+    ## Selects the catalog pulsars meeting the period, DM, W50 and sky region criteria.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the ATNF pulsar catalog database file, or parsed catalog file.
+    #  @returns the set of names of the selected pulsars.
+    def selectCatalogEntries(self,path):
+        """
+        Selects the catalog pulsars meeting the period, DM, W50 and sky region
+        criteria supplied on the command line, using the indexes maintained by
+        ATNF/CatalogQuery.py.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the ATNF pulsar catalog database file, or to a
+            parsed catalog file created by ATNFDataExtractor.py.
+
+        Returns
+        -------
+        set
+            The names of the selected pulsars.
+
+        """
+
+        # The catalog query module lives alongside this script when deployed, and in
+        # the ATNF directory of the repository.
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","ATNF"))
+        from CatalogQuery import CatalogQuery
+
+        query = CatalogQuery(verbose=self.verbose)
+
+        try:
+            p0Range  = query.parseBounds(self.p0Range,2)
+            dmRange  = query.parseBounds(self.dmRange,2)
+            w50Range = query.parseBounds(self.w50Range,2)
+            cone     = query.parseBounds(self.cone,3)
+        except ValueError as e:
+            print "\tError parsing catalog selection criteria:", e
+            print "\tExiting..."
+            sys.exit()
+
+        query.setCatalog(query.loadCatalog(path))
+
+        return set(query.names(query.select(p0Range,dmRange,w50Range,cone)))
+
+    # ****************************************************************************************************
+
+    ## Loads the fake pulsar manifest written by PARS/CandidateParGenerator.py.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the manifest file.
+    #  @returns the manifest object (see PARS/Manifest.py).
+    def loadManifest(self,path):
+        """
+        Loads the fake pulsar manifest written by PARS/CandidateParGenerator.py.
+        The manifest is memory mapped, so its columns are read when first used.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the manifest file.
+
+        Returns
+        -------
+        Manifest
+            The manifest object (see PARS/Manifest.py).
+
+        """
+
+        # The manifest module lives alongside this script when deployed, and in
+        # the PARS directory of the repository.
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","PARS"))
+        from Manifest import Manifest
+
+        return Manifest(path,self.verbose)
+
+    # ****************************************************************************************************
+
+    ## Writes the manifest rows of the fake pulsars injected, with the ASC profile and command file used.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the file to write.
+    #  @param rows The manifest row of each fake pulsar injected.
+    #  @param ascs The path to the ASC profile injected for each fake pulsar.
+    #  @param batches The number of the command file holding each inject command.
+    def writeInjectManifest(self,path,rows,ascs,batches):
+        """
+        Writes the manifest rows of the fake pulsars injected (numpy .npy format),
+        with the ASC profile and command file used, i.e. the manifest columns
+        (see PARS/Manifest.py) followed by the columns ASC and BATCH. The string
+        columns keep the widths of the manifest, and ASC is sized to the longest
+        path, so nothing is truncated. The outputs of inject_pulsar can be joined
+        on it by NAME.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the file to write.
+        rows : list
+            The manifest row of each fake pulsar injected.
+        ascs : list
+            The path to the ASC profile injected for each fake pulsar.
+        batches : list
+            The number of the command file holding each inject command.
+
+        """
+        selected = self.manifest.load()[rows]
+        ascWidth = max([len(asc) for asc in ascs] + [1])
+
+        injected = empty(len(rows),dtype=selected.dtype.descr + [("ASC","S" + str(ascWidth)),("BATCH","i8")])
+
+        for name in selected.dtype.names:
+            injected[name] = selected[name]
+
+        injected["ASC"]   = ascs
+        injected["BATCH"] = batches
+
+        save(path,injected)
+
+    # ****************************************************************************************************
+
     ## Appends the provided text to the file at the specified path.
     #
     #  @param self The object pointer.
@@ -0,0 +1,727 @@
+## @package PARS
+# A module used to read ARFF candidate files, and maintain a memory mapped
+# columnar cache of their numeric attributes.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                        ARFF Reader Version 1.0                         |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Reads ARFF (Attribute-Relation File Format) files, such as the         |
+    | candidate files produced by pulsar search pipelines. The @attribute    |
+    | header is parsed, then the @data section is streamed in blocks of      |
+    | rows, so memory use does not grow with the size of the file.           |
+    |                                                                        |
+    | Each numeric attribute is written to a binary column file (float64,    |
+    | with missing values stored as NaN) in a cache directory. Later runs    |
+    | memory map the column files, rather than re-parsing text, so multi-    |
+    | gigabyte candidate files can be used directly. Nominal and string      |
+    | attributes are not cached.                                             |
+    |                                                                        |
+    | The cache is keyed by the size and modification time of the ARFF file, |
+    | and the version of the reader. If any of these change, the cache is    |
+    | rebuilt automatically the next time it is loaded.                      |
+    |                                                                        |
+    | Used by CandidateParGenerator.py. Requires numpy.                      |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -a (string) full path to an ARFF file.                                 |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -c (string) full path to the directory to store the cache in. By       |
+    |             default the directory containing the ARFF file is used.    |
+    |                                                                        |
+    | -b (int) the number of data rows parsed per block (default=100000).    |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, re, sys, csv, datetime, hashlib, shutil
+
+# Numpy Imports:
+from numpy import array
+from numpy import fromstring
+from numpy import load
+from numpy import memmap
+from numpy import nan
+from numpy import save
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## ARFF Reader Version 1.0
+#
+# Reads ARFF (Attribute-Relation File Format) files, such as the
+# candidate files produced by pulsar search pipelines. The @attribute
+# header is parsed, then the @data section is streamed in blocks of
+# rows, so memory use does not grow with the size of the file.
+#
+# Each numeric attribute is written to a binary column file (float64,
+# with missing values stored as NaN) in a cache directory, named:
+#
+# <ARFF file name>.<key>.v<reader version>.cache
+#
+# The cache directory contains columns.npy, a numpy structured array
+# listing the cached attribute names and row count, and one file per
+# column, <column number>.f8, which is memory mapped when loaded.
+#
+# Requires numpy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -a (string) full path to an ARFF file.
+#
+# Optional Command Line Arguments:
+#
+# -c (string) full path to the directory to store the cache in. By
+#             default the directory containing the ARFF file is used.
+#
+# -b (int) the number of data rows parsed per block (default=100000).
+#
+# -v (boolean) verbose debugging flag.
+#
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class ArffReader:
+    """
+    Description:
+
+    Reads ARFF (Attribute-Relation File Format) files, streaming the @data
+    section in blocks, and maintains a memory mapped columnar cache of their
+    numeric attributes.
+
+    Examples
+    --------
+
+    >>> columns = ArffReader("/Users/rob/candidates.arff").load()
+    >>> print columns["Period"][0:2]
+    [ 6.80380912  232.8519815 ]
+    """
+
+    ## The version of the reader. Increment this when the parsing changes,
+    # so that existing caches are rebuilt.
+    readerVersion = 1
+
+    ## The attribute types which are cached as numeric columns.
+    numericTypes = ["numeric","real","integer"]
+
+    ## The description of the cached columns, stored in columns.npy.
+    index = [("NAME","S64"),("ROWS","i8")]
+
+    ## Creates a new reader object for the specified ARFF file.
+    #
+    #  @param self The object pointer.
+    #  @param arffPath The full path to the ARFF file.
+    #  @param cacheDir The directory to store the cache in (optional). By default
+    #   the directory containing the ARFF file is used.
+    #  @param blockSize The number of data rows parsed per block.
+    #  @param verbose The verbose debugging flag.
+    def __init__(self,arffPath="",cacheDir=None,blockSize=100000,verbose=False):
+        """
+        Creates a new reader object for the specified ARFF file.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        arffPath : str
+            The full path to the ARFF file.
+        cacheDir : str
+            The directory to store the cache in (optional). By default the
+            directory containing the ARFF file is used.
+        blockSize : int
+            The number of data rows parsed per block.
+        verbose : bool
+            The verbose debugging flag.
+
+        """
+        self.arffPath  = arffPath
+        self.blockSize = blockSize
+        self.verbose   = verbose
+
+        if(cacheDir):
+            self.cacheDir = cacheDir
+        else:
+            self.cacheDir = os.path.dirname(os.path.abspath(arffPath))
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and builds the cache, if it is missing or out of date.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and builds the cache, if it is missing or out of date.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-a", action="store", dest="arffPath",help='Path to an ARFF file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-c", action="store", dest="cacheDir",help='Path to the directory to store the cache in (optional).',default="")
+        parser.add_option("-b", type="int", dest="blockSize",help='The number of data rows parsed per block (optional).',default=100000)
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.__init__(args.arffPath,args.cacheDir,args.blockSize,args.verbose)
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",self.verbose
+        print "\tARFF file path:",self.arffPath
+        print "\tCache directory:",self.cacheDir
+        print "\tRows per block:",self.blockSize
+
+        if(os.path.isfile(self.arffPath) == False):
+            print "\n\tARFF file not found at: ", self.arffPath
+            print "\tYou must supply a valid ARFF file via the -a flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(self.blockSize < 1):
+            print "\n\tSupplied block size invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        start = datetime.datetime.now()
+        columns = self.load()
+        end = datetime.datetime.now()
+
+        print "\n\tCache directory:", self.cachePath()
+
+        for name, column in columns.iteritems():
+            print "\t", name, " rows: ", len(column), " min: ", column.min(), " max: ", column.max()
+
+        print "\tExecution time: ", str(end - start)
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Loads the numeric columns of the ARFF file, building the cache first if it is missing or out of date.
+    #
+    #  @param self The object pointer.
+    #  @returns a dictionary mapping attribute names to read-only memory mapped numpy arrays.
+    def load(self):
+        """
+        Loads the numeric columns of the ARFF file, building the cache first if
+        it is missing or out of date, i.e. if the ARFF file or reader version
+        have changed since the cache was created.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping attribute names to read-only memory mapped
+            numpy arrays (float64, with missing values as NaN).
+
+        """
+        path = self.cachePath()
+
+        if(os.path.isdir(path) == False):
+            if(self.verbose):
+                print "\tARFF cache missing or out of date, rebuilding: ", path
+            self.build(path)
+
+        columns = {}
+
+        for number, entry in enumerate(load(os.path.join(path,"columns.npy"))):
+            name, rows = entry["NAME"], int(entry["ROWS"])
+
+            if(rows > 0):
+                columns[name] = memmap(os.path.join(path,str(number) + ".f8"),dtype='<f8',mode='r',shape=(rows,))
+            else:
+                columns[name] = array([],dtype='<f8')
+
+        return columns
+
+    # ****************************************************************************************************
+
+    ## Reads the header of the ARFF file.
+    #
+    #  @param self The object pointer.
+    #  @param arffFile The open ARFF file, positioned at its start.
+    #  @returns the relation name, and a list of (attribute name, attribute type) tuples.
+    def readHeader(self,arffFile):
+        """
+        Reads the header of the ARFF file, up to and including the @data line,
+        leaving the file positioned at the first data row. Attribute types are
+        returned in lower case, with nominal types returned as "nominal". The
+        values of each nominal attribute are stored in self.nominalValues,
+        keyed by attribute index.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        arffFile : file
+            The open ARFF file, positioned at its start.
+
+        Returns
+        -------
+        tuple
+            The relation name, and a list of (attribute name, attribute type) tuples.
+
+        """
+        relation = ""
+        attributes = []
+        self.nominalValues = {}
+
+        for line in iter(arffFile.readline,""):
+            line = line.strip()
+
+            # Skip blank lines and comments.
+            if(not line or line.startswith("%")):
+                continue
+
+            keyword = line.split(None,1)[0].lower()
+
+            if(keyword == "@relation"):
+                relation = self.splitName(line.split(None,1)[1])[0]
+            elif(keyword == "@attribute"):
+                name, attributeType = self.splitName(line.split(None,1)[1])
+
+                if(attributeType.startswith("{")):
+                    values = attributeType[1:attributeType.rindex("}")].split(",")
+                    self.nominalValues[len(attributes)] = [value.strip().strip("'\"") for value in values]
+                    attributeType = "nominal"
+                else:
+                    attributeType = attributeType.split()[0].lower()
+
+                attributes.append((name,attributeType))
+            elif(keyword == "@data"):
+                return relation, attributes
+
+        raise ValueError("No @data section found in ARFF file: " + self.arffPath)
+
+    # ****************************************************************************************************
+
+    ## Splits a possibly quoted name from the start of an ARFF header value.
+    #
+    #  @param self The object pointer.
+    #  @param text The header value, e.g. "'Period (ms)' numeric".
+    #  @returns the name, and the remaining text.
+    def splitName(self,text):
+        """
+        Splits a possibly quoted name from the start of an ARFF header value,
+        e.g. "'Period (ms)' numeric" gives ("Period (ms)", "numeric").
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        text : str
+            The header value.
+
+        Returns
+        -------
+        tuple
+            The name, and the remaining text.
+
+        """
+        text = text.strip()
+
+        if(text[0] in "'\""):
+            end = text.index(text[0],1)
+            return text[1:end], text[end + 1:].strip()
+        else:
+            parts = text.split(None,1)
+            return parts[0], parts[1].strip() if len(parts) > 1 else ""
+
+    # ****************************************************************************************************
+
+    ## Streams the data section of the ARFF file in blocks.
+    #
+    #  @param self The object pointer.
+    #  @param arffFile The open ARFF file, positioned at the first data row.
+    #  @param attributes The (attribute name, attribute type) tuples read from the header.
+    #  @returns a generator of (rows, columns) tuples, where columns maps each numeric attribute index to a numpy array.
+    def iterBlocks(self,arffFile,attributes):
+        """
+        Streams the data section of the ARFF file in blocks of at most
+        blockSize rows. Each block is converted to one numpy array per numeric
+        attribute. When every attribute is numeric or nominal, a block with no
+        quoted or missing values is converted in a single call to numpy, rather
+        than row by row. Non-numeric nominal values (e.g. the labels of a class
+        attribute) are first replaced by a placeholder number, with a single
+        regular expression substitution over the block, and their columns then
+        discarded.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        arffFile : file
+            The open ARFF file, positioned at the first data row.
+        attributes : list
+            The (attribute name, attribute type) tuples read from the header.
+
+        Returns
+        -------
+        generator
+            A generator of (rows, columns) tuples, where rows is the number of
+            rows in the block, and columns maps the index of each numeric
+            attribute to a numpy array of its values.
+
+        """
+        width = len(attributes)
+        numeric = [i for i, (name, attributeType) in enumerate(attributes) if attributeType in self.numericTypes] # @UnusedVariable
+
+        # Blocks can be converted by numpy if every other attribute is nominal.
+        vectorised = all(attributeType in self.numericTypes or attributeType == "nominal"
+                         for name, attributeType in attributes) # @UnusedVariable
+
+        # Matches the nominal values numpy cannot parse as numbers, as whole fields.
+        labels = [value for values in self.nominalValues.itervalues() for value in values
+                  if value and not self.isNumber(value)]
+
+        if(labels):
+            labels = sorted(set(labels),key=len,reverse=True)
+            labels = re.compile(r"(?<![^,\s])(?:" + "|".join(re.escape(label) for label in labels) + r")(?![^,\s])")
+        else:
+            labels = None
+
+        lines = []
+
+        for line in arffFile:
+            line = line.strip()
+
+            if(not line or line.startswith("%")):
+                continue
+
+            if(line.startswith("{")):
+                raise ValueError("Sparse ARFF data is not supported: " + self.arffPath)
+
+            lines.append(line)
+
+            if(len(lines) == self.blockSize):
+                yield len(lines), self.parseBlock(lines,width,numeric,vectorised,labels)
+                lines = []
+
+        if(lines):
+            yield len(lines), self.parseBlock(lines,width,numeric,vectorised,labels)
+
+    # ****************************************************************************************************
+
+    ## Converts a block of ARFF data rows to numeric columns.
+    #
+    #  @param self The object pointer.
+    #  @param lines The data rows.
+    #  @param width The number of attributes per row.
+    #  @param numeric The indexes of the numeric attributes.
+    #  @param vectorised True if every attribute is numeric or nominal.
+    #  @param labels A compiled pattern matching the non-numeric nominal values, or None.
+    #  @returns a dictionary mapping each numeric attribute index to a numpy array.
+    def parseBlock(self,lines,width,numeric,vectorised,labels):
+        """
+        Converts a block of ARFF data rows to numeric columns. Missing values
+        (?) are converted to NaN. Blocks without quoted or missing values are
+        converted in a single call to numpy, if every attribute is numeric or
+        nominal. Other blocks are split row by row with the csv module.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        lines : list
+            The data rows.
+        width : int
+            The number of attributes per row.
+        numeric : list
+            The indexes of the numeric attributes.
+        vectorised : bool
+            True if every attribute is numeric or nominal.
+        labels : re.RegexObject
+            A compiled pattern matching the nominal values which are not
+            numbers, as whole fields, or None if there are none.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each numeric attribute index to a numpy array.
+
+        """
+        text = ",".join(lines)
+
+        if(vectorised and "?" not in text and "'" not in text and '"' not in text):
+            # The nominal columns are discarded, so any number will do in place
+            # of their values.
+            if(labels is not None):
+                text = labels.sub("0",text)
+
+            values = fromstring(text,dtype='<f8',sep=",")
+
+            # If the block could not be converted (e.g. a nominal value missing
+            # from the header), the rows are split one by one below, which
+            # reports the offending row.
+            if(len(values) == len(lines) * width):
+                values = values.reshape(len(lines),width)
+                return dict((i,values[:,i].copy()) for i in numeric)
+
+        # Nominal or string values may be quoted, so rows are split with the csv module.
+        columns = dict((i,[]) for i in numeric)
+
+        for row in csv.reader(lines,quotechar="'",skipinitialspace=True):
+            if(len(row) != width):
+                raise ValueError("ARFF data row does not match the @attribute header: " + ",".join(row))
+
+            for i in numeric:
+                value = row[i].strip()
+                columns[i].append(nan if value == "?" else float(value))
+
+        return dict((i,array(values,dtype='<f8')) for i, values in columns.iteritems())
+
+    # ****************************************************************************************************
+
+    ## Checks if a string represents a numerical value.
+    #
+    #  @param self The object pointer.
+    #  @param text The string to check.
+    #  @returns True if the string can be converted to a float, else False.
+    def isNumber(self,text):
+        """
+        Checks if a string represents a numerical value.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        text : str
+            The string to check.
+
+        Returns
+        -------
+        bool
+            True if the string can be converted to a float, else False.
+
+        """
+        try:
+            float(text)
+            return True
+        except ValueError:
+            return False
+
+    # ****************************************************************************************************
+
+    ## Builds the cache directory, replacing any stale caches for the same ARFF file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the cache directory to create.
+    def build(self,path):
+        """
+        Builds the cache directory by streaming the ARFF file, appending each
+        block of numeric values to its column file, replacing any stale caches
+        for the same ARFF file. The cache is written to a temporary directory
+        and renamed into place, so readers never observe a partial cache.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the cache directory to create.
+
+        """
+        if(os.path.exists(self.cacheDir) == False):
+            os.makedirs(self.cacheDir)
+
+        temporaryPath = path + "." + str(os.getpid()) + ".tmp"
+
+        if(os.path.exists(temporaryPath)):
+            shutil.rmtree(temporaryPath)
+
+        os.makedirs(temporaryPath)
+
+        arffFile = open(self.arffPath,'r')
+        columnFiles = {}
+
+        try:
+            relation, attributes = self.readHeader(arffFile) # @UnusedVariable
+            numeric = [i for i, (name, attributeType) in enumerate(attributes) if attributeType in self.numericTypes] # @UnusedVariable
+
+            for number, i in enumerate(numeric):
+                columnFiles[i] = open(os.path.join(temporaryPath,str(number) + ".f8"),'wb')
+
+            totalRows = 0
+
+            for rows, columns in self.iterBlocks(arffFile,attributes):
+                for i, values in columns.iteritems():
+                    values.tofile(columnFiles[i])
+
+                totalRows += rows
+
+                if(self.verbose):
+                    print "\tARFF rows cached: ", totalRows
+        finally:
+            arffFile.close()
+
+            for columnFile in columnFiles.values():
+                columnFile.close()
+
+        index = array([(attributes[i][0],totalRows) for i in numeric],dtype=self.index)
+        save(os.path.join(temporaryPath,"columns.npy"),index)
+
+        os.rename(temporaryPath,path)
+
+        # Remove caches built from previous versions of the ARFF file or reader.
+        prefix = os.path.basename(self.arffPath) + "."
+        for filename in os.listdir(self.cacheDir):
+            stalePath = os.path.join(self.cacheDir,filename)
+            if(filename.startswith(prefix) and filename.endswith(".cache") and stalePath != path):
+                shutil.rmtree(stalePath)
+
+    # ****************************************************************************************************
+
+    ## Gets the full path to the cache directory for the current ARFF file and reader version.
+    #
+    #  @param self The object pointer.
+    #  @returns the full path to the cache directory.
+    def cachePath(self):
+        """
+        Gets the full path to the cache directory for the current ARFF file and
+        reader version, i.e.
+
+        <cache dir>/<ARFF file name>.<key>.v<reader version>.cache
+
+        The key is derived from the size and modification time of the ARFF file,
+        rather than a hash of its contents, so that checking a multi-gigabyte
+        file does not require reading it.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The full path to the cache directory.
+
+        """
+        status = os.stat(self.arffPath)
+        key = hashlib.sha1(str(status.st_size) + ":" + repr(status.st_mtime)).hexdigest()[:16]
+        name = os.path.basename(self.arffPath) + "." + key + ".v" + str(self.readerVersion) + ".cache"
+        return os.path.join(self.cacheDir,name)
+
+    # ****************************************************************************************************
+
+    ## Checks if a file is in ARFF format, rather than a parsed CSV file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the file to check.
+    #  @returns True if the first header line of the file is an ARFF keyword, else False.
+    def isArff(self,path):
+        """
+        Checks if a file is in ARFF format, rather than a parsed CSV file, by
+        checking whether its first line that is not blank or a comment starts
+        with an ARFF keyword (@relation or @attribute).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the file to check.
+
+        Returns
+        -------
+        bool
+            True if the file is in ARFF format, else False.
+
+        """
+        sourceFile = open(path,'r')
+
+        try:
+            for line in sourceFile:
+                line = line.strip()
+
+                if(line and not line.startswith("%")):
+                    return line.lower().startswith("@relation") or line.lower().startswith("@attribute")
+        finally:
+            sourceFile.close()
+
+        return False
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    ArffReader().main()
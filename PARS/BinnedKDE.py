@@ -0,0 +1,276 @@
+## @package PARS
+# A module providing a multivariate kernel density estimate, computed on a
+# binned grid via the FFT, which fake pulsar parameters can be jointly
+# sampled from.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                        Binned KDE Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A multivariate Gaussian kernel density estimate (KDE), computed on a   |
+    | regular grid. The observed data is first binned into a histogram on    |
+    | the grid, which is then convolved with the Gaussian kernel via the     |
+    | FFT. The cost of fitting therefore grows with the number of grid       |
+    | cells, rather than with the number of observations, so millions of     |
+    | observed rows can be modelled cheaply.                                 |
+    |                                                                        |
+    | Samples are drawn jointly, by choosing a grid cell according to the    |
+    | smoothed density, then a point uniformly within that cell. Generated   |
+    | samples therefore keep the shape of, and the correlations between,     |
+    | the observed columns.                                                  |
+    |                                                                        |
+    | The kernel bandwidth of each column follows Scott's rule. Positive     |
+    | valued, heavy tailed columns can be modelled in log space. Samples are |
+    | restricted to the range of the observed data.                          |
+    |                                                                        |
+    | Used by CandidateParGenerator.py. Requires numpy.                      |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Numpy Imports:
+from numpy import arange
+from numpy import asarray
+from numpy import clip
+from numpy import column_stack
+from numpy import cumsum
+from numpy import exp
+from numpy import flatnonzero
+from numpy import histogramdd
+from numpy import log10
+from numpy import logical_and
+from numpy import maximum
+from numpy import minimum
+from numpy import pi
+from numpy import searchsorted
+from numpy import unravel_index
+from numpy.fft import fftfreq
+from numpy.fft import irfftn
+from numpy.fft import rfftfreq
+from numpy.fft import rfftn
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Binned KDE Version 1.0
+#
+# A multivariate Gaussian kernel density estimate (KDE), computed on a
+# regular grid. The observed data is first binned into a histogram on
+# the grid, which is then convolved with the Gaussian kernel via the FFT.
+# Samples are drawn jointly, by choosing a grid cell according to the
+# smoothed density, then a point uniformly within that cell.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class BinnedKDE:
+    """
+    Description:
+
+    A multivariate Gaussian kernel density estimate (KDE), computed on a
+    regular grid via the FFT, which can be sampled from jointly.
+
+    """
+
+    ## The grid margin added beyond the observed data, in kernel bandwidths.
+    # This keeps the FFT's circular convolution from wrapping density from
+    # one edge of the grid onto the other.
+    margin = 4.0
+
+    ## Creates an unfitted KDE.
+    #
+    #  @param self The object pointer.
+    #  @param bins The number of grid bins along each column.
+    def __init__(self,bins=32):
+        """
+        Creates an unfitted KDE.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        bins : int
+            The number of grid bins along each column. The grid has bins^d
+            cells for d columns, so this should be kept small for many columns.
+
+        """
+        self.bins = bins
+
+    # ****************************************************************************************************
+
+    ## Fits the KDE to observed data.
+    #
+    #  @param self The object pointer.
+    #  @param columns The observed data, as a list of equal length columns.
+    #  @param logScale For each column, True to model it in log space (optional).
+    #  @returns the kernel bandwidth of each column (in log10 units for log scaled columns).
+    def fit(self,columns,logScale=None):
+        """
+        Fits the KDE to observed data. Columns requested in log space are only
+        modelled in log space if every observed value is positive.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        columns : list
+            The observed data, as a list of equal length columns.
+        logScale : list
+            For each column, True to model it in log space (optional).
+
+        Returns
+        -------
+        numpy.ndarray
+            The kernel bandwidth of each column, in log10 units for columns
+            modelled in log space.
+
+        """
+        data = column_stack([asarray(column,dtype=float) for column in columns])
+        rows, dimensions = data.shape
+
+        if(logScale is None):
+            logScale = [False] * dimensions
+
+        self.logScale = [bool(useLog) and data[:,d].min() > 0 for d, useLog in enumerate(logScale)]
+
+        for d in range(dimensions):
+            if(self.logScale[d]):
+                data[:,d] = log10(data[:,d])
+
+        self.lower = data.min(axis=0)
+        self.upper = data.max(axis=0)
+
+        # Scott's rule, with a small bandwidth for constant columns.
+        bandwidth = data.std(axis=0) * rows ** (-1.0 / (dimensions + 4))
+        constant = bandwidth <= 0
+        bandwidth[constant] = 1e-6 * clip(abs(self.lower[constant]),1.0,None)
+
+        low  = self.lower - self.margin * bandwidth
+        high = self.upper + self.margin * bandwidth
+
+        counts, edges = histogramdd(data,bins=[self.bins] * dimensions,range=zip(low,high)) # @UnusedVariable
+
+        self.low = low
+        self.binWidth = (high - low) / self.bins
+        self.shape = counts.shape
+
+        # Convolve the histogram with the Gaussian kernel, by multiplying its
+        # transform by that of the kernel, which is Gaussian in each column.
+        sigma = bandwidth / self.binWidth
+        transform = rfftn(counts)
+
+        for d in range(dimensions):
+            if(d == dimensions - 1):
+                frequencies = rfftfreq(self.bins)
+            else:
+                frequencies = fftfreq(self.bins)
+
+            kernel = exp(-2.0 * (pi * sigma[d] * frequencies) ** 2)
+
+            axisShape = [1] * dimensions
+            axisShape[d] = len(kernel)
+            transform *= kernel.reshape(axisShape)
+
+        density = irfftn(transform,s=self.shape)
+
+        # Remove FFT round-off, and density outside the observed range.
+        density[density < 0] = 0
+
+        for d in range(dimensions):
+            centres = low[d] + (arange(self.bins) + 0.5) * self.binWidth[d]
+            inside = logical_and(centres >= self.lower[d] - 0.5 * self.binWidth[d],
+                                 centres <= self.upper[d] + 0.5 * self.binWidth[d])
+
+            axisShape = [1] * dimensions
+            axisShape[d] = self.bins
+            density *= inside.reshape(axisShape)
+
+        # Only cells with non-zero density need be kept to sample from.
+        density = density.ravel()
+        self.cells = flatnonzero(density)
+        self.cdf = cumsum(density[self.cells])
+        self.cdf /= self.cdf[-1]
+
+        return bandwidth
+
+    # ****************************************************************************************************
+
+    ## Draws joint samples from the KDE.
+    #
+    #  @param self The object pointer.
+    #  @param count The number of samples to draw.
+    #  @param randomState The random stream to draw samples from.
+    #  @returns the samples as a numpy array, with a row per sample and a column per fitted column.
+    def sample(self,count,randomState):
+        """
+        Draws joint samples from the KDE, by choosing grid cells according to
+        the smoothed density, then a point uniformly within the part of each
+        cell inside the range of the observed data. Samples are drawn within
+        the range, rather than clipped to it, so the edges of the range never
+        collect a point mass of samples.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        count : int
+            The number of samples to draw.
+        randomState : numpy.random.RandomState
+            The random stream to draw samples from.
+
+        Returns
+        -------
+        numpy.ndarray
+            The samples, with a row per sample and a column per fitted column.
+
+        """
+        dimensions = len(self.shape)
+
+        chosen = searchsorted(self.cdf,randomState.random_sample(count),side='right')
+        chosen = self.cells[clip(chosen,0,len(self.cells) - 1)]
+        positions = column_stack(unravel_index(chosen,self.shape))
+
+        # Cells at the edge of the grid's non-zero density straddle the observed
+        # range, so draw within the intersection of the cell and the range.
+        cellLow  = maximum(self.low + positions * self.binWidth,self.lower)
+        cellHigh = minimum(self.low + (positions + 1) * self.binWidth,self.upper)
+
+        samples = cellLow + randomState.random_sample((count,dimensions)) * (cellHigh - cellLow)
+
+        for d in range(dimensions):
+            if(self.logScale[d]):
+                samples[:,d] = 10.0 ** samples[:,d]
+
+        return samples
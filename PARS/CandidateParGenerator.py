@@ -32,13 +32,23 @@
     |                                                                        |
     | FakePulsar_<number>_<DM>_<Period (ms)>_<SNR>.par                       |
     |                                                                        |
+    | The parameters of every fake pulsar (its number, period, DM, duty      |
+    | cycle, width, S/N, par path and seed) are also written to a single     |
+    | typed manifest, <dir>/FakePulsar.manifest.npy (see PARS/Manifest.py).  |
+    | Later pipeline stages join on the manifest, rather than parsing the    |
+    | parameters out of file names.                                          |
+    |                                                                        |
     | Running this code will overwrite existing par files for both pulsar    |
     | and non-pulsar examples if automatically generated file names match    |
-    | the names of existing files.                                           |
+    | the names of existing files. Par files whose content is unchanged are  |
+    | not rewritten. With --prune, par files previously generated by this    |
+    | code (FakePulsar_* and J/B pulsar names) which were not generated by   |
+    | the run are removed. The number of par files written, unchanged and    |
+    | removed is reported.                                                   |
     |                                                                        |
     | The code is compatible with python version 2.7. It requires scipy      |
-    | version 0.15 or later to function. Numpy libraries and matplotlib are  |
-    | also required.                                                         |
+    | version 0.16 or later to function. Numpy libraries are also required.  |
+    | Matplotlib is only required to create plots (-v or --report).          |
     |                                                                        |
     **************************************************************************
     | Author: Rob Lyon                                                       |
@@ -68,8 +78,42 @@
     |             0.315873190853,3.165827392,0,0,0                           |
     |             ...                                                        |
     |                                                                        |
+    | --psrcat (string) full path to an ATNF pulsar catalog database file.   |
+    |             This may be used instead of --atnf. The catalog is loaded  |
+    |             via the binary catalog cache (see ATNF/CatalogCache.py),   |
+    |             which is rebuilt automatically if the catalog changes.     |
+    |                                                                        |
+    | --changes (string) full path to a changeset file created by            |
+    |             ATNFDataExtractor.py (-c flag). If supplied, only the par  |
+    |             files of added or modified catalog pulsars are written,    |
+    |             and the par files of removed pulsars are deleted.          |
+    |                                                                        |
+    | --p0range (string) only create par files for catalog pulsars with a    |
+    |             period (s) in the range <min>:<max>, e.g. 0.001:0.03.      |
+    |                                                                        |
+    | --dmrange (string) only create par files for catalog pulsars with a DM |
+    |             in the range <min>:<max>, e.g. 50:500.                     |
+    |                                                                        |
+    | --w50range (string) only create par files for catalog pulsars with a   |
+    |             W50 (ms) in the range <min>:<max>.                         |
+    |                                                                        |
+    | --cone (string) only create par files for catalog pulsars within a sky |
+    |             region, given as <GL>:<GB>:<radius> in degrees. Selections |
+    |             are made using ATNF/CatalogQuery.py.                       |
+    |                                                                        |
     | -s (int)    the number of output samples to generate (1000 by default).|
     |                                                                        |
+    | --chunk (int) the number of samples to generate, write to the output   |
+    |             file and turn into par files at a time. Memory use is      |
+    |             bounded by this block size, so very large numbers of       |
+    |             samples can be generated. The samples do not depend on the |
+    |             block size. By default all samples form a single block.    |
+    |             Otherwise the block size is rounded up to a multiple of    |
+    |             65536. Sample plots (-v) are only created for one block.   |
+    |                                                                        |
+    | -j (int)    the number of processes used to generate samples (1 by     |
+    |             default). The samples do not depend on this value.         |
+    |                                                                        |
     | -m (string) full path to an ARFF parsed ML training set file. The file |
     |             should contain data describing individual training set     |
     |             entries as follows:                                        |
@@ -86,6 +130,15 @@
     |             Note: the script ATNFDataExtractor.py can be used to       |
     |                   generate files in the desired format.                |
     |                                                                        |
+    |             A native ARFF file may be supplied instead. Its numeric    |
+    |             attributes are streamed into a memory mapped columnar      |
+    |             cache (see PARS/ArffReader.py), which later runs reuse.    |
+    |                                                                        |
+    | --arffcols (string) the names of the ARFF attributes holding the       |
+    |             period (ms), S/N, DM, pulse width (ms) and duty cycle,     |
+    |             separated by colons. By default the column names of the    |
+    |             parsed file format above are used.                         |
+    |                                                                        |
     | --seed (int) the random seed (1 by default).                           |
     |                                                                        |
     | --snr (string) the data distribution to use to model fake pulsar S/Ns. |
@@ -99,14 +152,18 @@
     |                                                                        |
     |               key         params                  Name                 |
     |               beta        a, b, loc, scale        Beta dist.           |
+    |               binom       n, p, loc               Binomial dist.       |
     |               expon       loc, scale              exponential dist.    |
     |               gamma       shape, loc, scale       Gamma dist.          |
     |               logistic    loc, scale              logistic dist.       |
-    |               lognorm     s, mean, sigma          log-normal dist.     |
+    |               lognorm     s, loc, scale           log-normal dist.     |
     |               norm        loc, scale              normal dist.         |
     |               truncnorm   min, max,loc, scale     normal dist.         |
     |               rayleigh    loc, scale              Rayleigh dist.       |
-    |               uniform     min, max                uniform dist.        |
+    |               uniform     loc, scale              uniform dist.        |
+    |                                                                        |
+    |               Further distributions can be added to the registry in    |
+    |               PARS/Samplers.py.                                        |
     |                                                                        |
     | --snrparams (string) the parameters of the S/N distribution. These must|
     |                     be provided concatenated together in a single      |
@@ -160,6 +217,52 @@
     | --units      (string) the UNITS value to use in the par files.         |
     |              By default the value TDB is used.                         |
     |                                                                        |
+    | --threads    (int) the number of threads used to write par files. By   |
+    |              default par files are written from a single thread.       |
+    |                                                                        |
+    | --scipy      (boolean) draw samples via scipy.stats rather than the    |
+    |              fast numpy samplers (see PARS/Samplers.py). The two give  |
+    |              different samples for the same seed.                      |
+    |                                                                        |
+    | --pack       (boolean) write the fake pulsar par files to a single     |
+    |              indexed pack file, <dir>/FakePulsar.pack, rather than one |
+    |              file per fake pulsar (see PARS/ParPack.py).               |
+    |                                                                        |
+    | --prune      (boolean) remove par files from earlier runs which were   |
+    |              not generated by this run. Only FakePulsar_*.par files,   |
+    |              and pars named after J/B pulsars, are ever removed. Note  |
+    |              this includes the pars of catalog pulsars outside the     |
+    |              current selection.                                        |
+    |                                                                        |
+    | --report     (string) full path to a directory to render plots into.   |
+    |              Histograms and box-plots are saved as PNG files, listed   |
+    |              in <dir>/index.html, by a background process, so the run  |
+    |              is not blocked. Without this flag, -v shows each plot in  |
+    |              a window, and the run waits until the window is closed.   |
+    |                                                                        |
+    | --kde        (boolean) with -m, sample the period, DM, duty cycle and  |
+    |              S/N of each fake pulsar jointly, from a kernel density    |
+    |              estimate of the ARFF data computed on a binned grid via   |
+    |              the FFT (see PARS/BinnedKDE.py). This keeps the shape of, |
+    |              and correlations between, the observed parameters. By     |
+    |              default, periods and duty cycles are sampled uniformly,   |
+    |              and DMs and S/Ns from fitted exponentials.                |
+    |                                                                        |
+    | --kdebins    (int) the number of KDE grid bins per parameter (32 by    |
+    |              default). The grid has kdebins^4 cells.                   |
+    |                                                                        |
+    | --p0bounds, --dmbounds, --dutybounds, --snrbounds (string) the valid   |
+    |              range of fake pulsar periods (s), DMs, duty cycles and    |
+    |              S/Ns, given as <min>:<max>, where min < value <= max. By  |
+    |              default periods, DMs and S/Ns must be positive, and duty  |
+    |              cycles in the range (0,1]. Pulse widths must also be less |
+    |              than the period. Fake pulsars breaking these constraints  |
+    |              are rejected and redrawn, and the acceptance rate of the  |
+    |              candidates drawn is reported.                             |
+    |                                                                        |
+    | --retries    (int) the number of times rejected fake pulsars are       |
+    |              redrawn before giving up (20 by default).                 |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -176,22 +279,31 @@ from optparse import OptionParser
 
 import os, sys
 
+from multiprocessing import Pool
+
 # Numpy Imports:
 from numpy import ceil
-from numpy import percentile
-from numpy import mean
-from numpy import random
-from numpy import median
-from numpy import count_nonzero
+from numpy import asarray
+from numpy import isnan
+from numpy import concatenate
+from numpy.random import RandomState
+from numpy import flatnonzero
 
 # Scipy Imports:
-from scipy import std
 from scipy import stats
 from scipy import arange
 
 
 # Other imports
-import matplotlib.pyplot as plt
+
+from ParPack import ParPack
+from Manifest import Manifest
+from ArffReader import ArffReader
+from BinnedKDE import BinnedKDE
+from ParWriter import ParWriter
+from ReportRenderer import ReportRenderer
+from Samplers import registry
+from StreamingStatistics import StreamingStatistics
 
 # ******************************
 #
@@ -221,13 +333,23 @@ import matplotlib.pyplot as plt
 #
 # FakePulsar_<number>_<DM>_<Period (ms)>_<SNR>.par
 #
+# The parameters of every fake pulsar (its number, period, DM, duty
+# cycle, width, S/N, par path and seed) are also written to a single
+# typed manifest, <dir>/FakePulsar.manifest.npy (see PARS/Manifest.py).
+# Later pipeline stages join on the manifest, rather than parsing the
+# parameters out of file names.
+#
 # Running this code will overwrite existing par files for both pulsar
 # and non-pulsar examples if automatically generated file names match
-# the names of existing files.
+# the names of existing files. Par files whose content is unchanged are
+# not rewritten. With --prune, par files previously generated by this
+# code (FakePulsar_* and J/B pulsar names) which were not generated by
+# the run are removed. The number of par files written, unchanged and
+# removed is reported.
 #
 # The code is compatible with python version 2.7. It requires scipy
-# version 0.15 or later to function. Numpy libraries and matplotlib are
-# also required.
+# version 0.16 or later to function. Numpy libraries are also required.
+# Matplotlib is only required to create plots (-v or --report).
 #
 #
 # Author: Rob Lyon
@@ -257,8 +379,42 @@ import matplotlib.pyplot as plt
 #             0.315873190853,3.165827392,0,0,0
 #             ...
 #
+# --psrcat (string) full path to an ATNF pulsar catalog database file.
+#             This may be used instead of --atnf. The catalog is loaded
+#             via the binary catalog cache (see ATNF/CatalogCache.py),
+#             which is rebuilt automatically if the catalog changes.
+#
+# --changes (string) full path to a changeset file created by
+#             ATNFDataExtractor.py (-c flag). If supplied, only the par
+#             files of added or modified catalog pulsars are written,
+#             and the par files of removed pulsars are deleted.
+#
+# --p0range (string) only create par files for catalog pulsars with a
+#             period (s) in the range <min>:<max>, e.g. 0.001:0.03.
+#
+# --dmrange (string) only create par files for catalog pulsars with a DM
+#             in the range <min>:<max>, e.g. 50:500.
+#
+# --w50range (string) only create par files for catalog pulsars with a
+#             W50 (ms) in the range <min>:<max>.
+#
+# --cone (string) only create par files for catalog pulsars within a sky
+#             region, given as <GL>:<GB>:<radius> in degrees. Selections
+#             are made using ATNF/CatalogQuery.py.
+#
 # -s (int)    the number of output samples to generate (1000 by default).
 #
+# --chunk (int) the number of samples to generate, write to the output
+#             file and turn into par files at a time. Memory use is
+#             bounded by this block size, so very large numbers of
+#             samples can be generated. The samples do not depend on the
+#             block size. By default all samples form a single block.
+#             Otherwise the block size is rounded up to a multiple of
+#             65536. Sample plots (-v) are only created for one block.
+#
+# -j (int)    the number of processes used to generate samples (1 by
+#             default). The samples do not depend on this value.
+#
 # -m (string) full path to an ARFF parsed ML training set file. The file
 #             should contain data describing individual training set
 #             entries as follows:
@@ -272,6 +428,15 @@ import matplotlib.pyplot as plt
 #             using random distributions specified using the --snr, --p0,
 #             or --dm flags.
 #
+#             A native ARFF file may be supplied instead. Its numeric
+#             attributes are streamed into a memory mapped columnar
+#             cache (see PARS/ArffReader.py), which later runs reuse.
+#
+# --arffcols (string) the names of the ARFF attributes holding the
+#             period (ms), S/N, DM, pulse width (ms) and duty cycle,
+#             separated by colons. By default the column names of the
+#             parsed file format above are used.
+#
 # --seed (int) the random seed (1 by default).
 #
 # --snr (string) the data distribution to use to model fake pulsar S/Ns.
@@ -285,14 +450,18 @@ import matplotlib.pyplot as plt
 #
 #               key         params                  Name
 #               beta        a, b, loc, scale        Beta dist.
+#               binom       n, p, loc               Binomial dist.
 #               expon       loc, scale              exponential dist.
 #               gamma       shape, loc, scale       Gamma dist.
 #               logistic    loc, scale              logistic dist.
-#               lognorm     s, mean, sigma          log-normal dist.
+#               lognorm     s, loc, scale           log-normal dist.
 #               norm        loc, scale              normal dist.
 #               truncnorm   min, max,loc, scale     normal dist.
 #               rayleigh    loc, scale              Rayleigh dist.
-#               uniform     min, max                uniform dist.
+#               uniform     loc, scale              uniform dist.
+#
+#               Further distributions can be added to the registry in
+#               PARS/Samplers.py.
 #
 # --snrparams (string) the parameters of the S/N distribution. These must
 #                     be provided concatenated together in a single
@@ -346,6 +515,52 @@ import matplotlib.pyplot as plt
 # --units      (string) the UNITS value to use in the par files.
 #              By default the value TDB is used.
 #
+# --threads    (int) the number of threads used to write par files. By
+#              default par files are written from a single thread.
+#
+# --scipy      (boolean) draw samples via scipy.stats rather than the
+#              fast numpy samplers (see PARS/Samplers.py). The two give
+#              different samples for the same seed.
+#
+# --pack       (boolean) write the fake pulsar par files to a single
+#              indexed pack file, <dir>/FakePulsar.pack, rather than one
+#              file per fake pulsar (see PARS/ParPack.py).
+#
+# --prune      (boolean) remove par files from earlier runs which were
+#              not generated by this run. Only FakePulsar_*.par files,
+#              and pars named after J/B pulsars, are ever removed. Note
+#              this includes the pars of catalog pulsars outside the
+#              current selection.
+#
+# --report     (string) full path to a directory to render plots into.
+#              Histograms and box-plots are saved as PNG files, listed
+#              in <dir>/index.html, by a background process, so the run
+#              is not blocked. Without this flag, -v shows each plot in
+#              a window, and the run waits until the window is closed.
+#
+# --kde        (boolean) with -m, sample the period, DM, duty cycle and
+#              S/N of each fake pulsar jointly, from a kernel density
+#              estimate of the ARFF data computed on a binned grid via
+#              the FFT (see PARS/BinnedKDE.py). This keeps the shape of,
+#              and correlations between, the observed parameters. By
+#              default, periods and duty cycles are sampled uniformly,
+#              and DMs and S/Ns from fitted exponentials.
+#
+# --kdebins    (int) the number of KDE grid bins per parameter (32 by
+#              default). The grid has kdebins^4 cells.
+#
+# --p0bounds, --dmbounds, --dutybounds, --snrbounds (string) the valid
+#              range of fake pulsar periods (s), DMs, duty cycles and
+#              S/Ns, given as <min>:<max>, where min < value <= max. By
+#              default periods, DMs and S/Ns must be positive, and duty
+#              cycles in the range (0,1]. Pulse widths must also be less
+#              than the period. Fake pulsars breaking these constraints
+#              are rejected and redrawn, and the acceptance rate of the
+#              candidates drawn is reported.
+#
+# --retries    (int) the number of times rejected fake pulsars are
+#              redrawn before giving up (20 by default).
+#
 #
 # License:
 #
@@ -378,13 +593,30 @@ class CandidateParGenerator:
 
     Running this code will overwrite existing par files for both pulsar
     and non-pulsar examples if automatically generated file names match
-    the names of existing files.
+    the names of existing files. Par files whose content is unchanged are
+    not rewritten. With --prune, par files previously generated by this
+    code which were not generated by the run are removed.
 
     The code is compatible with python version 2.7. It requires scipy
-    version 0.15 or later to function. Numpy libraries and matplotlib are
-    also required.
+    version 0.16 or later to function. Numpy libraries are also required.
+    Matplotlib is only required to create plots (-v or --report).
     """
 
+    ## The number of samples drawn from each set of random streams (see createStreams).
+    streamBlockSize = 65536
+
+    ## The names of the constraints fake pulsar parameters must meet (see checkConstraints).
+    constraints = ["P0","DM","DUTY","SNR","WIDTH"]
+
+    ## The largest number of candidates drawn per retry, for each rejected fake pulsar.
+    maxOversampling = 1000
+
+    ## The largest number of candidates drawn in a single retry.
+    maxCandidates = 1048576
+
+    ## The fake pulsar parameters summarised, in the order returned by sampleParameters().
+    summaryColumns = ["P0","DM","DUTY","WIDTH","SNR"]
+
     # ******************************
     #
     # MAIN METHOD AND ENTRY POINT.
@@ -432,6 +664,12 @@ class CandidateParGenerator:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("--atnf", action="store", dest="atnfPath",help='Path to a pulsar catalog parsed file.',default="")
+        parser.add_option("--psrcat", action="store", dest="psrcatPath",help='Path to a pulsar catalog database file, loaded via the catalog cache.',default="")
+        parser.add_option("--changes", action="store", dest="changesPath",help='Path to a catalog changeset file, only affected pars are rebuilt.',default="")
+        parser.add_option("--p0range", action="store", dest="p0Range",help='The period range of catalog pulsars to select, <min>:<max> (optional).',default="")
+        parser.add_option("--dmrange", action="store", dest="dmRange",help='The DM range of catalog pulsars to select, <min>:<max> (optional).',default="")
+        parser.add_option("--w50range", action="store", dest="w50Range",help='The W50 range of catalog pulsars to select, <min>:<max> (optional).',default="")
+        parser.add_option("--cone", action="store", dest="cone",help='The sky region of catalog pulsars to select, <GL>:<GB>:<radius> (optional).',default="")
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
         parser.add_option("-s", type="int", dest="samples",help='The total number of samples to generate (optional).',default=1000)
         parser.add_option("--seed", type="int", dest="seed",help='The seed value for random number generation (optional).',default=1)
@@ -447,27 +685,64 @@ class CandidateParGenerator:
         parser.add_option("--tzrmjd", action="store", dest="tzrmjd",help='The tzrmjd value to use in the par files',default="56000.0")
         parser.add_option("--tzrfreq", action="store", dest="tzrfreq",help='The tzrfreq value to use in the par files',default="1000.0")
         parser.add_option("--units", action="store", dest="units",help='The units to use in the par files',default="TDB")
+        parser.add_option("--threads", type="int", dest="threads",help='The number of threads used to write par files (optional).',default=1)
+        parser.add_option("--chunk", type="int", dest="chunkSize",help='The number of samples to generate per block (optional).',default=0)
+        parser.add_option("-j", type="int", dest="processes",help='The number of processes used to generate samples (optional).',default=1)
+        parser.add_option("--arffcols", action="store", dest="arffColumns",help='The ARFF attributes holding the period, S/N, DM, width and duty cycle (optional).',default="Period (ms):S/N:DM:Pulse Width (ms):Duty Cycle")
+        parser.add_option("--p0bounds", action="store", dest="p0Bounds",help='The valid period range (s) of fake pulsars, <min>:<max> (optional).',default="0:inf")
+        parser.add_option("--dmbounds", action="store", dest="dmBounds",help='The valid DM range of fake pulsars, <min>:<max> (optional).',default="0:inf")
+        parser.add_option("--dutybounds", action="store", dest="dutyBounds",help='The valid duty cycle range of fake pulsars, <min>:<max> (optional).',default="0:1")
+        parser.add_option("--snrbounds", action="store", dest="snrBounds",help='The valid S/N range of fake pulsars, <min>:<max> (optional).',default="0:inf")
+        parser.add_option("--retries", type="int", dest="retries",help='The number of times invalid fake pulsars are redrawn (optional).',default=20)
+        parser.add_option("--kde", action="store_true", dest="kde",help='Sample jointly from a binned KDE of the ARFF data (optional).',default=False)
+        parser.add_option("--kdebins", type="int", dest="kdeBins",help='The number of KDE grid bins per parameter (optional).',default=32)
+        parser.add_option("--report", action="store", dest="reportDir",help='Path to a directory to render plots into, without blocking (optional).',default="")
+        parser.add_option("--scipy", action="store_true", dest="scipy",help='Draw samples via scipy.stats rather than numpy (optional).',default=False)
+        parser.add_option("--pack", action="store_true", dest="pack",help='Write fake pulsar pars to a single indexed pack file (optional).',default=False)
+        parser.add_option("--prune", action="store_true", dest="prune",help='Remove generated par files not produced by this run (optional).',default=False)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose        = args.verbose
         self.atnfParsedPath = args.atnfPath
+        self.psrcatPath     = args.psrcatPath
+        self.changesPath    = args.changesPath
+        self.p0Range        = args.p0Range
+        self.dmRange        = args.dmRange
+        self.w50Range       = args.w50Range
+        self.cone           = args.cone
         self.arffParsedPath = args.arffPath
         self.outputPath     = args.outputPath
         self.outputDir      = args.outputDir
         self.samples        = args.samples
+        self.chunkSize      = args.chunkSize
+        self.processes      = args.processes
         self.seed           = args.seed
 
         self.pepoch         = args.pepoch
         self.tzrmjd         = args.tzrmjd
         self.tzrfreq        = args.tzrfreq
         self.units          = args.units
-
-        # Variables for managing distributions
-        self.distributions  = ["beta","binom","expon","gamma","logistic","lognorm","norm","truncnorm","rayleigh","uniform"]
-        self.params         = [4,3,2,3,2,3,2,4,2,2]
+        self.threads        = args.threads
+        self.pack           = args.pack
+        self.prune          = args.prune
+        self.reportDir      = args.reportDir
+
+        # Plots are shown interactively if verbose, or rendered headless into a report directory.
+        self.plotting       = self.verbose or self.reportDir != ""
+        self.renderer       = ReportRenderer(self.reportDir)
+
+        # Variables for managing distributions, see Samplers.py.
+        self.distributions  = registry.names()
+        self.params         = [len(registry.parameters(dist)) for dist in self.distributions]
         self.distDict        = dict(zip(self.distributions, self.params))
+        self.fastSampling   = not args.scipy
+        self.arffColumns    = args.arffColumns.split(":")
+        self.retries        = args.retries
+        self.kde            = args.kde
+        self.kdeBins        = args.kdeBins
+        self.jointSampler   = None
 
 
         self.snrDist  = args.snrDist
@@ -484,6 +759,7 @@ class CandidateParGenerator:
         # auto generation.
         self.autoGenerate = True
         self.parseATNFFile = False
+        self.useCatalogCache = False
 
         try:
             # Parse distribution parameters...
@@ -505,6 +781,12 @@ class CandidateParGenerator:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tParsed Pulsar catalog file path:",self.atnfParsedPath
+        print "\tPulsar catalog database file path:",self.psrcatPath
+        print "\tCatalog changeset file path:",self.changesPath
+        print "\tCatalog period range:",self.p0Range
+        print "\tCatalog DM range:",self.dmRange
+        print "\tCatalog W50 range:",self.w50Range
+        print "\tCatalog sky region:",self.cone
         print "\tParsed ARFF file path:",self.arffParsedPath
         print "\tOutput file path:",self.outputPath
         print "\tOutput file dir:",self.outputDir
@@ -513,6 +795,9 @@ class CandidateParGenerator:
         print "\tTZRMJD value for par:", self.tzrmjd
         print "\tTZRFREQ value for par:", self.tzrfreq
         print "\tUNITS value for par: ", self.units
+        print "\tPar writing threads: ", self.threads
+        print "\tPack fake pulsar pars: ", self.pack
+        print "\tPrune stale par files: ", self.prune
 
 
         print "\tS/N modelling dist:", self.snrDist
@@ -524,12 +809,38 @@ class CandidateParGenerator:
         print "\tDuty cycle modelling dist:", self.dutyDist
         print "\tDuty cycle dist parameters:", self.dutyDistParams
         print "\tAuto generate fake pulsars from distributions: ", self.autoGenerate
+        print "\tSamples per block: ", self.chunkSize
+        print "\tSampling processes: ", self.processes
+        print "\tFast numpy sampling: ", self.fastSampling
+        print "\tReport directory: ", self.reportDir
+        print "\tARFF attributes used: ", self.arffColumns
+        print "\tValid period range: ", args.p0Bounds
+        print "\tValid DM range: ", args.dmBounds
+        print "\tValid duty cycle range: ", args.dutyBounds
+        print "\tValid S/N range: ", args.snrBounds
+        print "\tRetries for invalid fake pulsars: ", self.retries
+        print "\tJoint KDE sampling of ARFF data: ", self.kde
+        print "\tKDE grid bins per parameter: ", self.kdeBins
         print "\tRandom seed:",self.seed
 
         # Check arguments for validity...
         if(os.path.isfile(self.atnfParsedPath) == True):
             self.parseATNFFile = True
 
+        if(os.path.isfile(self.psrcatPath) == True):
+            self.parseATNFFile = True
+            self.useCatalogCache = True
+
+        # If a catalog changeset is supplied, only the pars of affected pulsars are rebuilt.
+        self.changes = None
+        if(self.changesPath):
+            if(os.path.isfile(self.changesPath) == False):
+                print "\n\tCatalog changeset file not found at: ", self.changesPath
+                print "\tExiting..."
+                sys.exit()
+
+            self.changes = self.readChangeset(self.changesPath)
+
         if(os.path.isfile(self.arffParsedPath) == True):
             print "\n\tValid ARFF file supplied, fake pulsars will be generated from this data file."
             self.autoGenerate = False
@@ -561,6 +872,8 @@ class CandidateParGenerator:
         else:
             self.pulsarParFileDir = self.outputDir + "/Pulsar"
             self.fakePulsarParFileDir = self.outputDir + "/FakePulsar"
+            self.fakePulsarParPackPath = self.outputDir + "/FakePulsar.pack"
+            self.fakePulsarManifestPath = self.outputDir + "/FakePulsar.manifest.npy"
 
             # Create new output directories
             if(os.path.exists(self.pulsarParFileDir) == False):
@@ -575,6 +888,48 @@ class CandidateParGenerator:
             print "\tExiting..."
             sys.exit()
 
+        if(self.processes < 1):
+            print "\n\tSupplied number of sampling processes invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        # Check the valid parameter ranges.
+        self.bounds = {}
+
+        for name, label, bounds in [("P0","period",args.p0Bounds),("DM","DM",args.dmBounds),
+                                    ("DUTY","duty cycle",args.dutyBounds),("SNR","S/N",args.snrBounds)]:
+            try:
+                lower, upper = map(float,bounds.split(":"))
+            except ValueError:
+                lower, upper = 1, 0
+
+            if(lower >= upper):
+                print "\n\tInvalid ", label, " range supplied: ", bounds
+                print "\tExiting..."
+                sys.exit()
+
+            self.bounds[name] = (lower,upper)
+
+        if(self.retries < 0):
+            print "\n\tSupplied number of retries invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        if(len(self.arffColumns) != 5):
+            print "\n\tFive ARFF attributes must be supplied via the --arffcols flag - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        if(self.kdeBins < 2):
+            print "\n\tSupplied number of KDE grid bins invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        if(self.threads < 1):
+            print "\n\tSupplied number of par writing threads invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
         # Now check supplied distribution parameters
         if(self.snrDist not in self.distributions):
             print "\tInvalid S/N distribution supplied: ", self.snrDist
@@ -619,23 +974,18 @@ class CandidateParGenerator:
                         print "\tRequired ", value , " but received ", len(self.dmDistParams)
                         canProceed = False
 
+                if(self.dutyDist == key):
+                    if(len(self.dutyDistParams) != int(value)):
+                        print "\tIncorrect number of parameters supplied for the ", key , " duty cycle distribution."
+                        print "\tRequired ", value , " but received ", len(self.dutyDistParams)
+                        canProceed = False
+
         # Check supplied distribution parameters.
         if(canProceed == False):
             print "\tCould not proceed to fake pulsar parameter generation!"
             print "\tExiting..."
             sys.exit()
 
-        # Now seed random number generator
-        random.seed(seed=self.seed)
-
-        # Now we know the input files exist...
-
-        # Clear the output file of text.
-        self.clearFile(self.outputPath)
-
-        # Write a header to the output file...
-        self.appendToFile(self.outputPath,"Period (s),DM,Pulse Width (s),Duty Cycle,SNR\n")
-
         # ****************************************
         #
         #
@@ -666,7 +1016,13 @@ class CandidateParGenerator:
         ATNF_W10S    = []
         ATNF_W50S    = []
 
-        if(self.parseATNFFile):
+        if(self.useCatalogCache):
+            # Load the catalog columns from the binary cache, rebuilding the
+            # cache first if the catalog file has changed.
+            ATNF_NAMES, ATNF_RAJS, ATNF_DECJS, ATNF_PERIODS, ATNF_FREQS, ATNF_DMS, ATNF_W10S, ATNF_W50S = \
+                self.loadCatalogCache(self.psrcatPath)
+
+        elif(self.parseATNFFile):
             # Read parsed pulsar catalog file, extract useful variables:
             # Period, Frequency, DM, pulse width
             self.atnfFile = open(self.atnfParsedPath,'r') # Read only access
@@ -699,27 +1055,39 @@ class CandidateParGenerator:
 
             self.atnfFile.close()
 
-            # Print some details of the data collected...
-            print "\n\t+----- ATNF DATA -----+"
-            print "\tPeriods parsed     : ", len(ATNF_PERIODS) , " Mean: ", mean(ATNF_PERIODS) , \
-                " Min: ", min(ATNF_PERIODS) , " Max: ", max(ATNF_PERIODS) , \
-                " Zero elements: ", len(ATNF_PERIODS) - count_nonzero(ATNF_PERIODS)
+        # Restrict the catalog pulsars to those meeting the selection criteria, if any.
+        if(self.parseATNFFile and (self.p0Range or self.dmRange or self.w50Range or self.cone)):
 
-            print "\tFrequencies parsed : ", len(ATNF_FREQS)   , " Mean: ", mean(ATNF_FREQS) , \
-                " Min: ", min(ATNF_FREQS) , " Max: ", max(ATNF_FREQS) ,\
-                " Zero elements: ", len(ATNF_FREQS) - count_nonzero(ATNF_FREQS)
+            if(self.useCatalogCache):
+                selected = self.selectCatalogEntries(self.psrcatPath)
+            else:
+                selected = self.selectCatalogEntries(self.atnfParsedPath)
+
+            rows = [row for row, name in enumerate(ATNF_NAMES) if name in selected]
 
-            print "\tDMs parsed         : ", len(ATNF_DMS)     , " Mean: ", mean(ATNF_DMS) , \
-                " Min: ", min(ATNF_DMS) , " Max: ", max(ATNF_DMS) , \
-                " Zero elements: ", len(ATNF_DMS) - count_nonzero(ATNF_DMS)
+            ATNF_NAMES   = [ATNF_NAMES[row] for row in rows]
+            ATNF_RAJS    = [ATNF_RAJS[row] for row in rows]
+            ATNF_DECJS   = [ATNF_DECJS[row] for row in rows]
+            ATNF_PERIODS = [ATNF_PERIODS[row] for row in rows]
+            ATNF_FREQS   = [ATNF_FREQS[row] for row in rows]
+            ATNF_DMS     = [ATNF_DMS[row] for row in rows]
+            ATNF_W10S    = [ATNF_W10S[row] for row in rows]
+            ATNF_W50S    = [ATNF_W50S[row] for row in rows]
 
-            print "\t10% Widths parsed  : ", len(ATNF_W10S)    , " Mean: ", mean(ATNF_W10S) , \
-                " Min: ", min(ATNF_W10S) , " Max: ", max(ATNF_W10S) , \
-                " Zero elements: ", len(ATNF_W10S) - count_nonzero(ATNF_W10S)
+            print "\n\tCatalog pulsars selected: ", len(ATNF_NAMES)
 
-            print "\t50% Widths parsed  : ", len(ATNF_W50S)    , " Mean: ", mean(ATNF_W50S) , \
-                " Min: ", min(ATNF_W50S) , " Max: ", max(ATNF_W50S) , \
-                " Zero elements: ", len(ATNF_W50S) - count_nonzero(ATNF_W50S)
+            if(len(ATNF_NAMES) == 0):
+                print "\tNo catalog pulsars meet the selection criteria."
+                print "\tExiting..."
+                sys.exit()
+
+        if(self.parseATNFFile):
+            # Print some details of the data collected...
+            print "\n\t+----- ATNF DATA -----+"
+            for label, data in [("Periods parsed     : ",ATNF_PERIODS),("Frequencies parsed : ",ATNF_FREQS),
+                                ("DMs parsed         : ",ATNF_DMS),("10% Widths parsed  : ",ATNF_W10S),
+                                ("50% Widths parsed  : ",ATNF_W50S)]:
+                self.printSummary(label,StreamingStatistics().update(data))
 
         # ****************************************
         #            Parse ARFF file
@@ -731,8 +1099,15 @@ class CandidateParGenerator:
         ARFF_DMS     = []
         ARFF_WIDTHS  = []
         ARFF_DCYCLE  = []
+        ARFF_SUMMARIES = {}
 
-        if(os.path.isfile(self.arffParsedPath) == True):
+        if(os.path.isfile(self.arffParsedPath) == True and ArffReader().isArff(self.arffParsedPath)):
+
+            # Read the columns of a native ARFF file, via its memory mapped cache.
+            ARFF_PERIODS, ARFF_FREQS, ARFF_SNRS, ARFF_DMS, ARFF_WIDTHS, ARFF_DCYCLE = \
+                self.loadArffColumns(self.arffParsedPath)
+
+        elif(os.path.isfile(self.arffParsedPath) == True):
 
             # Now read the parsed ARFF file, extract the useful variables:
             # Period (ms),S/N,DM,Pulse Width (ms),Duty Cycle
@@ -764,458 +1139,285 @@ class CandidateParGenerator:
 
             self.arffFile.close()
 
+        if(os.path.isfile(self.arffParsedPath) == True):
             # Print some details of the data collected...
 
             print "\n\t+----- ARFF DATA -----+"
-            print "\tPeriods parsed     : ", len(ARFF_PERIODS) , " Mean: ", mean(ARFF_PERIODS) , \
-                " Min: ", min(ARFF_PERIODS) , " Max: ", max(ARFF_PERIODS) , \
-                " Zero elements: ", len(ARFF_PERIODS) - count_nonzero(ARFF_PERIODS)
-
-            print "\tFreqs. parsed      : ", len(ARFF_FREQS) , " Mean: ", mean(ARFF_FREQS) , \
-                " Min: ", min(ARFF_FREQS) , " Max: ", max(ARFF_FREQS) , \
-                " Zero elements: ", len(ARFF_FREQS) - count_nonzero(ARFF_FREQS)
-
-            print "\tS/Ns parsed        : ", len(ARFF_SNRS)   , " Mean: ", mean(ARFF_SNRS) , \
-                " Min: ", min(ARFF_SNRS) , " Max: ", max(ARFF_SNRS) , \
-                " Zero elements: ", len(ARFF_SNRS) - count_nonzero(ARFF_SNRS)
-
-            print "\tDMs parsed         : ", len(ARFF_DMS)     , " Mean: ", mean(ARFF_DMS) , \
-                " Min: ", min(ARFF_DMS) , " Max: ", max(ARFF_DMS) , \
-                " Zero elements: ", len(ARFF_DMS) - count_nonzero(ARFF_DMS)
-
-            print "\tWidths parsed      : ", len(ARFF_WIDTHS)    , " Mean: ", mean(ARFF_WIDTHS) , \
-                " Min: ", min(ARFF_WIDTHS) , " Max: ", max(ARFF_WIDTHS) , \
-                " Zero elements: ", len(ARFF_WIDTHS) - count_nonzero(ARFF_WIDTHS)
-
-            print "\tDuty cycles parsed : ", len(ARFF_DCYCLE)    , " Mean: ", mean(ARFF_DCYCLE) , \
-                " Min: ", min(ARFF_DCYCLE) , " Max: ", max(ARFF_DCYCLE) , \
-                " Zero elements: ", len(ARFF_DCYCLE) - count_nonzero(ARFF_DCYCLE)
+            # Summarise every column in a single pass. The summaries also give the
+            # observed ranges used to model the data, and describe it in plots.
+            for label, name, data in [("Periods parsed     : ","P0",ARFF_PERIODS),("Freqs. parsed      : ","F0",ARFF_FREQS),
+                                      ("S/Ns parsed        : ","SNR",ARFF_SNRS),("DMs parsed         : ","DM",ARFF_DMS),
+                                      ("Widths parsed      : ","WIDTH",ARFF_WIDTHS),("Duty cycles parsed : ","DUTY",ARFF_DCYCLE)]:
+                ARFF_SUMMARIES[name] = StreamingStatistics().update(data)
+                self.printSummary(label,ARFF_SUMMARIES[name])
 
         # ****************************************
         #
         #
         #
-        #         Generating data samples
+        #         Describing distributions
         #
         #
         #
         # ****************************************
 
-        # Now create the distributions.
+        # Now create the distributions. Each parameter is sampled from a
+        # (distribution, parameters) pair understood by generateData().
 
         print "\n\t+----- Fitting Distributions -----+"
 
-        # ****************************************
-        #              Pulse Periods
-        # ****************************************
-
-        print "\n\t1.1 Generating " , self.samples , " period samples..."
-
         if(self.autoGenerate == True):
-            generatedPeriods = self.generateData(self.p0Dist,self.p0DistParams,self.samples)
-
-            if(self.verbose):
-                print "\t1.1.1 Creating histogram for period samples..."
-                plt.hist(generatedPeriods, bins=self.freedmanDiaconisRule(generatedPeriods), color='w')
-                plt.title("Histogram of Generated Periods ("+ self.p0Dist + " distribution)")
-                plt.xlabel("Period (s)")
-                plt.ylabel("Frequency")
-                plt.show()
+            self.samplers = {"P0"   : (self.p0Dist,self.p0DistParams),
+                             "DM"   : (self.dmDist,self.dmDistParams),
+                             "DUTY" : (self.dutyDist,self.dutyDistParams),
+                             "SNR"  : (self.snrDist,self.snrDistParams)}
         else:
-            # Sample pulse periods from a uniform distribution based upon data in the supplied file.
-            if(len(ARFF_PERIODS)>0):
-
-                min_period = min(ARFF_PERIODS)
-                max_period = max(ARFF_PERIODS)
-                generatedPeriods = random.uniform(min_period,max_period,self.samples)
-
-                # Plot histogram to show randomly generated period data points,
-                # if verbose logging enabled... data should be uniformly distributed.
-                if(self.verbose):
-                    print "\t1.1.1 Creating histogram for period samples..."
-                    ARFF_Period_Histogram = plt.hist(generatedPeriods, bins=self.freedmanDiaconisRule(generatedPeriods), color='w')
-                    plt.title("Histogram of Uniformly Generated Periods")
-                    plt.xlabel("Period (s)")
-                    plt.ylabel("Frequency")
-                    plt.show()
-
-                # Now compute some stats describing generated data
-                if(self.verbose):
-                    print "\t1.1.2 Creating box-plot for generated and observed period samples..."
-                    print "\t1.1.3 Boxplot parameters..."
-                    print "\t\tGenerated Data:"
-                    print "\t\t\tMin    : " , min(generatedPeriods)
-                    print "\t\t\tMax    : " , max(generatedPeriods)
-                    print "\t\t\tMedian : " , median(generatedPeriods)
-                    print "\t\t\tSTDEV  : " , std(generatedPeriods)
-                    q75, q25 = percentile(generatedPeriods, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(generatedPeriods) - min(generatedPeriods) )
-                    print "\t\tObserved Data:"
-                    print "\t\t\tMin    : " , min(ARFF_PERIODS)
-                    print "\t\t\tMax    : " , max(ARFF_PERIODS)
-                    print "\t\t\tMedian : " , median(ARFF_PERIODS)
-                    print "\t\t\tSTDEV  : " , std(ARFF_PERIODS)
-                    q75, q25 = percentile(ARFF_PERIODS, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(ARFF_PERIODS) - min(ARFF_PERIODS) )
-
-                    data = [generatedPeriods, ARFF_PERIODS]
-                    plt.boxplot(data, notch=0, sym='+', vert=1, whis=1.5)
-                    plt.title("Box-plot for generated and observed period samples")
-                    plt.xticks([1, 2], ["Generated", "Observed"])
-                    plt.ylabel("Period (s)")
-                    #plt.yscale('log')
-                    plt.ylim([min_period + (0.2 * min_period),max_period + (0.2 * max_period)])
-                    plt.show()
-            else:
+            if(len(ARFF_PERIODS) == 0):
                 print "Could not get sample period data from parsed ARFF file!"
                 print "\tExiting..."
                 sys.exit()
 
-        # ****************************************
-        #           Dispersion Measure
-        # ****************************************
-
-        print "\n\t2.1 Generating " , self.samples , " DM samples..."
-
-        if(self.autoGenerate == True):
-            generatedDMs = self.generateData(self.dmDist,self.dmDistParams,self.samples)
-
-            if(self.verbose):
-                print "\t1.1.1 Creating histogram for DM samples..."
-                plt.hist(generatedDMs, bins=self.freedmanDiaconisRule(generatedDMs), color='w')
-                plt.title("Histogram of Generated DMs ("+ self.dmDist + " distribution)")
-                plt.xlabel("DM")
-                plt.ylabel("Frequency")
-                plt.show()
-        else:
-            # Sample pulse periods from a uniform distribution based upon data in the supplied file.
-            if(len(ARFF_DMS)>0):
-
-                # Now fit exponential distribution to the DMs observed.
-                print "\n\n\t2.1. Fitting exponential to ARFF DM data..."
-                min_dm = 0
-                max_dm = max(ARFF_DMS)
-                loc, scale = stats.expon.fit(ARFF_DMS, floc=0)
-                x = arange(min_dm,int(max_dm)+1) # x-axis data points, from zero to DM max.
-                pdf_fitted = stats.expon.pdf(x,loc,scale)
-                print "\t2.2. Exponential Fit Parameters:"
-                print "\t\tLocation: ", loc, " Scale: ", scale
-
-                if(self.verbose):
-                    print "\t2.2.1. Plotting PDF for exponential model..."
-                    plt.plot(pdf_fitted)
-                    plt.title("PDF of Exponential fitted to DM")
-                    plt.xlabel("Dispersion measure (DM)")
-                    plt.ylabel("Probability Density")
-                    plt.show()
-
-                # Now generate exponential samples.
-                print "\t2.3. Generating " , self.samples , " DM samples from fitted exponential PDF..."
-                generatedDMs = stats.expon.rvs(loc,scale,self.samples)
-
-                if(self.verbose):
-                    print "\t2.3.1. Creating histogram for DM samples..."
-                    ARFF_DM_Histogram = plt.hist(generatedDMs, bins=self.freedmanDiaconisRule(generatedDMs), color='w')
-                    plt.title("Histogram of Exponentially generated DMs")
-                    plt.xlabel("Dispersion measure (DM)")
-                    plt.ylabel("Frequency")
-                    plt.show()
-
-                # Now compute some stats describing generated data
-                if(self.verbose):
-                    print "\t1.1.2 Creating box-plot for generated and observed DM samples..."
-                    print "\t1.1.3 Boxplot parameters..."
-                    print "\t\tGenerated Data:"
-                    print "\t\t\tMin    : " , min(generatedDMs)
-                    print "\t\t\tMax    : " , max(generatedDMs)
-                    print "\t\t\tMedian : " , median(generatedDMs)
-                    print "\t\t\tSTDEV  : " , std(generatedDMs)
-                    q75, q25 = percentile(generatedDMs, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(generatedDMs) - min(generatedDMs) )
-                    print "\t\tObserved Data:"
-                    print "\t\t\tMin    : " , min(ARFF_DMS)
-                    print "\t\t\tMax    : " , max(ARFF_DMS)
-                    print "\t\t\tMedian : " , median(ARFF_DMS)
-                    print "\t\t\tSTDEV  : " , std(ARFF_DMS)
-                    q75, q25 = percentile(ARFF_DMS, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(ARFF_DMS) - min(ARFF_DMS) )
-
-                    data = [generatedDMs, ARFF_DMS]
-                    plt.boxplot(data, notch=0, sym='+', vert=1, whis=1.5)
-                    plt.title("Box-plot for generated and observed DM samples")
-                    plt.xticks([1, 2], ["Generated", "Observed"])
-                    plt.ylabel("Dispersion measure")
-                    #plt.yscale('log')
-                    plt.ylim([-10,max_dm + (0.2 * max_dm)])
-                    plt.show()
-            else:
+            if(len(ARFF_DMS) == 0):
                 print "Could not get sample DM data from parsed ARFF file!"
                 print "\tExiting..."
                 sys.exit()
 
-        # ****************************************
-        #              Duty Cycles
-        # ****************************************
-
-        print "\n\n\t3.1. Generating " , self.samples , " duty cycle samples..."
-
-        if(self.autoGenerate == True):
-            generatedDutyCycles = self.generateData(self.dutyDist,self.dutyDistParams,self.samples)
-
-            if(self.verbose):
-                print "\t1.1.1 Creating histogram for duty cycle samples..."
-                plt.hist(generatedDutyCycles, bins=self.freedmanDiaconisRule(generatedDutyCycles), color='w')
-                plt.title("Histogram of Generated duty cycles ("+ self.dutyDist + " distribution)")
-                plt.xlabel("Duty cycle")
-                plt.ylabel("Frequency")
-                plt.show()
-        else:
-            # Sample pulse periods from a uniform distribution based upon data in the supplied file.
-            if(len(ARFF_DCYCLE)>0):
-
-                # Generate uniformly distributed duty cycles...
-                min_duty = min(ARFF_DCYCLE)
-                max_duty = max(ARFF_DCYCLE)
-                generatedDutyCycles = random.uniform(min_duty,max_duty,self.samples) # 1000 periods between min and max values.
-
-                # Plot histogram to show randomly generated period data points,
-                # if verbose logging enabled... data should be uniformly distributed.
-                if(self.verbose):
-                    print "\t3.1.1. Creating histogram for duty cycle samples..."
-                    ARFF_DutyCycle_Histogram = plt.hist(generatedDutyCycles, bins=self.freedmanDiaconisRule(generatedDutyCycles), color='w')
-                    plt.title("Histogram of Uniformly Generated Duty Cycles")
-                    plt.xlabel("Duty Cycle")
-                    plt.ylabel("Frequency")
-                    plt.show()
-
-                # Now compute some stats describing generated data
-                if(self.verbose):
-                    print "\t3.1.2 Creating box-plot for generated and observed Duty Cycles samples..."
-                    print "\t3.1.3 Boxplot parameters..."
-                    print "\t\tGenerated Data:"
-                    print "\t\t\tMin    : " , min(generatedDutyCycles)
-                    print "\t\t\tMax    : " , max(generatedDutyCycles)
-                    print "\t\t\tMedian : " , median(generatedDutyCycles)
-                    print "\t\t\tSTDEV  : " , std(generatedDutyCycles)
-                    q75, q25 = percentile(generatedDutyCycles, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(generatedDutyCycles) - min(generatedDutyCycles) )
-                    print "\t\tObserved Data:"
-                    print "\t\t\tMin    : " , min(ARFF_DCYCLE)
-                    print "\t\t\tMax    : " , max(ARFF_DCYCLE)
-                    print "\t\t\tMedian : " , median(ARFF_DCYCLE)
-                    print "\t\t\tSTDEV  : " , std(ARFF_DCYCLE)
-                    q75, q25 = percentile(ARFF_DCYCLE, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(ARFF_DCYCLE) - min(ARFF_DCYCLE) )
-
-                    data = [generatedDutyCycles, ARFF_DCYCLE]
-                    plt.boxplot(data, notch=0, sym='+', vert=1, whis=1.5)
-                    plt.title("Box-plot for generated and observed duty cycles samples")
-                    plt.xticks([1, 2], ["Generated", "Observed"])
-                    plt.ylabel("Duty Cycle")
-                    #plt.yscale('log')
-                    plt.ylim([-1,max_duty + (0.2 * max_duty)])
-                    plt.show()
-
-            else:
+            if(len(ARFF_DCYCLE) == 0):
                 print "Could not get sample duty cycle data from parsed ARFF file!"
                 print "\tExiting..."
                 sys.exit()
-        # ****************************************
-        #              Pulse Widths
-        # ****************************************
 
-        print "\n\n\t4.1. Generating Pulse widths based on duty cycle and period (Width = Duty Cycle x Period) "
+            if(len(ARFF_SNRS) == 0):
+                print "Could not get sample S/N data from parsed ARFF file!"
+                print "\tExiting..."
+                sys.exit()
 
-        # Generate widths based on: Width = Duty Cycle x Period.
-        generatedWidths = []
+            if(self.kde):
+                # Sample all parameters jointly from a binned KDE of the data in the
+                # supplied file, so that their shapes and correlations are kept.
+                # Periods, DMs and S/Ns are heavy tailed, so are modelled in log space.
+                print "\n\tFitting binned KDE to ", len(ARFF_PERIODS), " ARFF rows, with ", self.kdeBins, " bins per parameter..."
+                self.jointSampler = BinnedKDE(self.kdeBins)
+                bandwidth = self.jointSampler.fit([ARFF_PERIODS,ARFF_DMS,ARFF_DCYCLE,ARFF_SNRS],[True,True,False,True])
+
+                for label, logScale, width in zip(["Period","DM","Duty cycle","S/N"],self.jointSampler.logScale,bandwidth):
+                    print "\t\t", label, " bandwidth: ", width, " (log10)" if logScale else ""
+
+                # The per-parameter samplers are unused, but describe the observed ranges.
+                self.samplers = {"P0"   : ("uniform",[ARFF_SUMMARIES["P0"].minimum,ARFF_SUMMARIES["P0"].range()]),
+                                 "DM"   : ("uniform",[ARFF_SUMMARIES["DM"].minimum,ARFF_SUMMARIES["DM"].range()]),
+                                 "DUTY" : ("uniform",[ARFF_SUMMARIES["DUTY"].minimum,ARFF_SUMMARIES["DUTY"].range()]),
+                                 "SNR"  : ("uniform",[ARFF_SUMMARIES["SNR"].minimum,ARFF_SUMMARIES["SNR"].range()])}
+            else:
+                # Sample pulse periods and duty cycles from uniform distributions based
+                # upon data in the supplied file, and DMs and S/Ns from exponentials
+                # fitted to the data.
+                print "\n\t1.1. Periods will be sampled uniformly between ", ARFF_SUMMARIES["P0"].minimum, " and ", ARFF_SUMMARIES["P0"].maximum
+                print "\t2.1. Fitting exponential to ARFF DM data..."
+                dmLoc, dmScale = self.fitExponential(ARFF_DMS,"DM","Dispersion measure (DM)")
+                print "\t3.1. Duty cycles will be sampled uniformly between ", ARFF_SUMMARIES["DUTY"].minimum, " and ", ARFF_SUMMARIES["DUTY"].maximum
+                print "\t4.1. Fitting exponential to ARFF S/N data..."
+                snrLoc, snrScale = self.fitExponential(ARFF_SNRS,"S/N","S/N")
+
+                self.samplers = {"P0"   : ("uniform",[ARFF_SUMMARIES["P0"].minimum,ARFF_SUMMARIES["P0"].range()]),
+                                 "DM"   : ("expon",[dmLoc,dmScale]),
+                                 "DUTY" : ("uniform",[ARFF_SUMMARIES["DUTY"].minimum,ARFF_SUMMARIES["DUTY"].range()]),
+                                 "SNR"  : ("expon",[snrLoc,snrScale])}
 
-        for dutyCycle, period in zip(generatedDutyCycles, generatedPeriods):
-            generatedWidths.append(dutyCycle * period)
+        # ****************************************
+        #
+        #
+        #
+        #         Generating data samples
+        #
+        #
+        #
+        # ****************************************
 
-        if(len(ARFF_WIDTHS)>0):
-            max_arff_width = max(ARFF_WIDTHS)
+        # Samples are generated, written to the output file and turned into fake
+        # pulsar par files in blocks, so memory use is bounded by the block size.
+        # Within each block, samples are drawn in stream blocks of streamBlockSize
+        # samples. Each stream block has its own random streams, derived from the
+        # seed and the position of the stream block, so stream blocks can be drawn
+        # by any worker process in any order. The samples generated therefore do
+        # not depend on the block size, or the number of processes used.
+        if(self.chunkSize <= 0 or self.chunkSize >= self.samples):
+            blockSize = max(self.samples,1)
         else:
-            max_arff_width = 0
+            # Round up to a whole number of stream blocks.
+            blockSize = -(-self.chunkSize // self.streamBlockSize) * self.streamBlockSize
 
-        max_generated_width = max(generatedWidths)
+        chunked = blockSize < self.samples
 
-        if(max_generated_width > max_arff_width):
-            max_width = max_generated_width
-        else:
-            max_width = max_arff_width
+        print "\n\t+----- Generating Samples -----+"
+        print "\n\tGenerating " , self.samples , " samples of each parameter, in blocks of ", blockSize
+        print "\tPulse widths are based on duty cycle and period (Width = Duty Cycle x Period)"
 
-        # Plot histogram to show randomly generated width data points,
-        # if verbose logging enabled...
-        if(self.verbose):
-            print "\t4.1.1. Creating histogram for pulse width samples..."
-            ARFF_Widths_Histogram = plt.hist(generatedWidths, bins=self.freedmanDiaconisRule(generatedWidths), color='b',label='Generated widths')
-            plt.title("Histogram of Generated Pulse Widths (based on Width = Duty Cycle x Period)")
-            plt.xlabel("Pulse Width (ms)")
-            plt.ylabel("Frequency")
-            plt.legend(loc='upper right')
-            plt.show()
+        parWriter = ParWriter(self.pepoch,self.tzrmjd,self.tzrfreq,self.units,self.threads)
 
-        # Now compute some stats describing generated data
-        if(self.verbose and self.autoGenerate == False):
-            print "\t4.2.1 Creating box-plot for generated and observed Pulse Widths samples..."
-            print "\t4.2.1 Boxplot parameters..."
-            print "\t\tGenerated Data:"
-            print "\t\t\tMin    : " , min(generatedWidths)
-            print "\t\t\tMax    : " , max(generatedWidths)
-            print "\t\t\tMedian : " , median(generatedWidths)
-            print "\t\t\tSTDEV  : " , std(generatedWidths)
-            q75, q25 = percentile(generatedWidths, [75 ,25])
-            print "\t\t\tIQR    : " , str(q75 - q25)
-            print "\t\t\tRange  : " , str( max(generatedWidths) - min(generatedWidths) )
-            print "\t\tObserved Data:"
-            print "\t\t\tMin    : " , min(ARFF_WIDTHS)
-            print "\t\t\tMax    : " , max(ARFF_WIDTHS)
-            print "\t\t\tMedian : " , median(ARFF_WIDTHS)
-            print "\t\t\tSTDEV  : " , std(ARFF_WIDTHS)
-            q75, q25 = percentile(ARFF_WIDTHS, [75 ,25])
-            print "\t\t\tIQR    : " , str(q75 - q25)
-            print "\t\t\tRange  : " , str( max(ARFF_WIDTHS) - min(ARFF_WIDTHS) )
-
-            data = [generatedWidths, ARFF_WIDTHS]
-            plt.boxplot(data, notch=0, sym='+', vert=1, whis=1.5)
-            plt.title("Box-plot for generated and observed Pulse Widths samples")
-            plt.xticks([1, 2], ["Generated", "Observed"])
-            plt.ylabel("Pulse width (s)")
-            #plt.yscale('log')
-            plt.ylim([-1,max_width + (0.2 * max_width)])
-            plt.show()
+        if(self.pack):
+            # Write all the fake pulsar pars to a single indexed pack file.
+            fakePack = ParPack(self.fakePulsarParPackPath,self.verbose)
+            fakePack.begin(self.samples)
 
-        # ****************************************
-        #                  SNRS
-        # ****************************************
+        # Record the parameters of every fake pulsar in the manifest.
+        manifest = Manifest(self.fakePulsarManifestPath,self.verbose)
+        # Size the PAR column to hold the longest path written to it.
+        if(self.pack):
+            parWidth = len(self.fakePulsarParPackPath)
+        else:
+            parWidth = len(self.fakePulsarParFileDir) + 1 + Manifest.nameWidth + len(".par")
+
+        manifest.begin(self.samples,{"PAR" : parWidth})
+
+        # The sampling settings used by each stream block (see sampleStreamBlock).
+        # These include the fitted samplers, which may be large (e.g. a binned
+        # KDE grid), so they are sent to each worker process once, when it
+        # starts, rather than with every stream block.
+        settings = {"samplers"     : self.samplers,
+                    "jointSampler" : self.jointSampler,
+                    "fastSampling" : self.fastSampling,
+                    "bounds"       : self.bounds,
+                    "retries"      : self.retries}
+
+        # Only start a pool of worker processes if there is work to share.
+        if(self.processes > 1 and self.samples > self.streamBlockSize):
+            pool = Pool(self.processes,initSampling,(settings,))
+        else:
+            pool = None
+            initSampling(settings)
 
-        print "\n\n\t5.1. Generating " , self.samples , " S/N samples..."
+        # Counts of fake pulsar pars written and left unchanged, and their names.
+        fakeParsWritten, fakeParsUnchanged, fakeParNamesWritten = 0, 0, set()
 
-        if(self.autoGenerate == True):
-            generatedSNRs = self.generateData(self.snrDist,self.snrDistParams,self.samples)
-
-            if(self.verbose):
-                print "\t5.1.1 Creating histogram for S/N samples..."
-                plt.hist(generatedSNRs, bins=self.freedmanDiaconisRule(generatedSNRs), color='w')
-                plt.title("Histogram of Generated S/Ns ("+ self.snrDist + " distribution)")
-                plt.xlabel("S/N")
-                plt.ylabel("Frequency")
-                plt.show()
-        else:
+        # Counts of samples drawn, accepted and rejected by each constraint.
+        statistics = dict((name,0) for name in ["DRAWN","ACCEPTED"] + self.constraints)
 
-            if(len(ARFF_SNRS)>0):
-
-                # Now fit exponential distribution to the DMs observed.
-                print "\n\n\t5.1. Fitting exponential to ARFF S/N data..."
-                min_snr = 0
-                max_snr = max(ARFF_SNRS)
-                loc, scale = stats.expon.fit(ARFF_SNRS, floc=0)
-                x = arange(min_snr,int(max_snr)+1) # x-axis data points, from zero to DM max.
-                pdf_fitted = stats.expon.pdf(x,loc,scale)
-                print "\t5.2. Exponential Fit Parameters:"
-                print "\t\tLocation: ", loc, " Scale: ", scale
-
-                if(self.verbose):
-                    print "\t5.2.1. Plotting PDF for exponential model..."
-                    plt.plot(pdf_fitted)
-                    plt.title("PDF of Exponential fitted to S/N")
-                    plt.xlabel("S/N")
-                    plt.ylabel("Probability Density")
-                    plt.show()
-
-                # Now generate exponential samples.
-                print "\t5.3. Generating " , self.samples , " S/N samples from fitted exponential PDF..."
-                generatedSNRs = stats.expon.rvs(loc,scale,self.samples)
-
-                # if verbose logging enabled... data should be uniformly distributed.
-                if(self.verbose):
-                    print "\t5.1.1. Creating histogram for S/N samples..."
-                    ARFF_SNR_Histogram = plt.hist(generatedSNRs, bins=self.freedmanDiaconisRule(generatedSNRs), color='w')
-                    plt.title("Histogram of exponentially Generated S/Ns")
-                    plt.xlabel("S/N")
-                    plt.ylabel("Frequency")
-                    plt.show()
-
-                # Now compute some stats describing generated data
-                if(self.verbose):
-                    print "\t5.1.2 Creating box-plot for generated and observed S/N samples..."
-                    print "\t5.1.3 Boxplot parameters..."
-                    print "\t\tGenerated Data:"
-                    print "\t\t\tMin    : " , min(generatedSNRs)
-                    print "\t\t\tMax    : " , max(generatedSNRs)
-                    print "\t\t\tMedian : " , median(generatedSNRs)
-                    print "\t\t\tSTDEV  : " , std(generatedSNRs)
-                    q75, q25 = percentile(generatedSNRs, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(generatedSNRs) - min(generatedSNRs) )
-                    print "\t\tObserved Data:"
-                    print "\t\t\tMin    : " , min(ARFF_SNRS)
-                    print "\t\t\tMax    : " , max(ARFF_SNRS)
-                    print "\t\t\tMedian : " , median(ARFF_SNRS)
-                    print "\t\t\tSTDEV  : " , std(ARFF_SNRS)
-                    q75, q25 = percentile(ARFF_SNRS, [75,25])
-                    print "\t\t\tIQR    : " , str(q75 - q25)
-                    print "\t\t\tRange  : " , str( max(ARFF_SNRS) - min(ARFF_SNRS) )
-
-                    data = [generatedSNRs, ARFF_SNRS]
-                    plt.boxplot(data, notch=0, sym='+', vert=1, whis=1.5)
-                    plt.title("Box-plot for generated and observed S/N samples")
-                    plt.xticks([1, 2], ["Generated", "Observed"])
-                    plt.ylabel("S/N")
-                    #plt.yscale('log')
-                    plt.ylim([-1,max_snr + (0.2 * max_snr)])
-                    plt.show()
+        # Summaries of the samples generated, merged from those of each stream block.
+        summaries = dict((name,StreamingStatistics()) for name in self.summaryColumns)
 
-            else:
-                print "Could not get sample S/N data from parsed ARFF file!"
-                print "\tExiting..."
-                sys.exit()
+        outputFile = open(self.outputPath,'w')
 
-        # Now check data has been generated correctly
-        canProceed = True
-        if(len(generatedPeriods)==self.samples):
-            print "\n\n\tAll period data generated"
-        else:
-            print "\n\n\tNot all period data generated!"
-            canProceed = False
+        try:
+            # Write a header to the output file...
+            outputFile.write("Period (s),DM,Pulse Width (s),Duty Cycle,SNR\n")
+
+            for first in range(0,self.samples,blockSize):
+                count = min(blockSize,self.samples - first)
+
+                # The stream blocks making up this block.
+                streamBlocks = [(self.seed,streamBlock,
+                                 min(self.streamBlockSize,self.samples - streamBlock * self.streamBlockSize))
+                                for streamBlock in range(first // self.streamBlockSize,
+                                                         -(-(first + count) // self.streamBlockSize))]
+
+                try:
+                    if(pool is not None):
+                        # map returns the results in the order of the stream blocks.
+                        results = pool.map(sampleStreamBlock,streamBlocks)
+                    else:
+                        results = map(sampleStreamBlock,streamBlocks)
+                except ValueError as e:
+                    print "\n\t", e
+                    print "\tExiting..."
+                    sys.exit()
+
+                generatedPeriods, generatedDMs, generatedDutyCycles, generatedWidths, generatedSNRs = \
+                    [concatenate([result[column] for result in results]) for column in range(5)]
+
+                for result in results:
+                    for name, value in result[5].iteritems():
+                        statistics[name] += value
+
+                    for name, summary in result[6].iteritems():
+                        summaries[name].merge(summary)
+
+                # Now check data has been generated correctly
+                canProceed = True
+                for label, generated in [("period",generatedPeriods),("DM",generatedDMs),
+                                         ("duty cycle",generatedDutyCycles),("S/N",generatedSNRs)]:
+                    if(len(generated) != count):
+                        print "\n\n\tNot all " + label + " data generated!"
+                        canProceed = False
 
-        if(len(generatedDMs)==self.samples):
-            print "\n\n\tAll DM data generated"
-        else:
-            print "\n\n\tNot all DM data generated!"
-            canProceed = False
+                if(canProceed==False):
+                    print "Cannot proceed as not all data has been generated!"
+                    print "\tExiting..."
+                    sys.exit()
+
+                # ****************************************
+                #            Save data to file
+                # ****************************************
+
+                outputFile.write("".join(["%s,%s,%s,%s,%s\n" % row for row in
+                                          zip(generatedPeriods,generatedDMs,generatedWidths,generatedDutyCycles,generatedSNRs)]))
+
+                # ****************************************
+                #          Create fake pulsar pars
+                # ****************************************
+                # this is so we can find signals in the fake pulsars we generate (i.e. know the periodicity, DM etc).
+                # Render every par file in one pass, then write each with a single open.
+                fakeParNames = parWriter.fakeParNames(first + 1,generatedPeriods,generatedDMs,generatedSNRs)
+                fakeParTexts = parWriter.renderFakePars(first + 1,generatedDMs,generatedPeriods)
+
+                if(self.pack):
+                    fakePack.append(fakeParNames,fakeParTexts)
+                    fakeParPaths = self.fakePulsarParPackPath
+                else:
+                    fakeParPaths = parWriter.parPaths(self.fakePulsarParFileDir,fakeParNames)
+                    written, unchanged = parWriter.writePars(fakeParPaths,fakeParTexts)
+                    fakeParsWritten += written
+                    fakeParsUnchanged += unchanged
+                    fakeParNamesWritten.update(fakeParNames)
 
-        if(len(generatedDutyCycles)==self.samples):
-            print "\n\n\tAll duty cycle data generated"
-        else:
-            print "\n\n\tNot all duty cycle data generated!"
-            canProceed = False
+                manifest.append(first + 1,fakeParNames,generatedPeriods,generatedDMs,generatedDutyCycles,
+                                generatedWidths,generatedSNRs,fakeParPaths,self.seed)
 
-        if(len(generatedSNRs)==self.samples):
-            print "\n\n\tAll S/N data generated"
-        else:
-            print "\n\n\tNot all S/N data generated!"
-            canProceed = False
+                if(chunked and self.verbose):
+                    print "\tSamples generated: ", first + count, " of ", self.samples
+        finally:
+            outputFile.close()
 
-        if(canProceed==False):
-            print "Cannot proceed as not all data has been generated!"
-            print "\tExiting..."
-            sys.exit()
+            if(pool is not None):
+                pool.terminate()
 
-        # ****************************************
-        #            Save data to file
-        # ****************************************
+        manifest.finish()
+        print "\n\tFake pulsar manifest written to: ", self.fakePulsarManifestPath
 
-        print "\n\n\tWriting data to the output file..."
-        for period, dm, pulseWidth,dutyCycle,snr in zip(generatedPeriods, generatedDMs,generatedWidths,generatedDutyCycles,generatedSNRs):
-            text = str(period) + "," + str(dm) + "," + str(pulseWidth) + "," + str(dutyCycle) + "," + str(snr) + "\n"
-            self.appendToFile(self.outputPath,text)
+        if(self.pack):
+            fakePack.finish()
+            print "\n\tFake pulsar pars packed into: ", self.fakePulsarParPackPath
+        else:
+            # Remove the pars of fake pulsars from previous runs which were not generated again.
+            fakeParsRemoved = 0
+
+            if(self.prune):
+                fakeParsRemoved = parWriter.removeStalePars(self.fakePulsarParFileDir,fakeParNamesWritten,
+                                                            parWriter.fakeParPattern)
+            print "\n\tFake pulsar pars written: ", fakeParsWritten, " unchanged: ", fakeParsUnchanged,\
+                  " removed: ", fakeParsRemoved
+
+        print "\n\n\tAll period, DM, duty cycle and S/N data generated"
+        print "\tSamples drawn: ", statistics["DRAWN"], " accepted: ", statistics["ACCEPTED"],\
+              " acceptance rate: ", "%.4f" % (float(statistics["ACCEPTED"]) / max(statistics["DRAWN"],1))
+
+        for name in self.constraints:
+            print "\t\tRejected by ", name, " constraint: ", statistics[name]
+
+        print "\n\t+----- GENERATED DATA -----+"
+        for label, name in [("Periods generated     : ","P0"),("DMs generated         : ","DM"),
+                            ("Duty cycles generated : ","DUTY"),("Widths generated      : ","WIDTH"),
+                            ("S/Ns generated        : ","SNR")]:
+            self.printSummary(label,summaries[name])
+
+        # Plot histograms and box-plots describing the generated data, if plots
+        # were requested. These need every sample in memory at once.
+        if(self.plotting):
+            if(chunked):
+                print "\tSample plots are not created when samples are generated in blocks."
+            else:
+                self.plotSamples(generatedPeriods,generatedDMs,generatedDutyCycles,generatedWidths,generatedSNRs,
+                                 ARFF_PERIODS,ARFF_DMS,ARFF_DCYCLE,ARFF_WIDTHS,ARFF_SNRS,summaries,ARFF_SUMMARIES)
 
         # ****************************************
         #
@@ -1255,52 +1457,49 @@ class CandidateParGenerator:
                 if(atnf_name_count == atnf_rajs_count and atnf_rajs_count == atnf_decjs_count and
                    atnf_decjs_count == atnf_dms_count and atnf_dms_count == atnf_freqs_count):
 
-                    # For each of the parameters needed to generate a single PAR file...
-                    for name, ra, dec, dm,freq in zip(ATNF_NAMES, ATNF_RAJS,ATNF_DECJS,ATNF_DMS,ATNF_FREQS):
-                        fileName = name + ".par"
-                        parFilePath = self.pulsarParFileDir + "/" + fileName
-                        self.clearFile(parFilePath)
-
-                        parFileText  = "PSRJ\t\t\t"    + name        + "\n"
-                        parFileText += "RAJ\t\t\t\t"     + ra        + "\t\t\t2.000e-05\n"
-                        parFileText += "DECJ\t\t\t"    + dec         + "\t\t\t3.000e-04\n"
-                        parFileText += "DM\t\t\t\t"      + str(dm)   + "\t\t\t\t1.000e-02\n"
-                        parFileText += "PEPOCH\t\t\t"  + self.pepoch + "\n"
-                        parFileText += "F0\t\t\t\t"      + str(freq) + "\t\t5.000e-10\n"
-                        parFileText += "TZRMJD\t\t\t"  + self.tzrmjd + "\n"
-                        parFileText += "TZRFREQ\t\t\t" + self.tzrfreq+ "\n"
-                        parFileText += "UNITS\t\t\t"   + self.units
-
-                        self.appendToFile(parFilePath,parFileText)
+                    # Skip pulsars which have not changed since the pars were last built.
+                    if(self.changes is not None):
+                        rows = [row for row, name in enumerate(ATNF_NAMES) if name in self.changes["ADDED"]
+                                or name in self.changes["MODIFIED"]]
+                    else:
+                        rows = range(len(ATNF_NAMES))
+
+                    names = [ATNF_NAMES[row] for row in rows]
+
+                    # Render every par file in one pass, then write each with a single open.
+                    written, unchanged = parWriter.writePars(parWriter.parPaths(self.pulsarParFileDir,names),
+                                        parWriter.renderCatalogPars(names,
+                                                                    [ATNF_RAJS[row] for row in rows],
+                                                                    [ATNF_DECJS[row] for row in rows],
+                                                                    [ATNF_DMS[row] for row in rows],
+                                                                    [ATNF_FREQS[row] for row in rows]))
+
+                    # Delete the pars of pulsars no longer in the catalog (or selection).
+                    if(self.changes is not None):
+                        removed = 0
+                        for name in self.changes["REMOVED"]:
+                            parFilePath = self.pulsarParFileDir + "/" + name + ".par"
+                            if(os.path.exists(parFilePath)):
+                                os.remove(parFilePath)
+                                removed += 1
+
+                        print "\n\tPulsar pars rebuilt: ", len(self.changes["ADDED"]) + len(self.changes["MODIFIED"])
+                    elif(self.prune):
+                        removed = parWriter.removeStalePars(self.pulsarParFileDir,names,parWriter.pulsarParPattern)
+                    else:
+                        removed = 0
+
+                    print "\n\tPulsar pars written: ", written, " unchanged: ", unchanged, " removed: ", removed
                 else:
                     print "Unequal ATNF inputs for par file creation - some entries are missing data."
             else:
                 print "ATNF data not read, cannot create par files."
 
-        # ****************************************
-        #          Create fake pulsar pars
-        # ****************************************
-        # this is so we can find signals in the fake pulsars we generate (i.e. know the periodicity, DM etc).
-        # For each of the parameters needed to generate a single PAR file...
-        counter = 1
-        for dm,p0,snr in zip(generatedDMs, generatedPeriods,generatedSNRs):
-            fileName = "FakePulsar_" + str(counter) + "_" + str("%.6f" % p0) + "_" + str("%.1f" % dm) + "_" + str("%.1f" % snr) + ".par"
-            parFilePath = self.fakePulsarParFileDir + "/" + fileName
-            self.clearFile(parFilePath)
-
-            parFileText  = "PSRJ\t\t\t"    + "FakePulsar_"    + str(counter) + "\n"
-            parFileText += "RAJ\t\t\t\t"   + "00:00:00"  + "\t\t\t2.000e-05\n"
-            parFileText += "DECJ\t\t\t"    + "00:00:00"  + "\t\t\t3.000e-04\n"
-            parFileText += "DM\t\t\t\t"    + str(dm)     + "\t\t1.000e-02\n"
-            parFileText += "PEPOCH\t\t\t"  + self.pepoch + "\n"
-            parFileText += "F0\t\t\t\t"    + str(1.0/p0) + "\t5.000e-10\n"
-            parFileText += "TZRMJD\t\t\t"  + self.tzrmjd + "\n"
-            parFileText += "TZRFREQ\t\t\t" + self.tzrfreq+ "\n"
-            parFileText += "UNITS\t\t\t"   + self.units
-
-            self.appendToFile(parFilePath,parFileText)
-            counter+= 1
+        # Wait for any plots still being rendered in the background.
+        reportPath = self.renderer.finish()
 
+        if(reportPath is not None):
+            print "\n\tReport written to: ", reportPath
 
         print "\n\tDone."
         print "\t**************************************************************************" # Used only for formatting purposes.
@@ -1313,37 +1512,42 @@ class CandidateParGenerator:
     #
     #   key         params                  Name
     #   beta        a, b, loc, scale        Beta dist.
+    #   binom       n, p, loc               Binomial dist.
     #   expon       loc, scale              exponential dist.
     #   gamma       shape, loc, scale       Gamma dist.
     #   logistic    loc, scale              logistic dist.
-    #   lognorm     s, mean, sigma          log-normal dist.
+    #   lognorm     s, loc, scale           log-normal dist.
     #   norm        loc, scale              normal dist.
     #   truncnorm   min, max,loc, scale     normal dist.
     #   rayleigh    loc, scale,             Rayleigh dist.
-    #   uniform     min, max, size          uniform dist.
+    #   uniform     loc, scale              uniform dist.
     #
     #  @param self The object pointer.
     #  @param dist The distribution to use (string).
     #  @param params The parameters to use to initialise the distribution (numerical list).
     #  @params samples The total number of samples to draw from the distribution.
+    #  @param randomState The random stream to draw samples from (optional).
     #  @ returns The samples drawn from the distribution as a list.
-    def generateData(self,dist,params,samples):
+    def generateData(self,dist,params,samples,randomState=None):
         """
         Generates the required number of data samples, according to the supplied
-        distribution and associated parameters.
+        distribution and associated parameters. Samples are drawn via the
+        distribution registry (see Samplers.py), using the fast numpy sampler
+        of the distribution unless scipy samples were requested (--scipy).
 
         These are the distributions that can be used
 
         key         params                  Name
         beta        a, b, loc, scale        Beta dist.
+        binom       n, p, loc               Binomial dist.
         expon       loc, scale              exponential dist.
         gamma       shape, loc, scale       Gamma dist.
         logistic    loc, scale              logistic dist.
-        lognorm     s, mean, sigma          log-normal dist.
+        lognorm     s, loc, scale           log-normal dist.
         norm        loc, scale              normal dist.
         truncnorm   min, max,loc, scale     normal dist.
         rayleigh    loc, scale,             Rayleigh dist.
-        uniform     min, max, size          uniform dist.
+        uniform     loc, scale              uniform dist.
 
         Parameters
         ----------
@@ -1355,6 +1559,9 @@ class CandidateParGenerator:
             The list of parameters to use to initialise the specified distribution.
         samples : int
             The total number of samples to draw from the distribution.
+        randomState : numpy.random.RandomState
+            The random stream to draw samples from (optional). By default
+            the global numpy random stream is used.
 
         Returns
         -------
@@ -1375,71 +1582,608 @@ class CandidateParGenerator:
         """
         data = []
 
-        # These are the distributions that can be used
-        #
-        #   key         params                  Name
-        #   beta        a, b, loc, scale        Beta dist.
-        #   expon       loc, scale              exponential dist.
-        #   gamma       shape, loc, scale       Gamma dist.
-        #   logistic    loc, scale              logistic dist.
-        #   lognorm     s, mean, sigma          log-normal dist.
-        #   norm        loc, scale              normal dist.
-        #   truncnorm   min, max,loc, scale     normal dist.
-        #   rayleigh    loc, scale,             Rayleigh dist.
-        #   uniform     min, max, size          uniform dist.
+        try:
+            data = registry.sample(dist,params,samples,randomState,self.fastSampling)
+        except Exception as e: # Catch *all* exceptions.
+            print "\tError generating data using ", dist, " distribution with parameters ",params,"\n\t", sys.exc_info()[0]
+
+        return data
+
+    # ******************************************************************************************
+
+    ## Creates an independent random stream for each fake pulsar parameter, in a stream block.
+    #
+    #  @param self The object pointer.
+    #  @param seed The random seed supplied by the user.
+    #  @param streamBlock The position of the stream block (0 for the first streamBlockSize samples).
+    #  @returns a dictionary mapping each parameter ("P0", "DM", "DUTY" and "SNR") to its random stream.
+    def createStreams(self,seed,streamBlock):
+        """
+        Creates an independent random stream for each fake pulsar parameter, in
+        a stream block. Each stream is seeded from the key [seed, stream block,
+        parameter], which the Mersenne Twister hashes into its initial state,
+        so streams are independent of one another. As the streams of a stream
+        block depend only on its position, stream blocks can be sampled by any
+        process, in any order, and the samples produced are always the same.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        seed : int
+            The random seed supplied by the user.
+        streamBlock : int
+            The position of the stream block, i.e. 0 for the first streamBlockSize
+            samples, 1 for the next, and so on.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each parameter ("P0", "DM", "DUTY" and "SNR")
+            to its random stream (a numpy.random.RandomState).
+
+        """
+        return dict((parameter,RandomState([seed,streamBlock,stream])) for stream, parameter in enumerate(["P0","DM","DUTY","SNR"]))
+
+    # ****************************************************************************************************
+
+    ## Generates a block of valid fake pulsar parameters.
+    #
+    #  @param self The object pointer.
+    #  @param streams The random stream of each parameter, as returned by createStreams().
+    #  @param count The number of fake pulsars to generate parameters for.
+    #  @returns the periods, DMs, duty cycles, pulse widths and S/Ns as numpy arrays, and the sampling statistics.
+    def sampleParameters(self,streams,count):
+        """
+        Generates a block of valid fake pulsar parameters (see drawParameters).
+        Fake pulsars which break a constraint (see checkConstraints) are
+        rejected, and replaced by fresh candidates drawn from the same streams.
+        Each retry draws enough candidates to replace every rejected fake
+        pulsar at the acceptance rate seen so far, so few retries are needed
+        even when most candidates are rejected. If rejected fake pulsars remain
+        after self.retries retries, a ValueError is raised. Pulse widths are
+        computed from the duty cycles and periods (Width = Duty Cycle x Period).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        streams : dict
+            The random stream of each parameter, as returned by createStreams().
+        count : int
+            The number of fake pulsars to generate parameters for.
+
+        Returns
+        -------
+        tuple
+            The periods, DMs, duty cycles, pulse widths and S/Ns as numpy arrays,
+            and a dictionary of sampling statistics, mapping "DRAWN" and "ACCEPTED"
+            to the number of candidates drawn and accepted, and the name of each
+            constraint to the number of candidates it rejected.
+
+        """
+        statistics = dict((name,0) for name in ["DRAWN","ACCEPTED"] + self.constraints)
+
+        parameters = self.drawParameters(streams,count)
+        valid = self.checkConstraints(parameters,statistics)
+        statistics["DRAWN"] += count
+
+        retry = 0
+        while(not valid.all()):
+
+            if(retry == self.retries):
+                raise ValueError(str(count - valid.sum()) + " of " + str(count) + " fake pulsars still break the " +\
+                                 "parameter constraints after " + str(self.retries) + " retries. Check the " +\
+                                 "distributions and bounds supplied.")
+
+            rejected = flatnonzero(~valid)
+
+            # Draw enough candidates to replace the rejected fake pulsars, given the
+            # acceptance rate so far, within the limits on the oversampling used.
+            rate = max(float(statistics["ACCEPTED"]) / statistics["DRAWN"],1.0 / self.maxOversampling)
+            candidates = min(int(ceil(1.2 * len(rejected) / rate)) + 16,self.maxCandidates)
+
+            replacements = self.drawParameters(streams,candidates)
+            accepted = flatnonzero(self.checkConstraints(replacements,statistics))[:len(rejected)]
+            statistics["DRAWN"] += candidates
+
+            replaced = rejected[:len(accepted)]
+
+            for values, replacementValues in zip(parameters,replacements):
+                values[replaced] = replacementValues[accepted]
+
+            valid[replaced] = True
+            retry += 1
+
+        periods, dms, dutyCycles, snrs = parameters
+        widths = dutyCycles * periods
+
+        return periods, dms, dutyCycles, widths, snrs, statistics
+
+    # ****************************************************************************************************
+
+    ## Draws candidate fake pulsar parameters.
+    #
+    #  @param self The object pointer.
+    #  @param streams The random stream of each parameter, as returned by createStreams().
+    #  @param count The number of candidates to draw.
+    #  @returns the periods, DMs, duty cycles and S/Ns as numpy arrays.
+    def drawParameters(self,streams,count):
+        """
+        Draws candidate fake pulsar parameters, drawing each parameter from the
+        distribution described by self.samplers, or every parameter jointly
+        from self.jointSampler if it is set.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        streams : dict
+            The random stream of each parameter, as returned by createStreams().
+        count : int
+            The number of candidates to draw.
+
+        Returns
+        -------
+        list of numpy.ndarray
+            The periods, DMs, duty cycles and S/Ns.
+
+        """
+        if(self.jointSampler is not None):
+            # All parameters are drawn together, from the period stream.
+            joint = self.jointSampler.sample(count,streams["P0"])
+            return [joint[:,column].copy() for column in range(4)]
+        else:
+            generated = []
+
+            for parameter in ["P0","DM","DUTY","SNR"]:
+                dist, params = self.samplers[parameter]
+                generated.append(asarray(self.generateData(dist,params,count,streams[parameter]),dtype=float))
+
+            return generated
+
+    # ****************************************************************************************************
+
+    ## Checks which candidate fake pulsars meet the parameter constraints.
+    #
+    #  @param self The object pointer.
+    #  @param parameters The candidate periods, DMs, duty cycles and S/Ns, as returned by drawParameters().
+    #  @param statistics The sampling statistics to update (see sampleParameters).
+    #  @returns a boolean numpy array, True for each candidate meeting every constraint.
+    def checkConstraints(self,parameters,statistics):
+        """
+        Checks which candidate fake pulsars meet the parameter constraints. Each
+        parameter must lie within its bounds, lower < value <= upper, given by
+        self.bounds. The pulse width must also be less than the period. NaN
+        values never meet a constraint.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        parameters : list of numpy.ndarray
+            The candidate periods, DMs, duty cycles and S/Ns, as returned by drawParameters().
+        statistics : dict
+            The sampling statistics to update (see sampleParameters). The
+            rejections of each constraint are counted separately, so a
+            candidate breaking several constraints is counted by each.
+
+        Returns
+        -------
+        numpy.ndarray
+            A boolean array, True for each candidate meeting every constraint.
+
+        """
+        periods, dms, dutyCycles, snrs = parameters # @UnusedVariable
+        valid = None
+
+        for name, values in zip(["P0","DM","DUTY","SNR"],parameters):
+            lower, upper = self.bounds[name]
+            met = (values > lower) & (values <= upper)
+            statistics[name] += len(met) - met.sum()
+            valid = met if valid is None else valid & met
+
+        met = dutyCycles * periods < periods
+        statistics["WIDTH"] += len(met) - met.sum()
+        valid &= met
+
+        statistics["ACCEPTED"] += valid.sum()
+
+        return valid
+
+    # ****************************************************************************************************
+
+    ## Fits an exponential distribution to observed data.
+    #
+    #  @param self The object pointer.
+    #  @param data The observed data.
+    #  @param label The name of the data, used in plot titles.
+    #  @param xlabel The x-axis label used when plotting the fitted PDF.
+    #  @returns the location and scale of the fitted exponential.
+    def fitExponential(self,data,label,xlabel):
+        """
+        Fits an exponential distribution to observed data, with its location
+        fixed at zero. The fitted PDF is plotted if plots were requested
+        (-v or --report).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        data : list or numpy.ndarray
+            The observed data.
+        label : str
+            The name of the data, used in plot titles.
+        xlabel : str
+            The x-axis label used when plotting the fitted PDF.
+
+        Returns
+        -------
+        tuple
+            The location and scale of the fitted exponential.
+
+        """
+        loc, scale = stats.expon.fit(data, floc=0)
+        print "\t\tExponential Fit Parameters:"
+        print "\t\tLocation: ", loc, " Scale: ", scale
+
+        if(self.plotting):
+            print "\t\tPlotting PDF for exponential model..."
+            x = arange(0,int(max(data))+1) # x-axis data points, from zero to max.
+            pdf_fitted = stats.expon.pdf(x,loc,scale)
+            self.renderer.render({"kind":"plot","data":pdf_fitted,"title":"PDF of Exponential fitted to " + label,
+                                  "xlabel":xlabel,"ylabel":"Probability Density"})
+
+        return loc, scale
+
+    # ****************************************************************************************************
+
+    ## Loads the fake pulsar modelling data from a native ARFF file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the ARFF file.
+    #  @returns the periods (s), frequencies, S/Ns, DMs, pulse widths (ms) and duty cycles as numpy arrays.
+    def loadArffColumns(self,path):
+        """
+        Loads the fake pulsar modelling data from a native ARFF file, via the
+        memory mapped columnar cache maintained by ArffReader.py. The period,
+        S/N, DM, pulse width and duty cycle are read from the attributes named
+        by the --arffcols flag. Rows missing any of these values are skipped.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the ARFF file.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            The periods (s), frequencies, S/Ns, DMs, pulse widths (ms) and duty cycles.
+
+        """
+        columns = ArffReader(path,verbose=self.verbose).load()
+
+        for name in self.arffColumns:
+            if(name not in columns):
+                print "\n\tNumeric attribute not found in ARFF file: ", name
+                print "\tAvailable numeric attributes: ", ", ".join(sorted(columns.keys()))
+                print "\tExiting..."
+                sys.exit()
+
+        periods, snrs, dms, widths, dutyCycles = [columns[name] for name in self.arffColumns]
+
+        complete = ~(isnan(periods) | isnan(snrs) | isnan(dms) | isnan(widths) | isnan(dutyCycles))
+
+        if(self.verbose):
+            print "\tARFF rows with missing values skipped: ", len(complete) - complete.sum()
+
+        # As with parsed files, periods are in ms, frequencies are computed from them.
+        periods = periods[complete]
+
+        return periods / 1000, 1.0 / periods, snrs[complete], dms[complete], widths[complete], dutyCycles[complete]
+
+    # ****************************************************************************************************
+
+    ## Plots histograms and box-plots describing the generated fake pulsar parameters.
+    #
+    #  @param self The object pointer.
+    #  @param generatedPeriods The generated periods.
+    #  @param generatedDMs The generated DMs.
+    #  @param generatedDutyCycles The generated duty cycles.
+    #  @param generatedWidths The generated pulse widths.
+    #  @param generatedSNRs The generated S/Ns.
+    #  @param observedPeriods The periods observed in the ARFF file (empty if not used).
+    #  @param observedDMs The DMs observed in the ARFF file (empty if not used).
+    #  @param observedDutyCycles The duty cycles observed in the ARFF file (empty if not used).
+    #  @param observedWidths The pulse widths observed in the ARFF file (empty if not used).
+    #  @param observedSNRs The S/Ns observed in the ARFF file (empty if not used).
+    #  @param generatedSummaries The summaries of the generated parameters.
+    #  @param observedSummaries The summaries of the observed parameters (empty if not used).
+    def plotSamples(self,generatedPeriods,generatedDMs,generatedDutyCycles,generatedWidths,generatedSNRs,
+                    observedPeriods,observedDMs,observedDutyCycles,observedWidths,observedSNRs,
+                    generatedSummaries,observedSummaries):
+        """
+        Plots a histogram for each generated fake pulsar parameter. When the
+        parameters were modelled on data in an ARFF file, the generated and
+        observed data are also compared via box-plots.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        generatedPeriods : numpy.ndarray
+            The generated periods.
+        generatedDMs : numpy.ndarray
+            The generated DMs.
+        generatedDutyCycles : numpy.ndarray
+            The generated duty cycles.
+        generatedWidths : numpy.ndarray
+            The generated pulse widths.
+        generatedSNRs : numpy.ndarray
+            The generated S/Ns.
+        observedPeriods : list
+            The periods observed in the ARFF file (empty if not used).
+        observedDMs : list
+            The DMs observed in the ARFF file (empty if not used).
+        observedDutyCycles : list
+            The duty cycles observed in the ARFF file (empty if not used).
+        observedWidths : list
+            The pulse widths observed in the ARFF file (empty if not used).
+        observedSNRs : list
+            The S/Ns observed in the ARFF file (empty if not used).
+        generatedSummaries : dict
+            The StreamingStatistics summary of each generated parameter, keyed
+            by P0, DM, DUTY, WIDTH and SNR.
+        observedSummaries : dict
+            The StreamingStatistics summary of each observed parameter, keyed
+            by P0, DM, DUTY, WIDTH and SNR (empty if not used).
+
+        """
+        if(self.autoGenerate == True):
+            samples = [(generatedPeriods,"Histogram of Generated Periods ("+ self.p0Dist + " distribution)","Period (s)","P0"),
+                       (generatedDMs,"Histogram of Generated DMs ("+ self.dmDist + " distribution)","DM","DM"),
+                       (generatedDutyCycles,"Histogram of Generated duty cycles ("+ self.dutyDist + " distribution)","Duty cycle","DUTY"),
+                       (generatedSNRs,"Histogram of Generated S/Ns ("+ self.snrDist + " distribution)","S/N","SNR")]
+        elif(self.jointSampler is not None):
+            samples = [(generatedPeriods,"Histogram of KDE Generated Periods","Period (s)","P0"),
+                       (generatedDMs,"Histogram of KDE Generated DMs","Dispersion measure (DM)","DM"),
+                       (generatedDutyCycles,"Histogram of KDE Generated Duty Cycles","Duty Cycle","DUTY"),
+                       (generatedSNRs,"Histogram of KDE Generated S/Ns","S/N","SNR")]
+        else:
+            samples = [(generatedPeriods,"Histogram of Uniformly Generated Periods","Period (s)","P0"),
+                       (generatedDMs,"Histogram of Exponentially generated DMs","Dispersion measure (DM)","DM"),
+                       (generatedDutyCycles,"Histogram of Uniformly Generated Duty Cycles","Duty Cycle","DUTY"),
+                       (generatedSNRs,"Histogram of exponentially Generated S/Ns","S/N","SNR")]
+
+        for data, title, xlabel, name in samples:
+            print "\tCreating histogram for " + xlabel + " samples..."
+            self.renderer.render({"kind":"hist","data":data,"bins":self.freedmanDiaconisRule(data,generatedSummaries[name]),"color":'w',
+                                  "title":title,"xlabel":xlabel,"ylabel":"Frequency"})
+
+        print "\tCreating histogram for pulse width samples..."
+        self.renderer.render({"kind":"hist","data":generatedWidths,"bins":self.freedmanDiaconisRule(generatedWidths,generatedSummaries["WIDTH"]),
+                              "color":'b',"label":'Generated widths',
+                              "title":"Histogram of Generated Pulse Widths (based on Width = Duty Cycle x Period)",
+                              "xlabel":"Pulse Width (ms)","ylabel":"Frequency"})
+
+        # Now compute some stats describing generated data
+        if(self.autoGenerate == False):
+            max_period = observedSummaries["P0"].maximum
+            min_period = observedSummaries["P0"].minimum
+            max_dm     = observedSummaries["DM"].maximum
+            max_duty   = observedSummaries["DUTY"].maximum
+            max_snr    = observedSummaries["SNR"].maximum
+
+            if(len(observedSummaries["WIDTH"])>0):
+                max_width = max(generatedSummaries["WIDTH"].maximum,observedSummaries["WIDTH"].maximum)
+            else:
+                max_width = generatedSummaries["WIDTH"].maximum
+
+            for generated, observed, name, label, ylabel, ylim in \
+                [(generatedPeriods,observedPeriods,"P0","period","Period (s)",
+                  [min_period + (0.2 * min_period),max_period + (0.2 * max_period)]),
+                 (generatedDMs,observedDMs,"DM","DM","Dispersion measure",[-10,max_dm + (0.2 * max_dm)]),
+                 (generatedDutyCycles,observedDutyCycles,"DUTY","duty cycles","Duty Cycle",[-1,max_duty + (0.2 * max_duty)]),
+                 (generatedWidths,observedWidths,"WIDTH","Pulse Widths","Pulse width (s)",[-1,max_width + (0.2 * max_width)]),
+                 (generatedSNRs,observedSNRs,"SNR","S/N","S/N",[-1,max_snr + (0.2 * max_snr)])]:
+                self.compareSamples(generated,observed,label,ylabel,ylim,generatedSummaries[name],observedSummaries[name])
+
+    # ****************************************************************************************************
+
+    ## Prints summary statistics for generated and observed data, and compares them via a box-plot.
+    #
+    #  @param self The object pointer.
+    #  @param generated The generated data.
+    #  @param observed The observed data.
+    #  @param label The name of the data, used in the plot title.
+    #  @param ylabel The y-axis label of the plot.
+    #  @param ylim The y-axis limits of the plot.
+    #  @param generatedSummary The summary of the generated data.
+    #  @param observedSummary The summary of the observed data.
+    def compareSamples(self,generated,observed,label,ylabel,ylim,generatedSummary,observedSummary):
+        """
+        Prints summary statistics for generated and observed data, from their
+        single pass summaries, and compares them via a box-plot.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        generated : list or numpy.ndarray
+            The generated data.
+        observed : list or numpy.ndarray
+            The observed data.
+        label : str
+            The name of the data, used in the plot title.
+        ylabel : str
+            The y-axis label of the plot.
+        ylim : list
+            The y-axis limits of the plot.
+        generatedSummary : StreamingStatistics
+            The summary of the generated data.
+        observedSummary : StreamingStatistics
+            The summary of the observed data.
+
+        """
+        print "\tCreating box-plot for generated and observed " + label + " samples..."
+        print "\tBoxplot parameters..."
+
+        for name, summary in [("Generated",generatedSummary),("Observed",observedSummary)]:
+            print "\t\t" + name + " Data:"
+            print "\t\t\tMin    : " , summary.minimum
+            print "\t\t\tMax    : " , summary.maximum
+            print "\t\t\tMedian : " , summary.median()
+            print "\t\t\tSTDEV  : " , summary.std()
+            print "\t\t\tIQR    : " , str(summary.iqr())
+            print "\t\t\tRange  : " , str(summary.range())
+
+        self.renderer.render({"kind":"boxplot","data":[generated, observed],
+                              "title":"Box-plot for generated and observed " + label + " samples",
+                              "xticks":["Generated", "Observed"],"ylabel":ylabel,"ylim":ylim})
+
+    # ******************************************************************************************
+
+    ## Loads the ATNF catalog values used to create par files, from the binary catalog cache.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the ATNF pulsar catalog database file.
+    #  @returns the names, RAJs, DECJs, periods, frequencies, DMs, W10s and W50s as lists.
+    def loadCatalogCache(self,path):
+        """
+        Loads the ATNF catalog values used to create par files, from the binary
+        catalog cache maintained by ATNF/CatalogCache.py. The cache is rebuilt
+        first if it is missing, or if the catalog file has changed.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the ATNF pulsar catalog database file.
+
+        Returns
+        -------
+        tuple of lists
+            The names, RAJs, DECJs, periods, frequencies, DMs, W10s and W50s.
+
+        Examples
+        --------
+
+        >>> names, rajs, decjs, periods, freqs, dms, w10s, w50s = loadCatalogCache("/Users/rob/psrcat.db")
+
+        """
+
+        # The catalog cache lives alongside this script when deployed, and in
+        # the ATNF directory of the repository.
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","ATNF"))
+        from CatalogCache import CatalogCache
+
+        catalog = CatalogCache(path,verbose=self.verbose).load()
+
+        # Convert to lists of python types, so values are formatted in the
+        # par files exactly as if they had been parsed from text.
+        return catalog["PSRJ"].tolist(), catalog["RAJ"].tolist(), catalog["DECJ"].tolist(),\
+               catalog["P0"].tolist(), catalog["F0"].tolist(), catalog["DM"].tolist(),\
+               catalog["W10"].tolist(), catalog["W50"].tolist()
+
+    # ******************************************************************************************
+
+    ## Selects the catalog pulsars meeting the period, DM, W50 and sky region criteria.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the ATNF pulsar catalog database file, or parsed catalog file.
+    #  @returns the set of names of the selected pulsars.
+    def selectCatalogEntries(self,path):
+        """
+        Selects the catalog pulsars meeting the period, DM, W50 and sky region
+        criteria supplied on the command line, using the indexes maintained by
+        ATNF/CatalogQuery.py.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the ATNF pulsar catalog database file, or to a
+            parsed catalog file created by ATNFDataExtractor.py.
+
+        Returns
+        -------
+        set
+            The names of the selected pulsars.
+
+        """
+
+        # The catalog query module lives alongside this script when deployed, and in
+        # the ATNF directory of the repository.
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","ATNF"))
+        from CatalogQuery import CatalogQuery
+
+        query = CatalogQuery(verbose=self.verbose)
 
         try:
+            p0Range  = query.parseBounds(self.p0Range,2)
+            dmRange  = query.parseBounds(self.dmRange,2)
+            w50Range = query.parseBounds(self.w50Range,2)
+            cone     = query.parseBounds(self.cone,3)
+        except ValueError as e:
+            print "\tError parsing catalog selection criteria:", e
+            print "\tExiting..."
+            sys.exit()
 
-            # beta distribution
-            if(dist == "beta"):
-                data = stats.beta.rvs(params[0],params[1],loc=params[0],scale=params[1],size=samples)
-                print type(data)
+        query.setCatalog(query.loadCatalog(path))
 
-            # Exponential distribution
-            elif(dist == "expon"):
-                # Need to make modulo
-                data = stats.expon.rvs(loc=params[0],scale=params[1],size=samples)
+        return set(query.names(query.select(p0Range,dmRange,w50Range,cone)))
 
-            # Gamma distribution
-            elif(dist == "gamma"):
-                # Need to make modulo
-                data = stats.gamma.rvs(params[0],loc=params[1],scale=params[2],size=samples)
+    # ******************************************************************************************
 
-            # Logistic distribution
-            elif(dist == "logistic"):
-                # Need to make modulo
-                data = stats.logistic.rvs(loc=params[0],scale=params[1],size=samples)
+    ## Reads a catalog changeset file created by ATNFDataExtractor.py.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the changeset file.
+    #  @returns a dictionary containing the set of pulsar names for each change
+    #   type, i.e. "ADDED", "REMOVED" and "MODIFIED".
+    def readChangeset(self,path):
+        """
+        Reads a catalog changeset file created by ATNFDataExtractor.py, which
+        has the format,
 
-            # Log normal distribution
-            elif(dist == "lognorm"):
-                # Need to make modulo
-                data = stats.lognorm.rvs(params[0],loc=params[1],scale=params[2],size=samples)
+        Change,Name
+        ADDED,J0002+6216
+        MODIFIED,J0348+0432
+        REMOVED,J0033+57
 
-            # Normal distribution
-            elif(dist == "norm"):
-                data = stats.norm.rvs(loc=params[0],scale=params[1],size=samples)
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the changeset file.
 
-            # Truncated normal distribution
-            elif(dist == "truncnorm"):
+        Returns
+        -------
+        dict
+            A dictionary containing the set of pulsar names for each change
+            type, i.e. "ADDED", "REMOVED" and "MODIFIED".
 
-                lower = float(params[0])
-                upper = float(params[1])
-                mu    = float(params[2])
-                sigma = float(params[3])
-                data = stats.truncnorm.rvs((lower-mu)/sigma,(upper-mu)/sigma,loc=mu,scale=sigma,size=samples)
+        """
+        changes = {"ADDED":set(),"REMOVED":set(),"MODIFIED":set()}
 
-            # Rayleigh distribution
-            elif(dist == "rayleigh"):
-                data = stats.rayleigh.rvs(loc=params[0],scale=params[1],size=samples)
+        sourceFile = open(path,'r')
 
-            # Uniform distribution
-            elif(dist == "uniform"):
-                data = stats.uniform.rvs(loc=params[0],scale=params[1],size=samples)
+        try:
+            sourceFile.readline() # Skip the header.
 
-        except Exception as e: # Catch *all* exceptions.
-            print "\tError generating data using ", dist, " distribution with parameters ",params,"\n\t", sys.exc_info()[0]
+            for line in sourceFile:
+                components = line.strip().split(",")
+                if(len(components) == 2 and components[0] in changes):
+                    changes[components[0]].add(components[1])
+        finally:
+            sourceFile.close()
 
-        return data
+        return changes
 
     # ******************************************************************************************
 
@@ -1497,12 +2241,39 @@ class CandidateParGenerator:
 
     # ******************************************************************************************
 
+    ## Prints a one line summary of a column of data.
+    #
+    #  @param self The object pointer.
+    #  @param label The label printed before the summary.
+    #  @param summary The summary of the data.
+    def printSummary(self,label,summary):
+        """
+        Prints a one line summary (count, mean, min, max and number of zero
+        elements) of a column of data, from its single pass summary.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        label : str
+            The label printed before the summary.
+        summary : StreamingStatistics
+            The summary of the data.
+
+        """
+        print "\t" + label, len(summary) , " Mean: ", summary.mean() , \
+            " Min: ", summary.minimum , " Max: ", summary.maximum , \
+            " Zero elements: ", summary.zeros
+
+    # ******************************************************************************************
+
     ## Calculates the number of bins to use in a histogram according to the Freedman-Diaconis rule.
     #
     #  @param self The object pointer.
     #  @param data The data to find the 'optimal' number of histogram bins for.
+    #  @param summary The summary of the data (optional).
     #  @returns the total number of bins to use when plotting the data in a histogram.
-    def freedmanDiaconisRule(self,data):
+    def freedmanDiaconisRule(self,data,summary=None):
         """
         Calculates the number of bins to use in a histogram according to the Freedman-Diaconis rule.
 
@@ -1512,6 +2283,9 @@ class CandidateParGenerator:
             The object pointer.
         data : list or numpy.ndarray
             The list containing numerical data for which the number of bins is to be computed.
+        summary : StreamingStatistics
+            The summary of the data (optional). If not supplied, it is computed
+            in a single pass over the data.
 
         Returns
         -------
@@ -1525,15 +2299,18 @@ class CandidateParGenerator:
         >>> bins = freedmanDiaconisRule(data)
 
         """
+        if(summary is None):
+            summary = StreamingStatistics().update(data)
+
         # interquartile range, Q3-Q1....
-        iqr = stats.scoreatpercentile(data, 75) - stats.scoreatpercentile(data, 25)
-        binwidth = 2 * iqr * pow(len(data), -0.3333333)
+        iqr = summary.iqr()
+        binwidth = 2 * iqr * pow(len(summary), -0.3333333)
 
         if(binwidth<=0):
             binwidth=60
 
         # calculate n bins
-        rnge = max(data) - min(data)
+        rnge = summary.range()
         nbins = ceil( rnge / binwidth )
 
         if(self.verbose):
@@ -1547,5 +2324,82 @@ class CandidateParGenerator:
 
     # ****************************************************************************************************
 
+## The sampling settings of this process, set by initSampling (see sampleStreamBlock).
+samplingSettings = {}
+
+## Sets the sampling settings used by sampleStreamBlock in this process.
+# Passed as the initializer of the multiprocessing pool, so that the
+# settings are sent to each worker process once, rather than with every
+# stream block.
+#
+#  @param settings A dictionary mapping the CandidateParGenerator attributes used by
+#   sampleParameters() to their values.
+def initSampling(settings):
+    """
+    Sets the sampling settings used by sampleStreamBlock in this process.
+    Passed as the initializer of the multiprocessing pool, so that the
+    settings (which include the fitted samplers) are sent to each worker
+    process once, rather than with every stream block.
+
+    Parameters
+    ----------
+    settings : dict
+        A dictionary mapping the CandidateParGenerator attributes used by
+        sampleParameters() to their values.
+
+    """
+    samplingSettings.clear()
+    samplingSettings.update(settings)
+
+# ****************************************************************************************************
+
+## Draws the fake pulsar parameters of a single stream block.
+# Defined at module level so that it can be called by a multiprocessing
+# worker process (see CandidateParGenerator.main). The sampling settings
+# must first be set by initSampling.
+#
+#  @param arguments A tuple containing the random seed, the position of the stream
+#   block and the number of samples to draw.
+#  @returns the periods, DMs, duty cycles, pulse widths and S/Ns as numpy arrays, the sampling statistics
+#   and a summary of each parameter.
+def sampleStreamBlock(arguments):
+    """
+    Draws the fake pulsar parameters of a single stream block. Defined at
+    module level so that it can be called by a multiprocessing worker process
+    (see CandidateParGenerator.main). The sampling settings must first be set
+    by initSampling.
+
+    Parameters
+    ----------
+    arguments : tuple
+        A tuple containing the random seed, the position of the stream block
+        and the number of samples to draw.
+
+    Returns
+    -------
+    tuple
+        The periods, DMs, duty cycles, pulse widths and S/Ns as numpy arrays,
+        the sampling statistics (see CandidateParGenerator.sampleParameters),
+        and a dictionary mapping each of CandidateParGenerator.summaryColumns
+        to a StreamingStatistics summary of the parameter, which the caller
+        merges across stream blocks.
+
+    """
+    seed, streamBlock, count = arguments
+
+    generator = CandidateParGenerator()
+
+    for name, value in samplingSettings.iteritems():
+        setattr(generator,name,value)
+
+    result = generator.sampleParameters(generator.createStreams(seed,streamBlock),count)
+
+    summaries = dict((name,StreamingStatistics().update(values))
+                     for name, values in zip(generator.summaryColumns,result[0:5]))
+
+    return result + (summaries,)
+
+# ****************************************************************************************************
+
 if __name__ == '__main__':
     CandidateParGenerator().main()
\ No newline at end of file
@@ -0,0 +1,580 @@
+## @package PARS
+# A module used to store the parameters of every fake pulsar in a single
+# typed, columnar manifest file.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                         Manifest Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Stores the parameters of every fake pulsar generated by                |
+    | CandidateParGenerator.py in a single manifest file (numpy .npy format),|
+    | with one row per fake pulsar and the typed columns:                    |
+    |                                                                        |
+    | ID    - the number of the fake pulsar.                                 |
+    | NAME  - the name of its par file, without the .par suffix.             |
+    | P0    - the period (s).                                                |
+    | DM    - the dispersion measure.                                        |
+    | DUTY  - the duty cycle.                                                |
+    | WIDTH - the pulse width (s).                                           |
+    | SNR   - the target S/N.                                                |
+    | PAR   - the path to its par file, or to the pack holding it.           |
+    | SEED  - the random seed it was generated with.                         |
+    |                                                                        |
+    | Later pipeline stages join on the manifest, rather than parsing the    |
+    | parameters out of file names. The manifest is memory mapped, so each   |
+    | column is loaded with a single read, and any parameter is available    |
+    | downstream. The manifest can also be exported as CSV.                  |
+    |                                                                        |
+    | Requires numpy.                                                        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -m (string) full path to a manifest file.                              |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | -w (string) full path to a CSV file to export the manifest to.         |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+
+# Numpy Imports:
+from numpy import arange
+from numpy import argsort
+from numpy import array
+from numpy import clip
+from numpy import load
+from numpy import save
+from numpy import searchsorted
+from numpy import where
+from numpy.lib.format import open_memmap
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Manifest Version 1.0
+#
+# Stores the parameters of every fake pulsar generated by
+# CandidateParGenerator.py in a single manifest file (numpy .npy format),
+# with one row per fake pulsar and the typed columns ID, NAME, P0 (s), DM,
+# DUTY, WIDTH (s), SNR, PAR and SEED.
+#
+# Later pipeline stages join on the manifest by par (or predictor) file
+# name, rather than parsing the parameters out of the name. E.g. for the
+# fake pulsar named,
+#
+# FakePulsar_1_0.184466_12.5_9.1
+#
+# the row with ID 1 gives the period, DM, duty cycle, width and S/N at
+# full precision.
+#
+# Requires numpy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -m (string) full path to a manifest file.
+#
+# Optional Command Line Arguments:
+#
+# -v (boolean) verbose debugging flag.
+#
+# -w (string) full path to a CSV file to export the manifest to.
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class Manifest:
+    """
+    Description:
+
+    Stores the parameters of every fake pulsar in a single typed, columnar
+    manifest file (numpy .npy format), which later pipeline stages join on
+    by par (or predictor) file name.
+
+    Examples
+    --------
+
+    >>> manifest = Manifest("/Users/rob/pars/FakePulsar.manifest.npy")
+    >>> rows = manifest.lookup(["FakePulsar_1_0.184466_12.5_9.1"])
+    >>> print manifest.load()["SNR"][rows]
+    """
+
+    ## The columns stored in the manifest, and their numpy types. The widths of
+    #  the string columns NAME and PAR are defaults, which begin() can override.
+    nameWidth = 64
+    columns = [("ID","i8"),("NAME","S" + str(nameWidth)),("P0","f8"),("DM","f8"),("DUTY","f8"),
+               ("WIDTH","f8"),("SNR","f8"),("PAR","S256"),("SEED","i8")]
+
+    ## Creates a new manifest object for the specified manifest file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the manifest file.
+    #  @param verbose The verbose debugging flag.
+    def __init__(self,path="",verbose=False):
+        """
+        Creates a new manifest object for the specified manifest file. The
+        manifest is loaded the first time it is needed.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the manifest file.
+        verbose : bool
+            The verbose debugging flag.
+
+        """
+        self.path    = path
+        self.verbose = verbose
+        self.rows    = None
+        self.order   = None
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and summarises or exports a manifest.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and summarises or exports a manifest.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-m", action="store", dest="manifestPath",help='Path to a manifest file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("-w", action="store", dest="outputPath",help='Path to a CSV file to export the manifest to (optional).',default="")
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.verbose = args.verbose
+        self.path    = args.manifestPath
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",self.verbose
+        print "\tManifest file path:",self.path
+        print "\tCSV export file path:",args.outputPath
+
+        if(os.path.isfile(self.path) == False):
+            print "\n\tYou must supply a valid manifest file via the -m flag."
+            print "\tExiting..."
+            sys.exit()
+
+        manifest = self.load()
+
+        print "\n\tFake pulsars in manifest: ", len(manifest)
+
+        for name in ["P0","DM","DUTY","WIDTH","SNR"]:
+            if(len(manifest) > 0):
+                print "\t\t", name, " min: ", manifest[name].min(), " max: ", manifest[name].max()
+
+        if(args.outputPath):
+            print "\n\tRows exported: ", self.export(args.outputPath)
+
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Starts writing a new manifest, replacing any existing content.
+    #
+    #  @param self The object pointer.
+    #  @param count The number of fake pulsars that will be written to the manifest.
+    #  @param widths Optional dictionary of string column widths, overriding the defaults.
+    def begin(self,count,widths=None):
+        """
+        Starts writing a new manifest, replacing any existing content. Rows are
+        then added in blocks via append(), and the manifest completed via
+        finish(). Rows are written to a memory mapped temporary file as blocks
+        are added, so memory use does not grow with the number of fake pulsars.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        count : int
+            The number of fake pulsars that will be written to the manifest.
+        widths : dict
+            Optional dictionary mapping string column names (NAME, PAR) to the
+            number of characters to store, overriding the defaults in columns.
+            Values longer than their column raise a ValueError in append().
+
+        """
+        # Remove the old manifest first, so that an interrupted write leaves no
+        # usable (but wrong) manifest behind.
+        if(os.path.exists(self.path)):
+            os.remove(self.path)
+
+        self.rows  = None
+        self.order = None
+
+        columns = []
+        for name, dtype in self.columns:
+            if(widths is not None and name in widths):
+                dtype = "S" + str(max(int(widths[name]),1))
+            columns.append((name,dtype))
+
+        self.newRows = open_memmap(self.path + ".tmp",mode='w+',dtype=columns,shape=(count,))
+        self.written = 0
+
+    # ****************************************************************************************************
+
+    ## Adds a block of fake pulsars to a manifest started with begin().
+    #
+    #  @param self The object pointer.
+    #  @param first The number (ID) of the first fake pulsar in the block.
+    #  @param names The name of each par file.
+    #  @param periods The periods (s).
+    #  @param dms The dispersion measures.
+    #  @param dutyCycles The duty cycles.
+    #  @param widths The pulse widths (s).
+    #  @param snrs The S/N values.
+    #  @param pars The path to each par file, or to the pack holding it.
+    #  @param seed The random seed the fake pulsars were generated with.
+    def append(self,first,names,periods,dms,dutyCycles,widths,snrs,pars,seed):
+        """
+        Adds a block of fake pulsars to a manifest started with begin(). Each
+        column of the block is written with a single assignment.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        first : int
+            The number (ID) of the first fake pulsar in the block. The fake
+            pulsars in the block are numbered consecutively from it.
+        names : list
+            The name of each par file, i.e. its file name without the .par suffix.
+        periods : numpy.ndarray
+            The periods (s).
+        dms : numpy.ndarray
+            The dispersion measures.
+        dutyCycles : numpy.ndarray
+            The duty cycles.
+        widths : numpy.ndarray
+            The pulse widths (s).
+        snrs : numpy.ndarray
+            The S/N values.
+        pars : list or str
+            The path to each par file, or a single path to the pack holding
+            every par file.
+        seed : int
+            The random seed the fake pulsars were generated with.
+
+        Raises
+        ------
+        ValueError
+            If a name or path is longer than its column, as numpy would
+            otherwise silently truncate it (breaking later joins on NAME).
+
+        """
+        if(len(names) == 0):
+            return
+
+        self.checkWidth("NAME",names)
+        self.checkWidth("PAR",[pars] if isinstance(pars,basestring) else pars)
+
+        rows = slice(self.written,self.written + len(names))
+
+        self.newRows["ID"][rows]    = arange(first,first + len(names))
+        self.newRows["NAME"][rows]  = names
+        self.newRows["P0"][rows]    = periods
+        self.newRows["DM"][rows]    = dms
+        self.newRows["DUTY"][rows]  = dutyCycles
+        self.newRows["WIDTH"][rows] = widths
+        self.newRows["SNR"][rows]   = snrs
+        self.newRows["PAR"][rows]   = pars
+        self.newRows["SEED"][rows]  = seed
+
+        self.written += len(names)
+
+    # ****************************************************************************************************
+
+    ## Checks that the values to store in a string column fit its width.
+    #
+    #  @param self The object pointer.
+    #  @param column The name of the string column.
+    #  @param values The strings to store in the column.
+    def checkWidth(self,column,values):
+        """
+        Checks that the values to store in a string column fit its width.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        column : str
+            The name of the string column.
+        values : list
+            The strings to store in the column.
+
+        Raises
+        ------
+        ValueError
+            If any value is longer than the column.
+
+        """
+        width   = self.newRows.dtype[column].itemsize
+        longest = max([len(value) for value in values])
+
+        if(longest > width):
+            raise ValueError("Manifest " + column + " value of " + str(longest) +
+                             " characters exceeds the column width of " + str(width) +
+                             " (pass a larger width to begin())")
+
+    # ****************************************************************************************************
+
+    ## Completes a manifest started with begin().
+    #
+    #  @param self The object pointer.
+    #  @returns the number of fake pulsars written.
+    def finish(self):
+        """
+        Completes a manifest started with begin(), by moving it into place.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of fake pulsars written.
+
+        """
+        # If fewer rows were written than expected, keep only those written.
+        if(self.written < len(self.newRows)):
+            save(self.path,array(self.newRows[0:self.written]))
+            del self.newRows
+            os.remove(self.path + ".tmp")
+        else:
+            self.newRows.flush()
+            del self.newRows
+            os.rename(self.path + ".tmp",self.path)
+
+        if(self.verbose):
+            print "\tFake pulsars written to manifest: ", self.written, " (", self.path, ")"
+
+        return self.written
+
+    # ****************************************************************************************************
+
+    ## Loads the manifest, if not already loaded.
+    #
+    #  @param self The object pointer.
+    #  @returns the manifest, a numpy structured array with a row per fake pulsar.
+    def load(self):
+        """
+        Loads the manifest, if not already loaded. The manifest is memory
+        mapped, so only the columns and rows used are read.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        numpy.ndarray
+            The manifest, a structured array with a row per fake pulsar and
+            the columns ID, NAME, P0, DM, DUTY, WIDTH, SNR, PAR and SEED.
+
+        """
+        if(self.rows is None):
+            self.rows = load(self.path,mmap_mode='r')
+
+        return self.rows
+
+    # ****************************************************************************************************
+
+    ## Finds the manifest rows of fake pulsars, by name.
+    #
+    #  @param self The object pointer.
+    #  @param names The par (or predictor) file names, without their suffix.
+    #  @returns a numpy array containing the row of each name, or -1 if the name is not in the manifest.
+    def lookup(self,names):
+        """
+        Finds the manifest rows of fake pulsars, by the names of their par (or
+        predictor) files. The names are joined against the manifest in a
+        single vectorised search of its sorted NAME column, rather than one
+        string parse per file.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        names : list
+            The par (or predictor) file names, without their suffix.
+
+        Returns
+        -------
+        numpy.ndarray
+            The row of each name, or -1 if the name is not in the manifest.
+
+        """
+        manifest = self.load()
+
+        if(len(manifest) == 0 or len(names) == 0):
+            return array([-1] * len(names),dtype="i8")
+
+        if(self.order is None):
+            self.order = argsort(manifest["NAME"],kind="mergesort")
+
+        # Keep the names at their own width, so that a name longer than the
+        # NAME column cannot match a truncated copy of itself.
+        sortedNames = manifest["NAME"][self.order]
+        names = array(names,dtype=str)
+
+        positions = clip(searchsorted(sortedNames,names),0,len(sortedNames) - 1)
+        found = sortedNames[positions] == names
+
+        return where(found,self.order[positions],-1)
+
+    # ****************************************************************************************************
+
+    ## Exports the manifest as CSV.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the CSV file to create.
+    #  @returns the number of rows exported.
+    def export(self,path):
+        """
+        Exports the manifest as CSV, with a header row naming the columns.
+        Floats are written at full precision, so the CSV reproduces the
+        manifest values exactly.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the CSV file to create.
+
+        Returns
+        -------
+        int
+            The number of rows exported.
+
+        """
+        manifest = self.load()
+        names = [name for name, dtype in self.columns] # @UnusedVariable
+
+        destinationFile = open(path,'w')
+
+        try:
+            destinationFile.write(",".join(names) + "\n")
+
+            # Floats are written with repr, as str rounds them to 12 significant digits.
+            formatters = [repr if manifest.dtype[name].kind == "f" else str for name in names]
+
+            for row in manifest:
+                destinationFile.write(",".join([formatter(value) for formatter, value in zip(formatters,row)]) + "\n")
+        finally:
+            destinationFile.close()
+
+        return len(manifest)
+
+    # ****************************************************************************************************
+
+    ## Gets the number of fake pulsars in the manifest.
+    #
+    #  @param self The object pointer.
+    #  @returns the number of fake pulsars in the manifest.
+    def __len__(self):
+        """
+        Gets the number of fake pulsars in the manifest.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of fake pulsars in the manifest.
+
+        """
+        return len(self.load())
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    Manifest().main()
@@ -0,0 +1,765 @@
+## @package PARS
+# A module used to store many Tempo2 compatible par files in a single
+# indexed pack file.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                         Par Pack Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Stores many par files in a single pack file, instead of one small file |
+    | per pulsar. A pack consists of two files:                              |
+    |                                                                        |
+    | <name>.pack         - the text of every par file, concatenated.        |
+    | <name>.pack.idx.npy - an index giving the name, byte offset and length |
+    |                       of each par file in the pack (numpy .npy format).|
+    |                                                                        |
+    | Par files can be read from the pack by name or by position, without    |
+    | reading the rest of the pack, or extracted on demand into real files   |
+    | for tools (e.g. tempo2) that require a path. Packing the par files of  |
+    | large numbers of fake pulsars avoids exhausting inodes, and avoids     |
+    | slow directory scans in later pipeline stages.                         |
+    |                                                                        |
+    | Requires numpy.                                                        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (string) full path to a par pack file.                              |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | -l (boolean) list the names of the par files in the pack.              |
+    |                                                                        |
+    | -x (string) comma separated names of the par files to extract. Use     |
+    |             "all" to extract every par file in the pack.               |
+    |                                                                        |
+    | -d (string) full path to the directory to extract par files to.        |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+
+# Numpy Imports:
+from numpy import array
+from numpy import cumsum
+from numpy import load
+from numpy import save
+from numpy.lib.format import open_memmap
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Par Pack Version 1.0
+#
+# Stores many par files in a single pack file, instead of one small file
+# per pulsar. A pack consists of two files:
+#
+# <name>.pack         - the text of every par file, concatenated.
+# <name>.pack.idx.npy - an index giving the name, byte offset and length
+#                       of each par file in the pack (numpy .npy format).
+#
+# Par files can be read from the pack by name or by position, without
+# reading the rest of the pack, or extracted on demand into real files
+# for tools (e.g. tempo2) that require a path. The name of each par file
+# is its file name without the .par suffix, e.g.
+#
+# FakePulsar_1_0.184466_12.5_9.1
+#
+# Requires numpy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -p (string) full path to a par pack file.
+#
+# Optional Command Line Arguments:
+#
+# -v (boolean) verbose debugging flag.
+#
+# -l (boolean) list the names of the par files in the pack.
+#
+# -x (string) comma separated names of the par files to extract. Use
+#             "all" to extract every par file in the pack.
+#
+# -d (string) full path to the directory to extract par files to.
+#
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class ParPack:
+    """
+    Description:
+
+    Stores many par files in a single pack file, instead of one small file
+    per pulsar. A pack consists of two files:
+
+    <name>.pack         - the text of every par file, concatenated.
+    <name>.pack.idx.npy - an index giving the name, byte offset and length
+                          of each par file in the pack (numpy .npy format).
+
+    Par files can be read from the pack by name or by position, without
+    reading the rest of the pack, or extracted on demand into real files
+    for tools (e.g. tempo2) that require a path.
+
+    Examples
+    --------
+
+    >>> ParPack("/Users/rob/pars/FakePulsar.pack").write(names,texts)
+    >>> pack = ParPack("/Users/rob/pars/FakePulsar.pack")
+    >>> print pack.read("FakePulsar_1_0.184466_12.5_9.1")
+    >>> path = pack.extract("FakePulsar_1_0.184466_12.5_9.1","/tmp")
+    >>> pack.close()
+    """
+
+    ## The columns stored in the index, and their numpy types. The width of the
+    #  NAME column is a default, which begin() can override.
+    columns = [("NAME","S64"),("OFFSET","i8"),("LENGTH","i8")]
+
+    ## The suffix of the index file.
+    indexSuffix = ".idx.npy"
+
+    ## Creates a new pack object for the specified pack file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the pack file.
+    #  @param verbose The verbose debugging flag.
+    def __init__(self,path="",verbose=False):
+        """
+        Creates a new pack object for the specified pack file. The pack is
+        opened for reading the first time a par file is requested.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the pack file.
+        verbose : bool
+            The verbose debugging flag.
+
+        """
+        self.path       = path
+        self.verbose    = verbose
+        self.index      = None
+        self.rows       = None
+        self.sourceFile = None
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and lists or extracts the par files in a pack.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and lists or extracts the par files in a pack.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-p", action="store", dest="packPath",help='Path to a par pack file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("-l", action="store_true", dest="list",help='List the par files in the pack (optional).',default=False)
+        parser.add_option("-x", action="store", dest="extract",help='Comma separated names of par files to extract, or all (optional).',default="")
+        parser.add_option("-d", action="store", dest="outputDir",help='Path to the directory to extract par files to (optional).',default="")
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.verbose = args.verbose
+        self.path    = args.packPath
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",self.verbose
+        print "\tPar pack file path:",self.path
+        print "\tList par files:",args.list
+        print "\tPar files to extract:",args.extract
+        print "\tExtraction directory:",args.outputDir
+
+        if(os.path.isfile(self.path) == False or os.path.isfile(self.indexPath()) == False):
+            print "\n\tYou must supply a valid par pack file via the -p flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(args.extract and not args.outputDir):
+            print "\n\tYou must supply an extraction directory via the -d flag."
+            print "\tExiting..."
+            sys.exit()
+
+        print "\n\tPar files in pack: ", len(self)
+
+        try:
+            if(args.list):
+                for name in self.names():
+                    print "\t", name
+
+            if(args.extract):
+                if(os.path.exists(args.outputDir) == False):
+                    os.makedirs(args.outputDir)
+
+                if(args.extract == "all"):
+                    names = self.names()
+                else:
+                    names = args.extract.split(",")
+
+                for name in names:
+                    if(self.contains(name) == False):
+                        print "\tPar file not found in pack: ", name
+                        continue
+
+                    path = self.extract(name,args.outputDir)
+
+                    if(self.verbose):
+                        print "\tExtracted: ", path
+        finally:
+            self.close()
+
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Writes par files to the pack, replacing any existing content.
+    #
+    #  @param self The object pointer.
+    #  @param names The name of each par file.
+    #  @param texts The text of each par file.
+    #  @returns the number of par files written.
+    def write(self,names,texts):
+        """
+        Writes par files to the pack, replacing any existing content. The pack
+        is written with a single open call, and the index is written after it,
+        so a pack is never read with an index describing different content.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        names : list
+            The name of each par file, i.e. its file name without the .par suffix.
+        texts : list
+            The text of each par file.
+
+        Returns
+        -------
+        int
+            The number of par files written.
+
+        """
+        self.begin(len(names),max([len(name) for name in names] + [1]))
+        self.append(names,texts)
+        return self.finish()
+
+    # ****************************************************************************************************
+
+    ## Starts writing a new pack, replacing any existing content.
+    #
+    #  @param self The object pointer.
+    #  @param count The number of par files that will be written to the pack.
+    #  @param nameWidth The number of characters stored per name (optional), overriding the default.
+    def begin(self,count,nameWidth=None):
+        """
+        Starts writing a new pack, replacing any existing content. Par files are
+        then added in blocks via append(), and the pack completed via finish().
+        The index is written to a memory mapped temporary file as blocks are
+        added, so memory use does not grow with the number of par files.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        count : int
+            The number of par files that will be written to the pack.
+        nameWidth : int
+            The number of characters stored per name (optional), overriding
+            the default width of the NAME column. Longer names raise a
+            ValueError in append().
+
+        """
+        self.close()
+
+        # Remove the old index first, so that an interrupted write leaves no
+        # usable (but wrong) pack behind.
+        if(os.path.exists(self.indexPath())):
+            os.remove(self.indexPath())
+
+        self.index = None
+        self.rows  = None
+
+        self.destinationFile = open(self.path,'wb')
+        columns = self.columns
+        if(nameWidth is not None):
+            columns = [("NAME","S" + str(max(int(nameWidth),1)))] + self.columns[1:]
+
+        self.newIndex        = open_memmap(self.indexPath() + ".tmp",mode='w+',dtype=columns,shape=(count,))
+        self.written         = 0
+        self.offset          = 0
+
+    # ****************************************************************************************************
+
+    ## Adds a block of par files to a pack started with begin().
+    #
+    #  @param self The object pointer.
+    #  @param names The name of each par file.
+    #  @param texts The text of each par file.
+    def append(self,names,texts):
+        """
+        Adds a block of par files to a pack started with begin(). The block is
+        written to the pack with a single call.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        names : list
+            The name of each par file, i.e. its file name without the .par suffix.
+        texts : list
+            The text of each par file.
+
+        Raises
+        ------
+        ValueError
+            If a name is longer than the NAME column, as numpy would otherwise
+            silently truncate it, so that the par file could not be read by name.
+
+        """
+        if(len(names) == 0):
+            return
+
+        width   = self.newIndex.dtype["NAME"].itemsize
+        longest = max([len(name) for name in names])
+
+        if(longest > width):
+            raise ValueError("Par pack name of " + str(longest) + " characters exceeds the NAME column width of " +
+                             str(width) + " (pass a larger width to begin())")
+
+        lengths = array([len(text) for text in texts],dtype="i8")
+        rows    = slice(self.written,self.written + len(names))
+
+        self.newIndex["NAME"][rows]   = names
+        self.newIndex["LENGTH"][rows] = lengths
+        self.newIndex["OFFSET"][rows] = self.offset + cumsum(lengths) - lengths
+
+        self.destinationFile.write("".join(texts))
+
+        self.written += len(names)
+        self.offset  += int(lengths.sum())
+
+    # ****************************************************************************************************
+
+    ## Completes a pack started with begin().
+    #
+    #  @param self The object pointer.
+    #  @returns the number of par files written.
+    def finish(self):
+        """
+        Completes a pack started with begin(). The pack file is closed first,
+        and only then is the index moved into place.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of par files written.
+
+        """
+        self.destinationFile.close()
+        self.destinationFile = None
+
+        # If fewer par files were written than expected, keep only those written.
+        if(self.written < len(self.newIndex)):
+            save(self.indexPath(),array(self.newIndex[0:self.written]))
+            del self.newIndex
+            os.remove(self.indexPath() + ".tmp")
+        else:
+            self.newIndex.flush()
+            del self.newIndex
+            os.rename(self.indexPath() + ".tmp",self.indexPath())
+
+        if(self.verbose):
+            print "\tPar files written to pack: ", self.written, " (", self.path, ")"
+
+        return self.written
+
+    # ****************************************************************************************************
+
+    ## Loads the pack index, if not already loaded.
+    #
+    #  @param self The object pointer.
+    #  @returns the index, a numpy structured array with the columns NAME, OFFSET and LENGTH.
+    def loadIndex(self):
+        """
+        Loads the pack index, if not already loaded. The index is memory mapped,
+        so only the pages describing requested par files are read.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        numpy.ndarray
+            The index, a structured array with the columns NAME, OFFSET and LENGTH.
+
+        """
+        if(self.index is None):
+            self.index = load(self.indexPath(),mmap_mode='r')
+
+        return self.index
+
+    # ****************************************************************************************************
+
+    ## Gets the names of the par files in the pack.
+    #
+    #  @param self The object pointer.
+    #  @returns a list containing the names of the par files, in pack order.
+    def names(self):
+        """
+        Gets the names of the par files in the pack, in the order they were written.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        list
+            The names of the par files, in pack order.
+
+        """
+        return self.loadIndex()["NAME"].tolist()
+
+    # ****************************************************************************************************
+
+    ## Checks if the pack contains a par file.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the par file.
+    #  @returns True if the pack contains the par file, else False.
+    def contains(self,name):
+        """
+        Checks if the pack contains a par file.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the par file.
+
+        Returns
+        -------
+        bool
+            True if the pack contains the par file, else False.
+
+        """
+        return name in self.rowIndex()
+
+    # ****************************************************************************************************
+
+    ## Gets the hash index mapping each par file name to its row in the pack index.
+    #
+    #  @param self The object pointer.
+    #  @returns a dictionary mapping each par file name to its row.
+    def rowIndex(self):
+        """
+        Gets the hash index mapping each par file name to its row in the pack
+        index. The hash index is built the first time it is needed, since
+        reading par files by position does not require it.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each par file name to its row.
+
+        """
+        if(self.rows is None):
+            self.rows = dict((name,row) for row, name in enumerate(self.names()))
+
+        return self.rows
+
+    # ****************************************************************************************************
+
+    ## Reads the text of a par file from the pack, by name.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the par file.
+    #  @returns the text of the par file.
+    def read(self,name):
+        """
+        Reads the text of a par file from the pack, by name.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the par file.
+
+        Returns
+        -------
+        str
+            The text of the par file.
+
+        Raises
+        ------
+        KeyError
+            If the pack does not contain the par file.
+
+        """
+        return self.readRow(self.rowIndex()[name])
+
+    # ****************************************************************************************************
+
+    ## Reads the text of a par file from the pack, by position.
+    #
+    #  @param self The object pointer.
+    #  @param row The position of the par file in the pack.
+    #  @returns the text of the par file.
+    def readRow(self,row):
+        """
+        Reads the text of a par file from the pack, by its position in the pack.
+        Only the bytes of the requested par file are read.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        row : int
+            The position of the par file in the pack.
+
+        Returns
+        -------
+        str
+            The text of the par file.
+
+        """
+        entry = self.loadIndex()[row]
+
+        if(self.sourceFile is None):
+            self.sourceFile = open(self.path,'rb')
+
+        self.sourceFile.seek(int(entry["OFFSET"]))
+        return self.sourceFile.read(int(entry["LENGTH"]))
+
+    # ****************************************************************************************************
+
+    ## Iterates over the par files in the pack.
+    #
+    #  @param self The object pointer.
+    #  @returns a generator yielding a (name, text) tuple for each par file, in pack order.
+    def iterPars(self):
+        """
+        Iterates over the par files in the pack, in the order they were written.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        generator
+            Yields a (name, text) tuple for each par file.
+
+        """
+        for row, name in enumerate(self.names()):
+            yield name, self.readRow(row)
+
+    # ****************************************************************************************************
+
+    ## Extracts a par file from the pack into a real file.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the par file.
+    #  @param directory The directory to extract the par file to.
+    #  @returns the full path to the extracted par file.
+    def extract(self,name,directory):
+        """
+        Extracts a par file from the pack into a real file, for tools that
+        require a path, i.e. <directory>/<name>.par. Any existing file with
+        the same path is overwritten.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the par file.
+        directory : str
+            The directory to extract the par file to.
+
+        Returns
+        -------
+        str
+            The full path to the extracted par file.
+
+        Examples
+        --------
+
+        >>> print extract("FakePulsar_1_0.184466_12.5_9.1","/tmp")
+        /tmp/FakePulsar_1_0.184466_12.5_9.1.par
+
+        """
+        path = os.path.join(directory,name + ".par")
+
+        destinationFile = open(path,'wb')
+
+        try:
+            destinationFile.write(self.read(name))
+        finally:
+            destinationFile.close()
+
+        return path
+
+    # ****************************************************************************************************
+
+    ## Gets the path of the pack index file.
+    #
+    #  @param self The object pointer.
+    #  @returns the full path to the index file.
+    def indexPath(self):
+        """
+        Gets the path of the pack index file, i.e. <pack path>.idx.npy
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The full path to the index file.
+
+        """
+        return self.path + self.indexSuffix
+
+    # ****************************************************************************************************
+
+    ## Closes the pack, if open for reading.
+    #
+    #  @param self The object pointer.
+    def close(self):
+        """
+        Closes the pack, if open for reading.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        if(self.sourceFile is not None):
+            self.sourceFile.close()
+            self.sourceFile = None
+
+    # ****************************************************************************************************
+
+    ## Gets the number of par files in the pack.
+    #
+    #  @param self The object pointer.
+    #  @returns the number of par files in the pack.
+    def __len__(self):
+        """
+        Gets the number of par files in the pack.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of par files in the pack.
+
+        """
+        return len(self.loadIndex())
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    ParPack().main()
@@ -0,0 +1,503 @@
+## @package PARS
+# A module used to render and write Tempo2 compatible par files in bulk.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                        Par Writer Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Renders Tempo2 compatible par files for catalog pulsars and fake       |
+    | pulsars in bulk, and writes them to disk. The text of every par file   |
+    | is produced in a single pass over the columns describing the pulsars,  |
+    | by filling a fixed template, rather than by repeated string            |
+    | concatenation. Each par file is then written with a single open call.  |
+    | Files can optionally be written concurrently from a pool of threads.   |
+    | Files which already hold exactly the rendered text are not rewritten,  |
+    | so repeated runs leave unchanged par files (and their mtimes) alone.   |
+    |                                                                        |
+    | Used by CandidateParGenerator.py. Requires numpy.                      |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import os, re
+
+from multiprocessing.pool import ThreadPool
+
+# Numpy Imports:
+from numpy import arange
+from numpy import asarray
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Par Writer Version 1.0
+#
+# Renders Tempo2 compatible par files for catalog pulsars and fake
+# pulsars in bulk, and writes them to disk. The text of every par file
+# is produced in a single pass over the columns describing the pulsars,
+# by filling a fixed template, rather than by repeated string
+# concatenation. Each par file is then written with a single open call.
+# Files can optionally be written concurrently from a pool of threads.
+# Files which already hold exactly the rendered text are not rewritten,
+# so repeated runs leave unchanged par files (and their mtimes) alone.
+#
+# The par files produced are identical to those previously written by
+# CandidateParGenerator.py, i.e.
+#
+# PSRJ           	J0835-4510
+# RAJ            	08:35:20.61149           2.000e-05
+# DECJ           	-45:10:34.8751           3.000e-04
+# DM             	67.99                    1.000e-02
+# PEPOCH         	56000.0
+# F0             	11.1946499395            5.000e-10
+# TZRMJD          56000.0
+# TZRFREQ         1000.0
+# UNITS          	TDB
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class ParWriter:
+    """
+    Description:
+
+    Renders Tempo2 compatible par files for catalog pulsars and fake
+    pulsars in bulk, and writes them to disk. The text of every par file
+    is produced in a single pass over the columns describing the pulsars,
+    by filling a fixed template, rather than by repeated string
+    concatenation. Each par file is then written with a single open call.
+    Files can optionally be written concurrently from a pool of threads.
+
+    Examples
+    --------
+
+    >>> writer = ParWriter("56000.0","56000.0","1000.0","TDB",threads=4)
+    >>> texts = writer.renderFakePars(1,dms,periods)
+    >>> paths = writer.fakeParPaths("/Users/rob/pars/FakePulsar",1,periods,dms,snrs)
+    >>> writer.writePars(paths,texts)
+    (1000, 0)
+    """
+
+    ## The names of the fake pulsar par files this tool generates.
+    fakeParPattern = re.compile(r"^FakePulsar_.*\.par$")
+
+    ## The names of the catalog pulsar par files this tool generates, i.e. J or B pulsar names.
+    pulsarParPattern = re.compile(r"^[JB][0-9]{4}[+-][0-9]{2,4}.*\.par$")
+
+    ## Creates a new par writer, preparing the par file templates.
+    #
+    #  @param self The object pointer.
+    #  @param pepoch The PEPOCH value to use in the par files.
+    #  @param tzrmjd The TZRMJD value to use in the par files.
+    #  @param tzrfreq The TZRFREQ value to use in the par files.
+    #  @param units The UNITS value to use in the par files.
+    #  @param threads The number of threads used to write par files (1 by default).
+    def __init__(self,pepoch="56000.0",tzrmjd="56000.0",tzrfreq="1000.0",units="TDB",threads=1):
+        """
+        Creates a new par writer, preparing the par file templates. The values
+        that are the same in every par file are substituted into the templates
+        once, here, so that only per-pulsar values remain to be filled in.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        pepoch : str
+            The PEPOCH value to use in the par files.
+        tzrmjd : str
+            The TZRMJD value to use in the par files.
+        tzrfreq : str
+            The TZRFREQ value to use in the par files.
+        units : str
+            The UNITS value to use in the par files.
+        threads : int
+            The number of threads used to write par files (1 by default).
+
+        """
+        self.threads = threads
+
+        # Lines shared by every par file, after the F0 line. Any '%' characters
+        # are escaped, since the result is itself used as a template.
+        pepochLine = ("PEPOCH\t\t\t" + str(pepoch) + "\n").replace("%","%%")
+        footer = ("TZRMJD\t\t\t"  + str(tzrmjd)  + "\n" +\
+                  "TZRFREQ\t\t\t" + str(tzrfreq) + "\n" +\
+                  "UNITS\t\t\t"   + str(units)).replace("%","%%")
+
+        ## The template for catalog pulsar pars: name, RAJ, DECJ, DM and F0.
+        self.catalogTemplate = "PSRJ\t\t\t%s\n" +\
+                               "RAJ\t\t\t\t%s\t\t\t2.000e-05\n" +\
+                               "DECJ\t\t\t%s\t\t\t3.000e-04\n" +\
+                               "DM\t\t\t\t%s\t\t\t\t1.000e-02\n" +\
+                               pepochLine +\
+                               "F0\t\t\t\t%s\t\t5.000e-10\n" + footer
+
+        ## The template for fake pulsar pars: number, DM and F0.
+        self.fakeTemplate = "PSRJ\t\t\tFakePulsar_%d\n" +\
+                            "RAJ\t\t\t\t00:00:00\t\t\t2.000e-05\n" +\
+                            "DECJ\t\t\t00:00:00\t\t\t3.000e-04\n" +\
+                            "DM\t\t\t\t%s\t\t1.000e-02\n" +\
+                            pepochLine +\
+                            "F0\t\t\t\t%s\t5.000e-10\n" + footer
+
+    # ****************************************************************************************************
+
+    ## Renders the par files of catalog pulsars.
+    #
+    #  @param self The object pointer.
+    #  @param names The pulsar names.
+    #  @param rajs The right ascensions (J2000), as strings.
+    #  @param decjs The declinations (J2000), as strings.
+    #  @param dms The dispersion measures.
+    #  @param freqs The rotation frequencies (Hz).
+    #  @returns a list containing the text of each par file, in input order.
+    def renderCatalogPars(self,names,rajs,decjs,dms,freqs):
+        """
+        Renders the par files of catalog pulsars, in a single pass over the
+        supplied columns. Numeric values are formatted with str(), exactly as
+        they were when the pars were built one at a time.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        names : list
+            The pulsar names.
+        rajs : list
+            The right ascensions (J2000), as strings.
+        decjs : list
+            The declinations (J2000), as strings.
+        dms : list or numpy.ndarray
+            The dispersion measures.
+        freqs : list or numpy.ndarray
+            The rotation frequencies (Hz).
+
+        Returns
+        -------
+        list
+            The text of each par file, in input order.
+
+        Examples
+        --------
+
+        >>> print renderCatalogPars(["J0835-4510"],["08:35:20.61149"],["-45:10:34.8751"],[67.99],[11.19])[0]
+
+        """
+        template = self.catalogTemplate
+        return [template % row for row in zip(names,rajs,decjs,dms,freqs)]
+
+    # ****************************************************************************************************
+
+    ## Renders the par files of fake pulsars.
+    #
+    #  @param self The object pointer.
+    #  @param first The number of the first fake pulsar.
+    #  @param dms The dispersion measures.
+    #  @param periods The periods (s).
+    #  @returns a list containing the text of each par file, in input order.
+    def renderFakePars(self,first,dms,periods):
+        """
+        Renders the par files of fake pulsars, numbered consecutively from
+        first. The rotation frequencies are computed from the periods in a
+        single vectorised operation.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        first : int
+            The number of the first fake pulsar.
+        dms : list or numpy.ndarray
+            The dispersion measures.
+        periods : list or numpy.ndarray
+            The periods (s).
+
+        Returns
+        -------
+        list
+            The text of each par file, in input order.
+
+        """
+        periods  = asarray(periods,dtype=float)
+        freqs    = 1.0 / periods
+        numbers  = arange(first,first + len(periods))
+        template = self.fakeTemplate
+        return [template % row for row in zip(numbers,dms,freqs)]
+
+    # ****************************************************************************************************
+
+    ## Builds the paths of par files from their names.
+    #
+    #  @param self The object pointer.
+    #  @param directory The directory the par files are stored in.
+    #  @param names The pulsar names.
+    #  @returns a list containing the path of each par file, in input order.
+    def parPaths(self,directory,names):
+        """
+        Builds the paths of par files from their names, i.e. <directory>/<name>.par
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The directory the par files are stored in.
+        names : list
+            The pulsar names.
+
+        Returns
+        -------
+        list
+            The path of each par file, in input order.
+
+        """
+        template = directory.replace("%","%%") + "/%s.par"
+        return [template % name for name in names]
+
+    # ****************************************************************************************************
+
+    ## Builds the names of fake pulsar par files.
+    #
+    #  @param self The object pointer.
+    #  @param first The number of the first fake pulsar.
+    #  @param periods The periods (s).
+    #  @param dms The dispersion measures.
+    #  @param snrs The S/N values.
+    #  @returns a list containing the name of each par file, in input order.
+    def fakeParNames(self,first,periods,dms,snrs):
+        """
+        Builds the names of fake pulsar par files (i.e. the file names without
+        the .par suffix), which encode the parameters of each fake pulsar, i.e.
+
+        FakePulsar_<number>_<Period (s)>_<DM>_<SNR>
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        first : int
+            The number of the first fake pulsar.
+        periods : list or numpy.ndarray
+            The periods (s).
+        dms : list or numpy.ndarray
+            The dispersion measures.
+        snrs : list or numpy.ndarray
+            The S/N values.
+
+        Returns
+        -------
+        list
+            The name of each par file, in input order.
+
+        """
+        numbers = arange(first,first + len(periods))
+        return ["FakePulsar_%d_%.6f_%.1f_%.1f" % row for row in zip(numbers,periods,dms,snrs)]
+
+    # ****************************************************************************************************
+
+    ## Builds the paths of fake pulsar par files.
+    #
+    #  @param self The object pointer.
+    #  @param directory The directory the par files are stored in.
+    #  @param first The number of the first fake pulsar.
+    #  @param periods The periods (s).
+    #  @param dms The dispersion measures.
+    #  @param snrs The S/N values.
+    #  @returns a list containing the path of each par file, in input order.
+    def fakeParPaths(self,directory,first,periods,dms,snrs):
+        """
+        Builds the paths of fake pulsar par files, i.e.
+
+        <directory>/FakePulsar_<number>_<Period (s)>_<DM>_<SNR>.par
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The directory the par files are stored in.
+        first : int
+            The number of the first fake pulsar.
+        periods : list or numpy.ndarray
+            The periods (s).
+        dms : list or numpy.ndarray
+            The dispersion measures.
+        snrs : list or numpy.ndarray
+            The S/N values.
+
+        Returns
+        -------
+        list
+            The path of each par file, in input order.
+
+        """
+        return self.parPaths(directory,self.fakeParNames(first,periods,dms,snrs))
+
+    # ****************************************************************************************************
+
+    ## Writes par files to disk, skipping those whose content is unchanged.
+    #
+    #  @param self The object pointer.
+    #  @param paths The full path of each par file.
+    #  @param texts The text of each par file.
+    #  @returns the number of par files written, and the number left unchanged.
+    def writePars(self,paths,texts):
+        """
+        Writes par files to disk. A par file which already exists with exactly
+        the rendered content is left untouched, so its modification time is
+        kept and later up-to-date checks still hold. Other files are opened
+        once, written and closed. If more than one thread was requested the
+        files are written concurrently from a thread pool, which helps most
+        on network or parallel file systems where each open has high latency.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        paths : list
+            The full path of each par file.
+        texts : list
+            The text of each par file.
+
+        Returns
+        -------
+        tuple
+            The number of par files written, and the number left unchanged.
+
+        """
+        if(self.threads > 1 and len(paths) > 1):
+            pool = ThreadPool(self.threads)
+
+            try:
+                # Chunks keep the cost of handing work to the threads low.
+                results = pool.map(writeParFile,zip(paths,texts),max(1,len(paths) // (self.threads * 4)))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = map(writeParFile,zip(paths,texts))
+
+        written = sum(results)
+
+        return written, len(results) - written
+
+    # ****************************************************************************************************
+
+    ## Removes par files generated by this tool from a directory which were not written by this run.
+    #
+    #  @param self The object pointer.
+    #  @param directory The directory containing the par files.
+    #  @param names The names of the par files to keep, without the .par suffix.
+    #  @param pattern The pattern matching the file names of par files this tool generates.
+    #  @returns the number of par files removed.
+    def removeStalePars(self,directory,names,pattern):
+        """
+        Removes par files generated by this tool from a directory, other than
+        those named, i.e. the pars of pulsars which are no longer produced.
+        Only files whose names match the pattern (fakeParPattern or
+        pulsarParPattern) are removed, so hand placed pars (e.g. Example.par)
+        are never touched.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The directory containing the par files.
+        names : iterable
+            The names of the par files to keep, without the .par suffix.
+        pattern : re.RegexObject
+            The pattern matching the file names of par files this tool generates.
+
+        Returns
+        -------
+        int
+            The number of par files removed.
+
+        """
+        keep = set(name + ".par" for name in names)
+        removed = 0
+
+        for fileName in os.listdir(directory):
+            if(pattern.match(fileName) and fileName not in keep):
+                os.remove(os.path.join(directory,fileName))
+                removed += 1
+
+        return removed
+
+    # ****************************************************************************************************
+
+## Writes a single par file, unless it already has the same content. A module
+# level function, so it can be used by a thread pool.
+#
+#  @param item A tuple containing the full path to the par file, and its text.
+#  @returns True if the file was written, False if its content was unchanged.
+def writeParFile(item):
+    """
+    Writes a single par file, with a single open call, unless the file already
+    has exactly the same content. Existing files are only read when their size
+    matches the new text, so changed files usually cost a single stat call.
+
+    Parameters
+    ----------
+    item : tuple
+        The full path to the par file, and its text.
+
+    Returns
+    -------
+    bool
+        True if the file was written, False if its content was unchanged.
+
+    """
+    path, text = item
+
+    if(os.path.isfile(path) and os.path.getsize(path) == len(text)):
+        sourceFile = open(path,'rb')
+
+        try:
+            unchanged = sourceFile.read() == text
+        finally:
+            sourceFile.close()
+
+        if(unchanged):
+            return False
+
+    destinationFile = open(path,'w')
+
+    try:
+        destinationFile.write(text)
+    finally:
+        destinationFile.close()
+
+    return True
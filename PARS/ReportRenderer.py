@@ -0,0 +1,306 @@
+## @package PARS
+# A module used to render plots describing fake pulsar parameters, either
+# interactively or headless to image files from a background process.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Report Renderer Version 1.0                        |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Renders the plots (histograms, box-plots and fitted PDFs) describing   |
+    | fake pulsar parameters. Plots are described by simple figure           |
+    | dictionaries, which are drawn either:                                  |
+    |                                                                        |
+    |  interactively - each plot is shown in a window, which blocks until    |
+    |                  the window is closed.                                 |
+    |                                                                        |
+    |  headless      - each plot is sent to a background process, which      |
+    |                  saves it as a PNG file in a report directory and adds |
+    |                  it to an HTML page (index.html) listing every plot.   |
+    |                  The caller carries on while plots are drawn.          |
+    |                                                                        |
+    | Matplotlib is only imported when a plot is drawn, so scripts which do  |
+    | not create plots do not pay its import cost.                           |
+    |                                                                        |
+    | Used by CandidateParGenerator.py. Requires matplotlib to draw plots.   |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import cgi, os
+
+from multiprocessing import Process
+from multiprocessing import Queue
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Report Renderer Version 1.0
+#
+# Renders the plots (histograms, box-plots and fitted PDFs) describing
+# fake pulsar parameters, either interactively, or headless to PNG files
+# and an HTML page from a background process. Each plot is described by
+# a figure dictionary with the keys:
+#
+# kind   - "hist", "plot" or "boxplot".
+# data   - the data to plot (a list of data sets for "boxplot").
+# title  - the plot title.
+# xlabel - the x-axis label (optional).
+# ylabel - the y-axis label (optional).
+#
+# and, depending on the kind of plot, "bins", "color", "label", "xticks"
+# and "ylim".
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class ReportRenderer:
+    """
+    Description:
+
+    Renders the plots describing fake pulsar parameters, either
+    interactively, or headless to PNG files and an HTML page from a
+    background process.
+
+    """
+
+    ## Creates a renderer.
+    #
+    #  @param self The object pointer.
+    #  @param directory The report directory. If empty, plots are shown interactively.
+    def __init__(self,directory=""):
+        """
+        Creates a renderer. If a report directory is supplied plots are rendered
+        headless into it, otherwise they are shown interactively.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The report directory. If empty, plots are shown interactively.
+
+        """
+        self.directory = directory
+        self.queue = None
+        self.process = None
+        self.count = 0
+
+    # ****************************************************************************************************
+
+    ## Starts the background rendering process, if rendering headless.
+    #
+    #  @param self The object pointer.
+    def start(self):
+        """
+        Starts the background rendering process, if rendering headless.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        if(self.directory and self.process is None):
+            if(os.path.exists(self.directory) == False):
+                os.makedirs(self.directory)
+
+            self.queue = Queue()
+            self.process = Process(target=renderReport,args=(self.queue,self.directory))
+            self.process.daemon = True
+            self.process.start()
+
+    # ****************************************************************************************************
+
+    ## Renders a plot.
+    #
+    #  @param self The object pointer.
+    #  @param figure The figure dictionary describing the plot.
+    def render(self,figure):
+        """
+        Renders a plot. When rendering headless, the figure is passed to the
+        background process and this method returns straight away. Otherwise
+        the plot is shown, and this method returns once its window is closed.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        figure : dict
+            The figure dictionary describing the plot (see the class description).
+
+        """
+        if(self.directory):
+            self.start()
+            self.count += 1
+            self.queue.put(("figure_%03d.png" % self.count,figure))
+        else:
+            import matplotlib.pyplot as plt
+
+            drawFigure(plt,figure)
+            plt.show()
+
+    # ****************************************************************************************************
+
+    ## Waits for the background process to finish rendering every plot.
+    #
+    #  @param self The object pointer.
+    #  @returns the path to the HTML report, or None if no report was rendered.
+    def finish(self):
+        """
+        Waits for the background process to finish rendering every plot, and
+        write the HTML page listing them.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The path to the HTML report, or None if no report was rendered.
+
+        """
+        if(self.process is None):
+            return None
+
+        self.queue.put(None)
+        self.process.join()
+        self.process = None
+        self.queue = None
+
+        return os.path.join(self.directory,"index.html")
+
+# ****************************************************************************************************
+
+## Draws a figure onto the current matplotlib figure.
+#
+#  @param plt The matplotlib.pyplot module.
+#  @param figure The figure dictionary describing the plot.
+def drawFigure(plt,figure):
+    """
+    Draws a figure onto the current matplotlib figure.
+
+    Parameters
+    ----------
+    plt : module
+        The matplotlib.pyplot module.
+    figure : dict
+        The figure dictionary describing the plot (see ReportRenderer).
+
+    """
+    kind = figure["kind"]
+
+    if(kind == "hist"):
+        plt.hist(figure["data"], bins=figure["bins"], color=figure.get("color",'w'), label=figure.get("label"))
+    elif(kind == "plot"):
+        plt.plot(figure["data"])
+    elif(kind == "boxplot"):
+        plt.boxplot(figure["data"], notch=0, sym='+', vert=1, whis=1.5)
+
+    plt.title(figure["title"])
+
+    if("xticks" in figure):
+        plt.xticks(range(1,len(figure["xticks"]) + 1), figure["xticks"])
+    if("xlabel" in figure):
+        plt.xlabel(figure["xlabel"])
+    if("ylabel" in figure):
+        plt.ylabel(figure["ylabel"])
+    if("ylim" in figure):
+        plt.ylim(figure["ylim"])
+    if("label" in figure):
+        plt.legend(loc='upper right')
+
+# ****************************************************************************************************
+
+## Renders figures to PNG files until told to stop, then writes an HTML page listing them.
+# Defined at module level so that it can be run in a background process
+# (see ReportRenderer.start).
+#
+#  @param queue The queue figures are received from. None signals the end of the report.
+#  @param directory The report directory.
+def renderReport(queue,directory):
+    """
+    Renders figures to PNG files until told to stop, then writes an HTML page
+    (index.html) listing them. Defined at module level so that it can be run
+    in a background process (see ReportRenderer.start).
+
+    Parameters
+    ----------
+    queue : multiprocessing.Queue
+        The queue (file name, figure) pairs are received from. None signals the
+        end of the report.
+    directory : str
+        The report directory.
+
+    """
+    # Select a non-interactive backend before pyplot is imported.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    rendered = []
+
+    while True:
+        item = queue.get()
+
+        if(item is None):
+            break
+
+        fileName, figure = item
+
+        try:
+            plt.figure()
+            drawFigure(plt,figure)
+            plt.savefig(os.path.join(directory,fileName))
+            rendered.append((fileName,figure["title"]))
+        except Exception as e: # Catch *all* exceptions.
+            print "\tError rendering plot: ", figure["title"], "\n\t", e
+        finally:
+            plt.close()
+
+    html = "<html>\n<head><title>Fake pulsar parameter report</title></head>\n<body>\n"
+
+    for fileName, title in rendered:
+        html += "<h3>" + cgi.escape(title) + "</h3>\n<img src=\"" + fileName + "\"/>\n"
+
+    html += "</body>\n</html>\n"
+
+    reportFile = open(os.path.join(directory,"index.html"),'w')
+
+    try:
+        reportFile.write(html)
+    finally:
+        reportFile.close()
@@ -0,0 +1,328 @@
+## @package PARS
+# A module used to check that the fake pulsars generated by
+# CandidateParGenerator.py do not depend on the number of processes used.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                  Reproducibility Check Version 1.0                     |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Runs CandidateParGenerator.py twice with the same random seed, once    |
+    | with a single process (-j 1) and once with several (-j N), and checks  |
+    | the outputs are identical. The samples CSV file and every fake pulsar  |
+    | par file are compared byte for byte, and the manifest column by column |
+    | (excluding PAR, which holds the output directory). The check fails if  |
+    | any output differs, e.g. after a change to the stream block rounding   |
+    | or chunking.                                                           |
+    |                                                                        |
+    | Requires numpy.                                                        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -d (string) full path to the directory to write the outputs of both    |
+    |             runs to.                                                   |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -s (int) the number of samples to generate (default=150000). At least  |
+    |             two stream blocks (65536 samples each) are needed for the  |
+    |             work to be shared between processes.                       |
+    |                                                                        |
+    | -j (int) the number of processes used by the second run (default=4).   |
+    |                                                                        |
+    | --chunk (int) the block size used by the second run (default=0, i.e.   |
+    |             a single block), so the block size can be varied too.      |
+    |                                                                        |
+    | --seed (int) the random seed used by both runs (default=1).            |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys, filecmp, subprocess
+
+# Numpy Imports:
+from numpy import array_equal
+from numpy import load
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Reproducibility Check Version 1.0
+#
+# Runs CandidateParGenerator.py twice with the same random seed, once
+# with a single process (-j 1) and once with several (-j N), and checks
+# the outputs are identical. The samples CSV file and every fake pulsar
+# par file are compared byte for byte, and the manifest column by column
+# (excluding PAR, which holds the output directory).
+#
+# Requires numpy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -d (string) full path to the directory to write the outputs of both
+#             runs to.
+#
+# Optional Command Line Arguments:
+#
+# -s (int) the number of samples to generate (default=150000).
+#
+# -j (int) the number of processes used by the second run (default=4).
+#
+# --chunk (int) the block size used by the second run (default=0).
+#
+# --seed (int) the random seed used by both runs (default=1).
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class ReproducibilityCheck:
+    """
+    Description:
+
+    Runs CandidateParGenerator.py twice with the same random seed, once
+    with a single process and once with several, and checks the outputs
+    are identical.
+
+    """
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and runs the check.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and runs the check.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-d", action="store", dest="workDir",help='Path to the directory to write the outputs to.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-s", type="int", dest="samples",help='The number of samples to generate (optional).',default=150000)
+        parser.add_option("-j", type="int", dest="processes",help='The number of processes used by the second run (optional).',default=4)
+        parser.add_option("--chunk", type="int", dest="chunkSize",help='The block size used by the second run (optional).',default=0)
+        parser.add_option("--seed", type="int", dest="seed",help='The seed value for random number generation (optional).',default=1)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.workDir   = args.workDir
+        self.samples   = args.samples
+        self.processes = args.processes
+        self.chunkSize = args.chunkSize
+        self.seed      = args.seed
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tWork directory:",self.workDir
+        print "\tSamples:",self.samples
+        print "\tProcesses (second run):",self.processes
+        print "\tBlock size (second run):",self.chunkSize
+        print "\tRandom seed:",self.seed
+
+        if(not self.workDir):
+            print "\n\tYou must supply a valid work directory via the -d flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(self.samples < 1 or self.processes < 2):
+            print "\n\tSupplied number of samples or processes invalid (at least 2 processes needed) - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        # ****************************************
+        #              Run the check
+        # ****************************************
+
+        serialDir   = os.path.join(self.workDir,"serial")
+        parallelDir = os.path.join(self.workDir,"parallel")
+
+        self.generate(serialDir,1,0)
+        self.generate(parallelDir,self.processes,self.chunkSize)
+
+        differences = self.compare(serialDir,parallelDir)
+
+        for difference in differences:
+            print "\tOutputs differ: ", difference
+
+        if(differences):
+            print "\n\tFailed: ", len(differences), " outputs depend on the number of processes used."
+            sys.exit(1)
+
+        print "\n\tPassed: outputs are identical with -j 1 and -j", self.processes
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Runs CandidateParGenerator.py in a child process.
+    #
+    #  @param self The object pointer.
+    #  @param outputDir The full path to the directory to write the outputs to.
+    #  @param processes The number of processes used to generate samples.
+    #  @param chunkSize The number of samples generated per block (0 for a single block).
+    def generate(self,outputDir,processes,chunkSize):
+        """
+        Runs CandidateParGenerator.py in a child process, writing the samples
+        CSV file to <outputDir>/samples.csv and the fake pulsar pars and
+        manifest to outputDir.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        outputDir : str
+            The full path to the directory to write the outputs to.
+        processes : int
+            The number of processes used to generate samples.
+        chunkSize : int
+            The number of samples generated per block (0 for a single block).
+
+        """
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)),"CandidateParGenerator.py")
+
+        command = [sys.executable,script,"-d",outputDir,"-w",os.path.join(outputDir,"samples.csv"),
+                   "-s",str(self.samples),"--seed",str(self.seed),"-j",str(processes),
+                   "--chunk",str(chunkSize),"--prune"]
+
+        print "\n\tRunning: ", " ".join(command)
+
+        devnull = open(os.devnull,'w')
+
+        try:
+            returnCode = subprocess.call(command,stdout=devnull)
+        finally:
+            devnull.close()
+
+        if(returnCode != 0):
+            print "\n\tCandidateParGenerator.py failed (return code ", returnCode, ")"
+            print "\tExiting..."
+            sys.exit(1)
+
+    # ****************************************************************************************************
+
+    ## Compares the outputs of two CandidateParGenerator.py runs.
+    #
+    #  @param self The object pointer.
+    #  @param first The output directory of the first run.
+    #  @param second The output directory of the second run.
+    #  @returns a list describing each output that differs, empty if the outputs are identical.
+    def compare(self,first,second):
+        """
+        Compares the outputs of two CandidateParGenerator.py runs. The samples
+        CSV files and fake pulsar par files are compared byte for byte, and the
+        manifests column by column. The PAR column of the manifest holds the
+        path of each par file, and so always differs between output
+        directories; it is not compared.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        first : str
+            The output directory of the first run.
+        second : str
+            The output directory of the second run.
+
+        Returns
+        -------
+        list
+            A description of each output that differs, empty if the outputs
+            are identical.
+
+        """
+        differences = []
+
+        if(not filecmp.cmp(os.path.join(first,"samples.csv"),os.path.join(second,"samples.csv"),shallow=False)):
+            differences.append("samples.csv")
+
+        firstPars  = sorted(os.listdir(os.path.join(first,"FakePulsar")))
+        secondPars = sorted(os.listdir(os.path.join(second,"FakePulsar")))
+
+        if(firstPars != secondPars):
+            differences.append("FakePulsar (different par file names)")
+        else:
+            match, mismatch, errors = filecmp.cmpfiles(os.path.join(first,"FakePulsar"),
+                                                       os.path.join(second,"FakePulsar"),
+                                                       firstPars,shallow=False) # @UnusedVariable
+            differences.extend([os.path.join("FakePulsar",name) for name in mismatch + errors])
+
+        firstManifest  = load(os.path.join(first,"FakePulsar.manifest.npy"))
+        secondManifest = load(os.path.join(second,"FakePulsar.manifest.npy"))
+
+        for name in firstManifest.dtype.names:
+            if(name != "PAR" and not array_equal(firstManifest[name],secondManifest[name])):
+                differences.append("FakePulsar.manifest.npy (" + name + " column)")
+
+        return differences
+
+if __name__ == '__main__':
+    ReproducibilityCheck().main()
@@ -0,0 +1,290 @@
+## @package PARS
+# A module used to compare the speed of the fast numpy and scipy samplers
+# of each registered distribution.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Sampler Benchmark Version 1.0                       |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Measures how many samples per second can be drawn from each of the     |
+    | distributions registered in Samplers.py, via the fast numpy sampler    |
+    | and via scipy.stats. Each distribution is sampled using its example    |
+    | parameters. Every measurement is repeated, and the best time is kept,  |
+    | so that results are not skewed by other activity on the machine. The   |
+    | results are printed, and optionally written to a CSV file.             |
+    |                                                                        |
+    | Requires numpy and scipy.                                              |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -w (string) full path to the CSV results file to create.               |
+    |                                                                        |
+    | -n (int) the number of samples drawn per call (default=1000000).       |
+    |                                                                        |
+    | -r (int) the number of times each measurement is repeated (def=5).     |
+    |                                                                        |
+    | -d (string) comma separated list of distributions to benchmark. By     |
+    |             default all registered distributions are benchmarked.      |
+    |                                                                        |
+    | --seed (int) the random seed (default=1).                              |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import sys, time
+
+# Numpy Imports:
+from numpy.random import RandomState
+
+from Samplers import registry
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Sampler Benchmark Version 1.0
+#
+# Measures how many samples per second can be drawn from each of the
+# distributions registered in Samplers.py, via the fast numpy sampler
+# and via scipy.stats. The results are written to a CSV file with the
+# format:
+#
+# Distribution,Method,Samples,Best time (s),Samples/s,Speedup
+# norm,scipy,1000000,0.041,24390243.9,1.00
+# norm,fast,1000000,0.032,31250000.0,1.28
+#
+# where the speedup is relative to scipy.
+#
+# Requires numpy and scipy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Optional Command Line Arguments:
+#
+# -w (string) full path to the CSV results file to create.
+#
+# -n (int) the number of samples drawn per call (default=1000000).
+#
+# -r (int) the number of times each measurement is repeated (def=5).
+#
+# -d (string) comma separated list of distributions to benchmark. By
+#             default all registered distributions are benchmarked.
+#
+# --seed (int) the random seed (default=1).
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class SamplerBenchmark:
+    """
+    Description:
+
+    Measures how many samples per second can be drawn from each of the
+    distributions registered in Samplers.py, via the fast numpy sampler
+    and via scipy.stats.
+
+    """
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and runs the benchmark.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and runs the benchmark.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-w", action="store", dest="outputPath",help='Path to write the benchmark results to (optional).',default="")
+        parser.add_option("-n", type="int", dest="samples",help='The number of samples drawn per call (optional).',default=1000000)
+        parser.add_option("-r", type="int", dest="repeats",help='The number of times each measurement is repeated (optional).',default=5)
+        parser.add_option("-d", action="store", dest="distributions",help='Comma separated distributions (optional).',default="")
+        parser.add_option("--seed", type="int", dest="seed",help='The seed value for random number generation (optional).',default=1)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.outputPath = args.outputPath
+        self.samples    = args.samples
+        self.repeats    = args.repeats
+        self.seed       = args.seed
+
+        if(args.distributions):
+            distributions = args.distributions.split(",")
+        else:
+            distributions = registry.names()
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tResults file path:",self.outputPath
+        print "\tSamples per call:",self.samples
+        print "\tRepeats:",self.repeats
+        print "\tDistributions:",",".join(distributions)
+        print "\tRandom seed:",self.seed
+
+        for dist in distributions:
+            if(not registry.contains(dist)):
+                print "\n\tInvalid distribution supplied: ", dist
+                print "\tExiting..."
+                sys.exit()
+
+        if(self.samples < 1 or self.repeats < 1):
+            print "\n\tSupplied number of samples or repeats invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        # ****************************************
+        #            Run the benchmark
+        # ****************************************
+
+        rows = []
+
+        for dist in distributions:
+            params = registry.example(dist)
+
+            if(params is None):
+                print "\n\t", dist, "has no example parameters, skipping."
+                continue
+
+            scipyTime = self.measure(dist,params,False)
+            rows.append((dist,"scipy",scipyTime,1.0))
+
+            if(registry.hasFastSampler(dist)):
+                fastTime = self.measure(dist,params,True)
+                rows.append((dist,"fast",fastTime,scipyTime / fastTime))
+
+        print "\n\t", "Distribution".ljust(14), "Method".ljust(8), "Best time (s)".rjust(14),\
+              "Samples/s".rjust(16), "Speedup".rjust(9)
+
+        for dist, method, bestTime, speedup in rows:
+            print "\t", dist.ljust(14), method.ljust(8), ("%.4f" % bestTime).rjust(14),\
+                  ("%.1f" % (self.samples / bestTime)).rjust(16), ("%.2f" % speedup).rjust(9)
+
+        if(self.outputPath):
+            resultsFile = open(self.outputPath,'w')
+
+            try:
+                resultsFile.write("Distribution,Method,Samples,Best time (s),Samples/s,Speedup\n")
+
+                for dist, method, bestTime, speedup in rows:
+                    resultsFile.write(dist + "," + method + "," + str(self.samples) + "," +\
+                                      "%.6f" % bestTime + "," + "%.1f" % (self.samples / bestTime) + "," +\
+                                      "%.2f" % speedup + "\n")
+            finally:
+                resultsFile.close()
+
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Measures the best time taken to draw samples from a distribution.
+    #
+    #  @param self The object pointer.
+    #  @param dist The string identifier of the distribution.
+    #  @param params The distribution parameters.
+    #  @param fast If True the fast numpy sampler is measured, else scipy is measured.
+    #  @returns the best wall time (s) over all repeats.
+    def measure(self,dist,params,fast):
+        """
+        Measures the best time taken to draw samples from a distribution. A
+        small number of samples is drawn first, so that one-off set up costs
+        are not included in the measurement.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        dist : str
+            The string identifier of the distribution.
+        params : list
+            The distribution parameters.
+        fast : bool
+            If True the fast numpy sampler is measured, else scipy is measured.
+
+        Returns
+        -------
+        float
+            The best wall time (s) over all repeats.
+
+        """
+        randomState = RandomState(self.seed)
+        registry.sample(dist,params,10,randomState,fast)
+
+        best = float("inf")
+
+        for repeat in range(self.repeats): # @UnusedVariable
+            start = time.time()
+            registry.sample(dist,params,self.samples,randomState,fast)
+            best = min(best,time.time() - start)
+
+        # Guard against timer resolution on very fast samplers.
+        return max(best,1e-9)
+
+if __name__ == '__main__':
+    SamplerBenchmark().main()
@@ -0,0 +1,444 @@
+## @package PARS
+# A module providing a registry of the data distributions that fake pulsar
+# parameters can be drawn from.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                         Samplers Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A registry of the data distributions that fake pulsar parameters can   |
+    | be drawn from. Each distribution declares the parameters it requires,  |
+    | a scipy.stats sampler, and optionally a fast sampler which draws from  |
+    | the numpy random stream directly. The fast samplers avoid the argument |
+    | checking and broadcasting done by the generic scipy rvs machinery on   |
+    | every call. When a distribution has no fast sampler, or scipy samples  |
+    | are requested, samples are drawn via scipy.stats.                      |
+    |                                                                        |
+    | New distributions are added by registering them, e.g.                  |
+    |                                                                        |
+    |  registry.register("wald",["loc","scale"],                             |
+    |                    lambda p,n,r: stats.wald.rvs(loc=p[0],scale=p[1],   |
+    |                                                 size=n,random_state=r),|
+    |                    example=[0,1])                                      |
+    |                                                                        |
+    | after which they can be used via CandidateParGenerator.py.             |
+    |                                                                        |
+    | Used by CandidateParGenerator.py. Requires numpy and scipy.            |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Numpy Imports:
+from numpy import exp
+from numpy import random
+
+# Scipy Imports:
+from scipy import special
+from scipy import stats
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Samplers Version 1.0
+#
+# A registry of the data distributions that fake pulsar parameters can
+# be drawn from. Each distribution declares the parameters it requires,
+# a scipy.stats sampler, and optionally a fast sampler which draws from
+# the numpy random stream directly.
+#
+# Each sampler is a function f(params,samples,randomState), where params is
+# the list of distribution parameters, samples the number of samples to
+# draw, and randomState the numpy.random.RandomState to draw them from.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class Samplers:
+    """
+    Description:
+
+    A registry of the data distributions that fake pulsar parameters can
+    be drawn from. Each distribution declares the parameters it requires,
+    a scipy.stats sampler, and optionally a fast sampler which draws from
+    the numpy random stream directly.
+
+    """
+
+    ## Creates an empty registry.
+    #
+    #  @param self The object pointer.
+    def __init__(self):
+        """
+        Creates an empty registry.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        self.entries = {}
+
+    # ****************************************************************************************************
+
+    ## Registers a distribution, replacing any existing distribution with the same name.
+    #
+    #  @param self The object pointer.
+    #  @param name The string identifier of the distribution, e.g. "norm".
+    #  @param parameters The names of the parameters the distribution requires.
+    #  @param scipySampler The sampler which draws samples via scipy.stats.
+    #  @param fastSampler The sampler which draws samples via numpy (optional).
+    #  @param example Example parameter values, used for benchmarking (optional).
+    def register(self,name,parameters,scipySampler,fastSampler=None,example=None):
+        """
+        Registers a distribution, replacing any existing distribution with the
+        same name. Each sampler is a function f(params,samples,randomState),
+        which returns the requested number of samples as a numpy array.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The string identifier of the distribution, e.g. "norm".
+        parameters : list
+            The names of the parameters the distribution requires, in order.
+        scipySampler : function
+            The sampler which draws samples via scipy.stats.
+        fastSampler : function
+            The sampler which draws samples via numpy (optional).
+        example : list
+            Example parameter values, used for benchmarking (optional).
+
+        """
+        self.entries[name] = (list(parameters),scipySampler,fastSampler,example)
+
+    # ****************************************************************************************************
+
+    ## Gets the names of the registered distributions.
+    #
+    #  @param self The object pointer.
+    #  @returns the sorted names of the registered distributions.
+    def names(self):
+        """
+        Gets the names of the registered distributions.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        list
+            The sorted names of the registered distributions.
+
+        """
+        return sorted(self.entries.keys())
+
+    # ****************************************************************************************************
+
+    ## Checks if a distribution is registered.
+    #
+    #  @param self The object pointer.
+    #  @param name The string identifier of the distribution.
+    #  @returns True if the distribution is registered, else False.
+    def contains(self,name):
+        """
+        Checks if a distribution is registered.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The string identifier of the distribution.
+
+        Returns
+        -------
+        bool
+            True if the distribution is registered, else False.
+
+        """
+        return name in self.entries
+
+    # ****************************************************************************************************
+
+    ## Gets the names of the parameters a distribution requires.
+    #
+    #  @param self The object pointer.
+    #  @param name The string identifier of the distribution.
+    #  @returns the names of the parameters, in order.
+    def parameters(self,name):
+        """
+        Gets the names of the parameters a distribution requires.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The string identifier of the distribution.
+
+        Returns
+        -------
+        list
+            The names of the parameters, in order.
+
+        """
+        return self.entries[name][0]
+
+    # ****************************************************************************************************
+
+    ## Gets the example parameter values of a distribution.
+    #
+    #  @param self The object pointer.
+    #  @param name The string identifier of the distribution.
+    #  @returns the example parameter values, or None if there are none.
+    def example(self,name):
+        """
+        Gets the example parameter values of a distribution, used for
+        benchmarking.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The string identifier of the distribution.
+
+        Returns
+        -------
+        list
+            The example parameter values, or None if there are none.
+
+        """
+        return self.entries[name][3]
+
+    # ****************************************************************************************************
+
+    ## Checks if a distribution has a fast numpy sampler.
+    #
+    #  @param self The object pointer.
+    #  @param name The string identifier of the distribution.
+    #  @returns True if the distribution has a fast sampler, else False.
+    def hasFastSampler(self,name):
+        """
+        Checks if a distribution has a fast numpy sampler.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The string identifier of the distribution.
+
+        Returns
+        -------
+        bool
+            True if the distribution has a fast sampler, else False.
+
+        """
+        return self.entries[name][2] is not None
+
+    # ****************************************************************************************************
+
+    ## Draws samples from a registered distribution.
+    #
+    #  @param self The object pointer.
+    #  @param name The string identifier of the distribution.
+    #  @param params The distribution parameters.
+    #  @param samples The number of samples to draw.
+    #  @param randomState The random stream to draw samples from (optional).
+    #  @param fast If True the fast sampler is used when there is one, else scipy is used.
+    #  @returns the samples as a numpy array.
+    def sample(self,name,params,samples,randomState=None,fast=True):
+        """
+        Draws samples from a registered distribution. The fast numpy sampler is
+        used if requested and available, otherwise samples are drawn via
+        scipy.stats. The two draw different values from the same stream.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The string identifier of the distribution.
+        params : list or numpy.ndarray
+            The distribution parameters, in the order given by parameters().
+        samples : int
+            The number of samples to draw.
+        randomState : numpy.random.RandomState
+            The random stream to draw samples from (optional). By default
+            the global numpy random stream is used.
+        fast : bool
+            If True the fast sampler is used when there is one, else scipy is used.
+
+        Returns
+        -------
+        numpy.ndarray
+            The samples drawn from the distribution.
+
+        """
+        parameters, scipySampler, fastSampler, example = self.entries[name] # @UnusedVariable
+
+        if(len(params) != len(parameters)):
+            raise ValueError("The " + name + " distribution requires " + str(len(parameters)) +\
+                             " parameters (" + ", ".join(parameters) + ") but received " + str(len(params)))
+
+        if(randomState is None):
+            # The global stream, as used by scipy when random_state is None.
+            randomState = random.mtrand._rand
+
+        params = [float(p) for p in params]
+
+        if(fast and fastSampler is not None):
+            return fastSampler(params,samples,randomState)
+        else:
+            return scipySampler(params,samples,randomState)
+
+# ****************************************************************************************************
+#
+# BUILT-IN DISTRIBUTIONS
+#
+# ****************************************************************************************************
+
+## Draws truncated normal samples by inverting the normal CDF.
+# Samples are drawn from whichever tail of the normal distribution
+# keeps the truncation bounds closest to zero, so that the CDF is
+# not evaluated where it is close to one and loses precision.
+#
+#  @param params The lower bound, upper bound, mean and standard deviation.
+#  @param samples The number of samples to draw.
+#  @param randomState The random stream to draw samples from.
+#  @returns the samples as a numpy array.
+def truncatedNormal(params,samples,randomState):
+    """
+    Draws truncated normal samples by inverting the normal CDF. Samples are
+    drawn from whichever tail of the normal distribution keeps the truncation
+    bounds closest to zero, so that the CDF is not evaluated where it is close
+    to one and loses precision.
+
+    Parameters
+    ----------
+    params : list
+        The lower bound, upper bound, mean and standard deviation.
+    samples : int
+        The number of samples to draw.
+    randomState : numpy.random.RandomState
+        The random stream to draw samples from.
+
+    Returns
+    -------
+    numpy.ndarray
+        The samples drawn from the distribution.
+
+    """
+    lower, upper, mu, sigma = params
+    a = (lower - mu) / sigma
+    b = (upper - mu) / sigma
+
+    # Reflect the bounds if they lie in the upper tail.
+    sign = -1.0 if a > 0 else 1.0
+    a, b = min(sign * a,sign * b), max(sign * a,sign * b)
+
+    u = randomState.uniform(special.ndtr(a),special.ndtr(b),samples)
+    return mu + sigma * sign * special.ndtri(u)
+
+## The registry of distributions used by CandidateParGenerator.py.
+registry = Samplers()
+
+#   key         params                  Name
+#   beta        a, b, loc, scale        Beta dist.
+#   binom       n, p, loc               Binomial dist.
+#   expon       loc, scale              exponential dist.
+#   gamma       shape, loc, scale       Gamma dist.
+#   logistic    loc, scale              logistic dist.
+#   lognorm     s, loc, scale           log-normal dist.
+#   norm        loc, scale              normal dist.
+#   truncnorm   min, max, loc, scale    normal dist.
+#   rayleigh    loc, scale              Rayleigh dist.
+#   uniform     loc, scale              uniform dist.
+
+registry.register("beta",["a","b","loc","scale"],
+                  lambda p,n,r: stats.beta.rvs(p[0],p[1],loc=p[2],scale=p[3],size=n,random_state=r),
+                  lambda p,n,r: p[2] + p[3] * r.beta(p[0],p[1],n),
+                  example=[2,5,0,1])
+
+registry.register("binom",["n","p","loc"],
+                  lambda p,n,r: stats.binom.rvs(int(p[0]),p[1],loc=p[2],size=n,random_state=r),
+                  lambda p,n,r: p[2] + r.binomial(int(p[0]),p[1],n),
+                  example=[20,0.5,0])
+
+registry.register("expon",["loc","scale"],
+                  lambda p,n,r: stats.expon.rvs(loc=p[0],scale=p[1],size=n,random_state=r),
+                  lambda p,n,r: p[0] + p[1] * r.standard_exponential(n),
+                  example=[0,10])
+
+registry.register("gamma",["shape","loc","scale"],
+                  lambda p,n,r: stats.gamma.rvs(p[0],loc=p[1],scale=p[2],size=n,random_state=r),
+                  lambda p,n,r: p[1] + p[2] * r.standard_gamma(p[0],n),
+                  example=[2,0,5])
+
+registry.register("logistic",["loc","scale"],
+                  lambda p,n,r: stats.logistic.rvs(loc=p[0],scale=p[1],size=n,random_state=r),
+                  lambda p,n,r: r.logistic(p[0],p[1],n),
+                  example=[10,5])
+
+registry.register("lognorm",["s","loc","scale"],
+                  lambda p,n,r: stats.lognorm.rvs(p[0],loc=p[1],scale=p[2],size=n,random_state=r),
+                  lambda p,n,r: p[1] + p[2] * exp(p[0] * r.standard_normal(n)),
+                  example=[0.5,0,10])
+
+registry.register("norm",["loc","scale"],
+                  lambda p,n,r: stats.norm.rvs(loc=p[0],scale=p[1],size=n,random_state=r),
+                  lambda p,n,r: r.normal(p[0],p[1],n),
+                  example=[10,5])
+
+registry.register("truncnorm",["min","max","loc","scale"],
+                  lambda p,n,r: stats.truncnorm.rvs((p[0] - p[2]) / p[3],(p[1] - p[2]) / p[3],
+                                                    loc=p[2],scale=p[3],size=n,random_state=r),
+                  truncatedNormal,
+                  example=[0,10,2,0.5])
+
+registry.register("rayleigh",["loc","scale"],
+                  lambda p,n,r: stats.rayleigh.rvs(loc=p[0],scale=p[1],size=n,random_state=r),
+                  lambda p,n,r: p[0] + r.rayleigh(p[1],n),
+                  example=[0,10])
+
+registry.register("uniform",["loc","scale"],
+                  lambda p,n,r: stats.uniform.rvs(loc=p[0],scale=p[1],size=n,random_state=r),
+                  lambda p,n,r: r.uniform(p[0],p[0] + p[1],n),
+                  example=[0,10])
@@ -0,0 +1,511 @@
+## @package PARS
+# A module providing summary statistics computed in a single pass over
+# data, which can be merged across blocks of data and worker processes.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                   Streaming Statistics Version 1.0                     |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Accumulates the summary statistics of a column of data (count, NaN     |
+    | count, zero count, min, max, mean, standard deviation and quantiles)   |
+    | in a single pass, in constant memory. Data is added in blocks, and the |
+    | statistics of separate blocks, or of separate worker processes, can be |
+    | merged.                                                                |
+    |                                                                        |
+    | The mean and variance are accumulated exactly, via the pairwise update |
+    | of Chan et al. Quantiles are estimated from a mergeable sketch, a      |
+    | stack of sorted buffers in which each level holds values standing for  |
+    | twice as many observations as the level below. When a buffer is full   |
+    | it is compacted, by keeping every other value, into the level above.   |
+    | Until the first compaction every value is kept, so quantiles of small  |
+    | data sets are exact. Otherwise their rank error is roughly             |
+    | levels / capacity, e.g. under 0.5% for 10^8 values.                    |
+    |                                                                        |
+    | NaN values are counted, but otherwise ignored.                         |
+    |                                                                        |
+    | Used by CandidateParGenerator.py. Requires numpy.                      |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Numpy Imports:
+from numpy import asarray
+from numpy import concatenate
+from numpy import count_nonzero
+from numpy import cumsum
+from numpy import empty
+from numpy import full
+from numpy import interp
+from numpy import isnan
+from numpy import nan
+from numpy import percentile
+from numpy import sort
+from numpy import sqrt
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Streaming Statistics Version 1.0
+#
+# Accumulates the summary statistics of a column of data (count, NaN
+# count, zero count, min, max, mean, standard deviation and quantiles)
+# in a single pass, in constant memory. Data is added in blocks, and the
+# statistics of separate blocks, or of separate worker processes, can be
+# merged, e.g.
+#
+# summary = StreamingStatistics()
+# for block in blocks:
+#     summary.update(block)
+# summary.merge(otherSummary)
+# q75, q25 = summary.quantiles([75,25])
+#
+# Quantiles are estimated from a mergeable sketch of sorted buffers, and
+# are exact until more than capacity values have been added.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class StreamingStatistics:
+    """
+    Description:
+
+    Accumulates the summary statistics of a column of data in a single pass,
+    in constant memory. The statistics of separate blocks of data, or of
+    separate worker processes, can be merged.
+
+    """
+
+    ## The number of values each level of the quantile sketch holds before it is compacted.
+    capacity = 4096
+
+    ## The number of values added to the accumulator at a time, bounding the memory used.
+    blockSize = 1048576
+
+    ## Creates an empty accumulator.
+    #
+    #  @param self The object pointer.
+    def __init__(self):
+        """
+        Creates an empty accumulator.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        self.count   = 0
+        self.nans    = 0
+        self.zeros   = 0
+        self.minimum = nan
+        self.maximum = nan
+        self.total   = 0.0 # The running mean.
+        self.m2      = 0.0 # The running sum of squared differences from the mean.
+        self.levels  = [empty(0)]
+        self.compactions = 0
+
+    # ****************************************************************************************************
+
+    ## Adds data to the accumulator.
+    #
+    #  @param self The object pointer.
+    #  @param data The data to add.
+    #  @returns the accumulator, so calls can be chained.
+    def update(self,data):
+        """
+        Adds data to the accumulator. Large inputs, e.g. memory mapped columns,
+        are read in blocks of blockSize values, so memory use is bounded.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        data : list or numpy.ndarray
+            The data to add.
+
+        Returns
+        -------
+        StreamingStatistics
+            The accumulator, so calls can be chained.
+
+        """
+        data = asarray(data,dtype=float).ravel()
+
+        for first in range(0,len(data),self.blockSize):
+            block = data[first:first + self.blockSize]
+
+            missing = isnan(block)
+            nans = int(count_nonzero(missing))
+
+            if(nans > 0):
+                block = block[~missing]
+
+            self.nans += nans
+
+            if(len(block) == 0):
+                continue
+
+            blockMean = block.mean()
+
+            self.combine(len(block),int(len(block) - count_nonzero(block)),block.min(),block.max(),
+                         blockMean,float(((block - blockMean) ** 2).sum()))
+
+            self.levels[0] = concatenate([self.levels[0],block])
+            self.compact()
+
+        return self
+
+    # ****************************************************************************************************
+
+    ## Merges the statistics of another accumulator into this one.
+    #
+    #  @param self The object pointer.
+    #  @param other The accumulator to merge.
+    #  @returns the accumulator, so calls can be chained.
+    def merge(self,other):
+        """
+        Merges the statistics of another accumulator into this one, e.g. those
+        of another block of data, or of another worker process. The other
+        accumulator is not changed.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        other : StreamingStatistics
+            The accumulator to merge.
+
+        Returns
+        -------
+        StreamingStatistics
+            The accumulator, so calls can be chained.
+
+        """
+        self.nans += other.nans
+
+        if(other.count == 0):
+            return self
+
+        self.combine(other.count,other.zeros,other.minimum,other.maximum,other.total,other.m2)
+
+        for level, values in enumerate(other.levels):
+            if(level == len(self.levels)):
+                self.levels.append(empty(0))
+
+            self.levels[level] = concatenate([self.levels[level],values])
+
+        self.compact()
+
+        return self
+
+    # ****************************************************************************************************
+
+    ## Combines the moments of a block of data with those accumulated so far.
+    #
+    #  @param self The object pointer.
+    #  @param count The number of values in the block.
+    #  @param zeros The number of zero values in the block.
+    #  @param minimum The minimum of the block.
+    #  @param maximum The maximum of the block.
+    #  @param blockMean The mean of the block.
+    #  @param blockM2 The sum of squared differences from the mean of the block.
+    def combine(self,count,zeros,minimum,maximum,blockMean,blockM2):
+        """
+        Combines the moments of a block of data with those accumulated so far,
+        via the pairwise update of Chan et al., which is exact and stable.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        count : int
+            The number of values in the block.
+        zeros : int
+            The number of zero values in the block.
+        minimum : float
+            The minimum of the block.
+        maximum : float
+            The maximum of the block.
+        blockMean : float
+            The mean of the block.
+        blockM2 : float
+            The sum of squared differences from the mean of the block.
+
+        """
+        if(self.count == 0):
+            self.minimum = minimum
+            self.maximum = maximum
+        else:
+            self.minimum = min(self.minimum,minimum)
+            self.maximum = max(self.maximum,maximum)
+
+        combined = self.count + count
+        delta = blockMean - self.total
+
+        self.m2    += blockM2 + delta * delta * self.count * count / combined
+        self.total += delta * count / combined
+        self.count  = combined
+        self.zeros += zeros
+
+    # ****************************************************************************************************
+
+    ## Compacts each full level of the quantile sketch into the level above.
+    #
+    #  @param self The object pointer.
+    def compact(self):
+        """
+        Compacts each full level of the quantile sketch into the level above,
+        by sorting it and keeping every other value, each of which then stands
+        for twice as many observations. Which of each pair is kept alternates
+        between compactions, so the estimates are not biased up or down. An
+        odd value out stays in its level, so no observations are lost.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        level = 0
+
+        while(level < len(self.levels)):
+            values = self.levels[level]
+
+            if(len(values) > self.capacity):
+                values = sort(values)
+                paired = len(values) - len(values) % 2
+
+                if(level + 1 == len(self.levels)):
+                    self.levels.append(empty(0))
+
+                self.levels[level + 1] = concatenate([self.levels[level + 1],
+                                                      values[self.compactions % 2:paired:2]])
+                self.levels[level] = values[paired:]
+                self.compactions += 1
+
+            level += 1
+
+    # ****************************************************************************************************
+
+    ## Estimates quantiles of the data.
+    #
+    #  @param self The object pointer.
+    #  @param q The percentiles to estimate, between 0 and 100.
+    #  @returns a list containing the estimate of each percentile.
+    def quantiles(self,q):
+        """
+        Estimates quantiles of the data, interpolating linearly between ranks
+        in the same way as numpy.percentile. The estimates are exact until the
+        sketch is first compacted.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        q : list
+            The percentiles to estimate, between 0 and 100.
+
+        Returns
+        -------
+        list
+            The estimate of each percentile, or NaN if there is no data.
+
+        """
+        if(self.count == 0):
+            return [nan] * len(q)
+
+        if(len(self.levels) == 1):
+            return list(percentile(self.levels[0],q))
+
+        values = concatenate(self.levels)
+        weights = concatenate([full(len(retained),2.0 ** level) for level, retained in enumerate(self.levels)])
+
+        order = values.argsort(kind="mergesort")
+        values = values[order]
+        weights = weights[order]
+
+        # Each retained value stands at the centre of the ranks it represents.
+        ranks = cumsum(weights) - 0.5 * weights - 0.5
+
+        targets = asarray(q,dtype=float) / 100.0 * (self.count - 1)
+
+        return list(interp(targets,concatenate([[0.0],ranks,[self.count - 1.0]]),
+                           concatenate([[self.minimum],values,[self.maximum]])))
+
+    # ****************************************************************************************************
+
+    ## Estimates the median of the data.
+    #
+    #  @param self The object pointer.
+    #  @returns the estimated median.
+    def median(self):
+        """
+        Estimates the median of the data.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        float
+            The estimated median, or NaN if there is no data.
+
+        """
+        return self.quantiles([50])[0]
+
+    # ****************************************************************************************************
+
+    ## Estimates the interquartile range of the data.
+    #
+    #  @param self The object pointer.
+    #  @returns the estimated interquartile range.
+    def iqr(self):
+        """
+        Estimates the interquartile range (Q3-Q1) of the data.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        float
+            The estimated interquartile range, or NaN if there is no data.
+
+        """
+        q75, q25 = self.quantiles([75,25])
+        return q75 - q25
+
+    # ****************************************************************************************************
+
+    ## Gets the mean of the data.
+    #
+    #  @param self The object pointer.
+    #  @returns the mean.
+    def mean(self):
+        """
+        Gets the mean of the data.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        float
+            The mean, or NaN if there is no data.
+
+        """
+        if(self.count == 0):
+            return nan
+
+        return self.total
+
+    # ****************************************************************************************************
+
+    ## Gets the standard deviation of the data.
+    #
+    #  @param self The object pointer.
+    #  @returns the (population) standard deviation.
+    def std(self):
+        """
+        Gets the population standard deviation of the data, as computed by
+        numpy.std.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        float
+            The standard deviation, or NaN if there is no data.
+
+        """
+        if(self.count == 0):
+            return nan
+
+        return sqrt(self.m2 / self.count)
+
+    # ****************************************************************************************************
+
+    ## Gets the range of the data.
+    #
+    #  @param self The object pointer.
+    #  @returns the range (max - min).
+    def range(self):
+        """
+        Gets the range of the data, i.e. max - min.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        float
+            The range, or NaN if there is no data.
+
+        """
+        return self.maximum - self.minimum
+
+    # ****************************************************************************************************
+
+    ## Gets the number of values added, excluding NaN values.
+    #
+    #  @param self The object pointer.
+    #  @returns the number of values added.
+    def __len__(self):
+        """
+        Gets the number of values added, excluding NaN values.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of values added.
+
+        """
+        return self.count
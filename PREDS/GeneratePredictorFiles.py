@@ -38,15 +38,15 @@
     | -s (int) the length of the observation in seconds to be passed in      |
     |             to tempo2 for predictor file creation (default=600).       |
     |                                                                        |
-    | -b (int) the maximum number of par files to process. This is useful if |
+    | -b (int) the maximum number of tempo2 runs. This is useful if          |
     |          processing directories containing many par files. By using    |
     |          this flag, the pars can be processed in batches. This is      |
-    |          possible as the script will not overwrite a predictor file if |
-    |          it already exists. Thus predictor files generated for par     |
-    |          files for the first batch, will simply be skipped over on the |
-    |          second run. The pars missing out on predictor file generation |
-    |          on the first run may be processed in the second run, depending|
-    |          on the batch size used (default = 1000).                      |
+    |          possible as predictor files are cached (see --cache). Thus    |
+    |          predictor files generated for par files for the first batch,  |
+    |          will simply be taken from the cache on the second run. The    |
+    |          pars missing out on predictor file generation on the first    |
+    |          run may be processed in the second run, depending on the      |
+    |          batch size used (default = 1000).                             |
     |                                                                        |
     | --f1 (int) the frequency of the first channel which is passed in to    |
     |              tempo2 for predictor file creation (default=1350).        |
@@ -86,6 +86,53 @@
     |                See the observatories.dat file of tempo2 for other      |
     |                valid telescope codes.                                  |
     |                                                                        |
+    | --changes (string) full path to a catalog changeset file created by    |
+    |                ATNFDataExtractor.py (-c flag). The predictor files of  |
+    |                modified or removed pulsars are deleted before the par  |
+    |                files are processed, so that only the predictors of     |
+    |                added or modified pulsars are (re)generated.            |
+    |                                                                        |
+    | --pack (string) full path to a par pack file created by                |
+    |                CandidateParGenerator.py (--pack flag). Each par file   |
+    |                in the pack is extracted to a scratch directory only    |
+    |                when its predictor file is generated. May be used       |
+    |                instead of, or as well as, the -p flag.                 |
+    |                                                                        |
+    | -j (int) the number of tempo2 jobs to run at once (default=1). Each    |
+    |          job runs tempo2 in its own scratch directory, and moves its   |
+    |          predictor file into place atomically, so jobs (and separate   |
+    |          runs of this script) never see each other's t2pred.dat files, |
+    |          or a partially written predictor file.                        |
+    |                                                                        |
+    | --cache (string) full path to the predictor cache directory (default   |
+    |                <-d>/.cache). Each predictor file generated is stored   |
+    |                in the cache, under a hash of the par file content,     |
+    |                every tempo2 argument and the tempo2 version. Tempo2 is |
+    |                only run for pars with no cached predictor, so editing  |
+    |                a par or changing any argument above regenerates its    |
+    |                predictor, and nothing else. Cache hits and misses are  |
+    |                reported. The cache may be deleted at any time.         |
+    |                                                                        |
+    | --prunecache (boolean) remove the cache entries not used by this run,  |
+    |                e.g. those of edited pars, or of an older tempo2. The   |
+    |                cache is content addressed, so without pruning (or      |
+    |                deleting the cache) it grows with every such change.    |
+    |                Skipped if the batch limit (-b) stops the run early.    |
+    |                                                                        |
+    | --native (boolean) build predictor files natively via numpy (see       |
+    |                Predictor.py), rather than by running tempo2. Only      |
+    |                possible for the solar system barycentre (--tel @), and |
+    |                for isolated pulsars whose spin is described by F0, F1  |
+    |                and F2, such as the fake pulsars. Tempo2 is still run   |
+    |                for any other par file.                                 |
+    |                                                                        |
+    | --validate (float) the phase tolerance in turns (default=0, i.e. no    |
+    |                validation). When building predictors natively, tempo2  |
+    |                is also run, and the phases of the two predictors are   |
+    |                compared. If they differ by more than the tolerance,    |
+    |                the tempo2 predictor file is used instead. Failures and |
+    |                the largest phase difference are reported.              |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -102,10 +149,13 @@ from optparse import OptionParser
 
 import os, sys,datetime
 
-import subprocess
+import filecmp, hashlib, itertools, subprocess, tempfile
+
+from multiprocessing import Pool
 
 # Other imports
 from shutil import copyfile
+from shutil import rmtree
 
 # ******************************
 #
@@ -141,15 +191,15 @@ from shutil import copyfile
 # -s (int) the length of the observation in seconds to be passed in
 #             to tempo2 for predictor file creation (default=600).
 #
-# -b (int) the maximum number of par files to process. This is useful if
+# -b (int) the maximum number of tempo2 runs. This is useful if
 #          processing directories containing many par files. By using
 #          this flag, the pars can be processed in batches. This is
-#          possible as the script will not overwrite a predictor file if
-#          it already exists. Thus predictor files generated for par
-#          files for the first batch, will simply be skipped over on the
-#          second run. The pars missing out on predictor file generation
-#          on the first run may be processed in the second run, depending
-#          on the batch size used (default = 1000).
+#          possible as predictor files are cached (see --cache). Thus
+#          predictor files generated for par files for the first batch,
+#          will simply be taken from the cache on the second run. The
+#          pars missing out on predictor file generation on the first
+#          run may be processed in the second run, depending on the
+#          batch size used (default = 1000).
 #
 # --f1 (int) the frequency of the first channel which is passed in to
 #              tempo2 for predictor file creation (default=1350).
@@ -169,6 +219,53 @@ from shutil import copyfile
 # --mjd2 (string) the start time mjd used by tempo2 during predictor
 #                file creation (default=56001).
 #
+# --changes (string) full path to a catalog changeset file created by
+#                ATNFDataExtractor.py (-c flag). The predictor files of
+#                modified or removed pulsars are deleted before the par
+#                files are processed, so that only the predictors of
+#                added or modified pulsars are (re)generated.
+#
+# --pack (string) full path to a par pack file created by
+#                CandidateParGenerator.py (--pack flag). Each par file
+#                in the pack is extracted to a scratch directory only
+#                when its predictor file is generated. May be used
+#                instead of, or as well as, the -p flag.
+#
+# -j (int) the number of tempo2 jobs to run at once (default=1). Each
+#          job runs tempo2 in its own scratch directory, and moves its
+#          predictor file into place atomically, so jobs (and separate
+#          runs of this script) never see each other's t2pred.dat files,
+#          or a partially written predictor file.
+#
+# --cache (string) full path to the predictor cache directory (default
+#                <-d>/.cache). Each predictor file generated is stored
+#                in the cache, under a hash of the par file content,
+#                every tempo2 argument and the tempo2 version. Tempo2 is
+#                only run for pars with no cached predictor, so editing
+#                a par or changing any argument above regenerates its
+#                predictor, and nothing else. Cache hits and misses are
+#                reported. The cache may be deleted at any time.
+#
+# --prunecache (boolean) remove the cache entries not used by this run,
+#                e.g. those of edited pars, or of an older tempo2. The
+#                cache is content addressed, so without pruning (or
+#                deleting the cache) it grows with every such change.
+#                Skipped if the batch limit (-b) stops the run early.
+#
+# --native (boolean) build predictor files natively via numpy (see
+#                Predictor.py), rather than by running tempo2. Only
+#                possible for the solar system barycentre (--tel @), and
+#                for isolated pulsars whose spin is described by F0, F1
+#                and F2, such as the fake pulsars. Tempo2 is still run
+#                for any other par file.
+#
+# --validate (float) the phase tolerance in turns (default=0, i.e. no
+#                validation). When building predictors natively, tempo2
+#                is also run, and the phases of the two predictors are
+#                compared. If they differ by more than the tolerance,
+#                the tempo2 predictor file is used instead. Failures and
+#                the largest phase difference are reported.
+#
 #
 # License:
 #
@@ -245,6 +342,13 @@ class GeneratePredictorFiles:
         parser.add_option("--mjd1", action="store", dest="mjd1",help='Start time MJD.',default="56000")
         parser.add_option("--mjd2", action="store", dest="mjd2",help='Start time MJD.',default="56001")
         parser.add_option("--tel", action="store", dest="tel",help='The telescope the observation corresponds to.',default="PARKES")
+        parser.add_option("--changes", action="store", dest="changesPath",help='Path to a catalog changeset file (optional).',default="")
+        parser.add_option("--pack", action="store", dest="packPath",help='Path to a par pack file (optional).',default="")
+        parser.add_option("-j", type="int", dest="processes",help='The number of tempo2 jobs to run at once (optional).',default=1)
+        parser.add_option("--cache", action="store", dest="cacheDir",help='Path to the predictor cache directory (optional).',default="")
+        parser.add_option("--native", action="store_true", dest="native",help='Build predictor files natively, without tempo2 (optional).',default=False)
+        parser.add_option("--validate", type="float", dest="tolerance",help='Validate native predictors against tempo2, to this many turns (optional).',default=0.0)
+        parser.add_option("--prunecache", action="store_true", dest="pruneCache",help='Remove cache entries not used by this run (optional).',default=False)
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
@@ -261,6 +365,13 @@ class GeneratePredictorFiles:
         self.mjd1       = args.mjd1
         self.mjd2       = args.mjd2
         self.telescope  = args.tel
+        self.changesPath= args.changesPath
+        self.packPath   = args.packPath
+        self.processes  = args.processes
+        self.cacheDir   = args.cacheDir
+        self.native     = args.native
+        self.tolerance  = args.tolerance
+        self.pruneCache = args.pruneCache
 
         # ****************************************
         #   Print command line arguments & Run
@@ -280,6 +391,13 @@ class GeneratePredictorFiles:
         print "\tMJD 1:",self.mjd1
         print "\tMJD 2:",self.mjd2
         print "\tBatch size:",self.batch
+        print "\tCatalog changeset file path:",self.changesPath
+        print "\tPar pack file path:",self.packPath
+        print "\tConcurrent tempo2 jobs:",self.processes
+        print "\tPredictor cache directory:",self.cacheDir
+        print "\tBuild predictors natively:",self.native
+        print "\tNative predictor validation tolerance (turns):",self.tolerance
+        print "\tPrune unused cache entries:",self.pruneCache
 
         # Check the buffer value supplied by the user...
         if(self.obsLength <= 0):
@@ -303,9 +421,30 @@ class GeneratePredictorFiles:
             print "\tExiting..."
             sys.exit()
 
-        # First check user has supplied a par directory path ...
-        if(not self.parDir):
-            print "\n\tYou must supply a valid par directory file via the -p flag."
+        if(self.processes < 1):
+            print "\n\tSupplied number of tempo2 jobs invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        if(self.tolerance < 0):
+            print "\n\tSupplied validation tolerance invalid - Exiting!"
+            print "\tExiting..."
+            sys.exit()
+
+        # Native predictors apply no observatory or dispersion corrections.
+        if(self.native and self.telescope != "@"):
+            print "\n\tPredictor files can only be built natively for the barycentre (--tel @)."
+            print "\tExiting..."
+            sys.exit()
+
+        # First check user has supplied a par directory path, or a par pack ...
+        if(not self.parDir and not self.packPath):
+            print "\n\tYou must supply a valid par directory file via the -p flag, or a par pack via the --pack flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(self.packPath and os.path.isfile(self.packPath) == False):
+            print "\n\tPar pack file not found at: ", self.packPath
             print "\tExiting..."
             sys.exit()
 
@@ -342,6 +481,37 @@ class GeneratePredictorFiles:
             if(os.path.exists(self.fakePulsarPredictorFileDir) == False):
                 os.makedirs(self.fakePulsarPredictorFileDir)
 
+        if(not self.cacheDir):
+            self.cacheDir = self.outputDir + "/.cache"
+
+        if(os.path.exists(self.cacheDir) == False):
+            os.makedirs(self.cacheDir)
+
+        # ****************************************
+        #       Apply catalog changeset
+        # ****************************************
+
+        # The predictors of pulsars modified or removed since the last catalog
+        # refresh are deleted here. The modified pulsars are then regenerated
+        # below from their new pars (which no longer match a cached predictor),
+        # while unchanged pulsars are taken from the cache.
+        if(self.changesPath):
+            if(os.path.isfile(self.changesPath) == False):
+                print "\n\tCatalog changeset file not found at: ", self.changesPath
+                print "\tExiting..."
+                sys.exit()
+
+            changes = self.readChangeset(self.changesPath)
+            staleCount = 0
+
+            for name in changes["MODIFIED"] | changes["REMOVED"]:
+                stalePath = self.pulsarPredictorFileDir + "/" + name + ".dat"
+                if(os.path.exists(stalePath)):
+                    os.remove(stalePath)
+                    staleCount += 1
+
+            print "\n\tStale pulsar predictor files removed: ", staleCount
+
         # ****************************************
         #
         #
@@ -361,111 +531,427 @@ class GeneratePredictorFiles:
         # a TEMPO2 predictor file...
         #
         print "\n\tLooking for PAR files...\n\n"
-        parCount = 0
         fakePulsarErrors = 0
         pulsarParErrors = 0
         fakePulsarSuccesses = 0
         pulsarParSuccesses = 0
 
-        batchEntryCount = 0
-
         start = datetime.datetime.now() # Used to measure feature generation time.
 
+        # The par files to process, as (name, path) tuples. Par files in a pack
+        # have no path until they are extracted, which only happens below if a
+        # predictor file is needed. So packed pars avoid any directory scan.
+        pars = []
+
+        if(self.parDir):
+            pars = self.iterParFiles(self.parDir)
+
+        if(self.packPath):
+            pars = itertools.chain(pars,((name,None) for name in openPack(self.packPath,self.verbose).names()))
+
+        #                  MJD 1  MJD2 FCH1 FCHN
+        predArgument = self.telescope + " " + self.mjd1 + " " + self.mjd2 + " " + str(self.f1) + " " +\
+                       str(self.f2) + " " + str(self.tcoeff) + " " + str(self.fcoeff) + " " + str(self.obsLength)
+
+        # Predictors are cached under a hash of the par, the tempo2 arguments and
+        # the tempo2 version, so any change to these regenerates the predictor.
+        # Native predictors are cached under the version of the native builder
+        # instead, so they never replace (or are replaced by) those of tempo2.
+        # Predictors made by tempo2 are always cached under the tempo2 key, even
+        # when tempo2 is the fallback of a native build, so a cache hit always
+        # holds a predictor made by the method its key names.
+        tempo2Version = self.tempo2Version()
+        print "\tTempo2 version: ", tempo2Version
+
+        if(self.native):
+            from Predictor import Predictor
+            nativeVersion = "native " + str(Predictor.version) + " validate " + repr(self.tolerance) + " " + tempo2Version
+        else:
+            nativeVersion = None
+
+        self.cacheHits = 0
+        self.cacheMisses = 0
+        self.fakePulsarCacheHits = 0
+        self.pulsarCacheHits = 0
+
+        # The cache entries used by this run, and whether every par was visited.
+        self.cacheUsed = set()
+        self.allParsVisited = False
+        self.published = 0
+
+        # The predictor arguments, as needed to build predictors natively.
+        settings = {"native":self.native,"tolerance":self.tolerance,"mjd1":self.mjd1,"mjd2":self.mjd2,
+                    "f1":self.f1,"f2":self.f2,"tcoeff":self.tcoeff,"fcoeff":self.fcoeff,"secs":self.obsLength}
+
+        nativeCount = 0
+        tempo2Count = 0
+        validated = 0
+        validationFailures = 0
+        maxDeviation = 0.0
+
+        # Each job runs tempo2 in its own scratch directory, so jobs may run
+        # concurrently. Only start a pool of worker processes if requested.
+        jobs = self.createJobs(pars,predArgument,tempo2Version,nativeVersion,settings)
+
+        if(self.processes > 1):
+            pool = Pool(self.processes)
+            results = pool.imap_unordered(generatePredictor,jobs)
+        else:
+            pool = None
+            results = itertools.imap(generatePredictor,jobs)
+
+        try:
+            for name, destination, success, method, deviation in results:
+
+                if(deviation is not None):
+                    validated += 1
+                    maxDeviation = max(maxDeviation,deviation)
+
+                    if(deviation > self.tolerance):
+                        validationFailures += 1
+                        print "\tNative predictor failed validation for par: ", name, " (turns: ", deviation, ")"
+
+                if(success):
+                    if(self.verbose):
+                        print "\tPredictor file created (" + method + "): ", destination
+
+                    if(method == "native"):
+                        nativeCount += 1
+                    else:
+                        tempo2Count += 1
+
+                    # Update success counting stats.
+                    if("FakePulsar_" in name):
+                        fakePulsarSuccesses +=1
+                    else:
+                        pulsarParSuccesses +=1
+                else:
+                    # The expected t2pred.dat file does not exist - tempo2 must have
+                    # encountered some problem. Tell the user...
+                    print "\tError generating predictor file for par: ", name
+
+                    # Update error counting stats.
+                    if("FakePulsar_" in name):
+                        fakePulsarErrors +=1
+                    else:
+                        pulsarParErrors +=1
+        finally:
+            # Every job has finished (or failed) once the results are consumed.
+            if(pool is not None):
+                pool.terminate()
+
+            closePacks()
+
+        if(self.pruneCache):
+            if(self.allParsVisited):
+                print "\n\tUnused predictor cache entries removed: ", self.pruneUnusedCache()
+            else:
+                print "\n\tPredictor cache not pruned, as the batch limit stopped the run before every par was visited."
+
+        # Finally get the time that the procedure finished.
+        end = datetime.datetime.now()
+
+        # Par files with a cached predictor are found, but need no predictor file creation.
+        noisePars = fakePulsarErrors + fakePulsarSuccesses + self.fakePulsarCacheHits
+        pulsarPars = pulsarParErrors + pulsarParSuccesses + self.pulsarCacheHits
+        print "\n\tFake Pulsar Par files found: " + str(noisePars)
+        print "\tPulsar Par files found: " + str(pulsarPars)
+        print "\tFake pulsar Par cache hits (predictor file reused) : " + str(self.fakePulsarCacheHits)
+        print "\tPulsar Par cache hits (predictor file reused): " + str(self.pulsarCacheHits)
+        print "\tFake pulsar Par errors (predictor file creation) : " + str(fakePulsarErrors)
+        print "\tPulsar Par errors (predictor file creation): " + str(pulsarParErrors)
+        print "\tFake pulsar Par successes (predictor file creation) : " + str(fakePulsarSuccesses)
+        print "\tPulsar Par successes (predictor file creation): " + str(pulsarParSuccesses), "\n\n"
+        print "\tPredictor cache hits: " + str(self.cacheHits) + " misses: " + str(self.cacheMisses) +\
+              " (predictor files updated from the cache: " + str(self.published) + ")"
+        print "\tPredictor files built natively: " + str(nativeCount) + " by tempo2: " + str(tempo2Count)
+
+        if(validated > 0):
+            print "\tNative predictors validated: " + str(validated) + " failures: " + str(validationFailures) +\
+                  " (largest phase difference: " + str(maxDeviation) + " turns)"
+
+        print "\tExecution time: ", str(end - start)
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Finds the par files in a directory, and its sub-directories.
+    #
+    #  @param self The object pointer.
+    #  @param directory The directory to search.
+    #  @returns a generator yielding a (name, path) tuple for each par file found.
+    def iterParFiles(self,directory):
+        """
+        Finds the par files in a directory, and its sub-directories. The name
+        of each par file is its file name without the .par suffix.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The directory to search.
+
+        Returns
+        -------
+        generator
+            Yields a (name, path) tuple for each par file found.
+
+        """
         # Loop through the specified directory
-        for root, subFolders, filenames in os.walk(self.parDir):
+        for root, subFolders, filenames in os.walk(directory):
             # for each file
             for filename in filenames:
                 path = os.path.join(root, filename) # Gets full path to the par.
 
-                # Break if we have reached the batch limit
-                if(batchEntryCount == self.batch):
-                    break
-
                 for ext in self.extensions:
 
                     if(ext in path):
+                        yield filename.replace(ext,""), path
+
+    # ****************************************************************************************************
+
+    ## Creates the predictor file generation jobs for par files with no cached predictor file.
+    #
+    #  @param self The object pointer.
+    #  @param pars The par files, as (name, path) tuples. The path is None for par files in the pack.
+    #  @param predArgument The -pred argument passed to tempo2.
+    #  @param tempo2Version The tempo2 version string.
+    #  @param nativeVersion The native builder version string, or None if predictors are made by tempo2.
+    #  @param settings The predictor arguments, as needed to build predictors natively (see generatePredictor).
+    #  @returns a generator yielding a job tuple for each predictor file to generate (see generatePredictor).
+    def createJobs(self,pars,predArgument,tempo2Version,nativeVersion,settings):
+        """
+        Creates the predictor file generation jobs for par files with no cached
+        predictor file. The cache key of each par is the SHA-1 hash of its
+        content, the -pred argument and the tempo2 version (or, when building
+        natively, the native builder version). Each job is also given the
+        tempo2 key, under which any predictor made by tempo2 is cached. If the
+        cache holds a predictor for the key (a hit), it is published to the output
+        directory, unless already there. Otherwise (a miss) a job is created,
+        at most self.batch jobs being created. Hits and misses are counted in
+        self.cacheHits and self.cacheMisses, and hits also by par type in
+        self.fakePulsarCacheHits and self.pulsarCacheHits. The cache paths of
+        every par visited are added to self.cacheUsed, and
+        self.allParsVisited set once no par is left (see pruneUnusedCache).
 
-                        name = filename.replace(ext,"")
-                        print "\tPath: ", path , " Filename: ",name
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        pars : iterable
+            The par files, as (name, path) tuples. The path is None for par
+            files in the pack.
+        predArgument : str
+            The -pred argument passed to tempo2.
+        tempo2Version : str
+            The tempo2 version string.
+        nativeVersion : str
+            The native builder version string, or None if predictors are made
+            by tempo2.
+        settings : dict
+            The predictor arguments, as needed to build predictors natively
+            (see generatePredictor).
+
+        Returns
+        -------
+        generator
+            Yields a (name, par path, pack path, destination path, -pred
+            argument, cache path, tempo2 cache path, settings) tuple for each
+            predictor file to generate.
 
+        """
+        batchEntryCount = 0
 
-                        fakePulsarDestPath = self.fakePulsarPredictorFileDir + "/" + name + ".dat"
-                        pulsarDestPath = self.pulsarPredictorFileDir + "/" + name + ".dat"
+        for name, path in pars:
 
-                        # If the file already exists, don't over write it...
-                        if(os.path.exists(fakePulsarDestPath) or os.path.exists(pulsarDestPath)):
-                            continue
+            # Break if we have reached the batch limit
+            if(batchEntryCount == self.batch):
+                return
 
-                        if(batchEntryCount < self.batch):
+            if(self.verbose):
+                print "\tPath: ", path , " Filename: ",name
 
-                            # update count
-                            batchEntryCount+=1
+            if("FakePulsar_" in name):
+                destination = self.fakePulsarPredictorFileDir + "/" + name + ".dat"
+            else:
+                destination = self.pulsarPredictorFileDir + "/" + name + ".dat"
 
-                            #                                                  MJD 1  MJD2 FCH1 FCHN
-                            tempo2Command = "tempo2 -f " + path + " -pred \"" +self.telescope + " " + self.mjd1+" "+\
-                                            self.mjd2+" "+ str(self.f1) + " " + str(self.f2) + " " + str(self.tcoeff) +\
-                                            " " + str(self.fcoeff) + " " + str(self.obsLength)+"\""
+            if(path is None):
+                parText = openPack(self.packPath).read(name)
+            else:
+                parFile = open(path,'rb')
 
-                            # Now try to execute the tempo2 command...
-                            #
-                            process = subprocess.Popen(tempo2Command, shell=True)
-                            process.wait()
+                try:
+                    parText = parFile.read()
+                finally:
+                    parFile.close()
 
-                            # If the expected output file exists...
-                            if(os.path.exists("t2pred.dat") == True):
+            key = hashlib.sha1(parText + "\0" + predArgument + "\0" + tempo2Version).hexdigest()
+            tempo2CachePath = self.cacheDir + "/" + key + ".dat"
 
-                                # If we are dealing with a noise file, move predictor file to
-                                # the correct noise output folder.
-                                if("FakePulsar_" in name):
+            if(nativeVersion is None):
+                cachePath = tempo2CachePath
+            else:
+                key = hashlib.sha1(parText + "\0" + predArgument + "\0" + nativeVersion).hexdigest()
+                cachePath = self.cacheDir + "/" + key + ".dat"
 
-                                    # Physically copy the file
-                                    self.clearFile(fakePulsarDestPath)
-                                    copyfile("t2pred.dat", fakePulsarDestPath)
+            self.cacheUsed.add(cachePath)
+            self.cacheUsed.add(tempo2CachePath)
 
-                                    # Check the file exists.
-                                    if(os.path.exists(fakePulsarDestPath) == True):
-                                        # The file was copied successfully.
-                                        fakePulsarSuccesses +=1
-                                    else:
-                                        fakePulsarErrors +=1
-                                else:
+            if(os.path.exists(cachePath)):
+                self.cacheHits += 1
 
-                                    # Physically copy the file
-                                    self.clearFile(pulsarDestPath)
-                                    copyfile("t2pred.dat", pulsarDestPath)
+                if("FakePulsar_" in name):
+                    self.fakePulsarCacheHits += 1
+                else:
+                    self.pulsarCacheHits += 1
 
-                                    # Check the file exists.
-                                    if(os.path.exists(pulsarDestPath) == True):
-                                        # The file was copied successfully.
-                                        pulsarParSuccesses +=1
-                                    else:
-                                        pulsarParErrors +=1
+                if(isPublished(cachePath,destination) == False):
+                    publish(cachePath,destination)
+                    self.published += 1
 
-                            else:
-                                # The expected t2pred.dat file does not exist - tempo2 must have
-                                # encountered some problem. Tell the user...
-                                print "\tError generating predictor file for par: ", path
+                continue
 
-                                # Update error counting stats.
-                                if("FakePulsar_" in name):
-                                    fakePulsarErrors +=1
-                                else:
-                                    pulsarParErrors +=1
+            # update count
+            self.cacheMisses += 1
+            batchEntryCount+=1
 
-        # Finally get the time that the procedure finished.
-        end = datetime.datetime.now()
+            # tempo2 runs in a scratch directory, so needs the full path to the par.
+            if(path is not None):
+                path = os.path.abspath(path)
 
-        noisePars = fakePulsarErrors + fakePulsarSuccesses
-        pulsarPars = pulsarParErrors + pulsarParSuccesses
-        print "\n\tFake Pulsar Par files found: " + str(noisePars)
-        print "\tPulsar Par files found: " + str(pulsarPars)
-        print "\tFake pulsar Par errors (predictor file creation) : " + str(fakePulsarErrors)
-        print "\tPulsar Par errors (predictor file creation): " + str(pulsarParErrors)
-        print "\tFake pulsar Par successes (predictor file creation) : " + str(fakePulsarSuccesses)
-        print "\tPulsar Par successes (predictor file creation): " + str(pulsarParSuccesses), "\n\n"
-        print "\tExecution time: ", str(end - start)
-        print "\n\tDone."
-        print "\t**************************************************************************" # Used only for formatting purposes.
+            yield name, path, self.packPath, destination, predArgument, cachePath, tempo2CachePath, settings
+
+        self.allParsVisited = True
+
+    # ****************************************************************************************************
+
+    ## Removes the predictor cache entries not used by this run.
+    #
+    #  @param self The object pointer.
+    #  @returns the number of cache entries removed.
+    def pruneUnusedCache(self):
+        """
+        Removes the predictor cache entries not used by this run, i.e. those
+        not in self.cacheUsed. Cache entries are content addressed, so each
+        edited par, changed argument or tempo2 upgrade leaves the old entries
+        behind, and without pruning the cache grows without limit. Entries
+        made with other arguments (e.g. by a tempo2 run, if this run is
+        native) are removed too. Should only be called once every par has
+        been visited by createJobs.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of cache entries removed.
+
+        """
+        removed = 0
+
+        for filename in os.listdir(self.cacheDir):
+            cachePath = self.cacheDir + "/" + filename
+
+            # Temporary files belong to publish calls which may still be running.
+            if(filename.endswith(".dat") and cachePath not in self.cacheUsed):
+                try:
+                    os.remove(cachePath)
+                    removed += 1
+                except OSError as e:
+                    print "\tError removing predictor cache entry: ", cachePath, "\n\t", e
+
+        return removed
+
+    # ****************************************************************************************************
+
+    ## Gets the version of tempo2 used to create predictor files.
+    #
+    #  @param self The object pointer.
+    #  @returns the tempo2 version string, or "unknown" if it could not be found.
+    def tempo2Version(self):
+        """
+        Gets the version of tempo2 used to create predictor files, as reported
+        by tempo2 -v, so that cached predictors made by another version of
+        tempo2 are not reused.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The tempo2 version string, or "unknown" if it could not be found.
+
+        """
+        try:
+            process = subprocess.Popen(["tempo2","-v"],stdout=subprocess.PIPE,stderr=subprocess.STDOUT)
+            output = process.communicate()[0]
+        except OSError:
+            return "unknown"
+
+        lines = [line.strip() for line in output.splitlines() if line.strip()]
+
+        for line in lines:
+            if("version" in line.lower()):
+                return line
+
+        return " ".join(lines) if lines else "unknown"
+
+    # ****************************************************************************************************
+
+    ## Reads a catalog changeset file created by ATNFDataExtractor.py.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the changeset file.
+    #  @returns a dictionary containing the set of pulsar names for each change
+    #   type, i.e. "ADDED", "REMOVED" and "MODIFIED".
+    def readChangeset(self,path):
+        """
+        Reads a catalog changeset file created by ATNFDataExtractor.py, which
+        has the format,
+
+        Change,Name
+        ADDED,J0002+6216
+        MODIFIED,J0348+0432
+        REMOVED,J0033+57
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the changeset file.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the set of pulsar names for each change
+            type, i.e. "ADDED", "REMOVED" and "MODIFIED".
+
+        """
+        changes = {"ADDED":set(),"REMOVED":set(),"MODIFIED":set()}
+
+        sourceFile = open(path,'r')
+
+        try:
+            sourceFile.readline() # Skip the header.
+
+            for line in sourceFile:
+                components = line.strip().split(",")
+                if(len(components) == 2 and components[0] in changes):
+                    changes[components[0]].add(components[1])
+        finally:
+            sourceFile.close()
+
+        return changes
 
     # ****************************************************************************************************
 
@@ -523,5 +1009,260 @@ class GeneratePredictorFiles:
 
     # ******************************************************************************************
 
+## The par packs opened by this process, keyed by path (see openPack).
+openPacks = {}
+
+## Opens a par pack for reading, reusing the pack if this process has already opened it.
+#
+#  @param path The full path to the par pack file.
+#  @param verbose The verbose debugging flag.
+#  @returns the par pack (see PARS/ParPack.py).
+def openPack(path,verbose=False):
+    """
+    Opens a par pack for reading, reusing the pack if this process has already
+    opened it, so that its index is loaded once per process, not once per par.
+
+    Parameters
+    ----------
+    path : str
+        The full path to the par pack file.
+    verbose : bool
+        The verbose debugging flag.
+
+    Returns
+    -------
+    ParPack
+        The par pack (see PARS/ParPack.py).
+
+    """
+    if(path not in openPacks):
+        # The par pack reader lives alongside this script when deployed, and in
+        # the PARS directory of the repository.
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","PARS"))
+        from ParPack import ParPack
+
+        openPacks[path] = ParPack(path,verbose)
+
+    return openPacks[path]
+
+# ****************************************************************************************************
+
+## Closes the par packs opened by this process.
+def closePacks():
+    """
+    Closes the par packs opened by this process (see openPack).
+
+    """
+    for pack in openPacks.values():
+        pack.close()
+
+    openPacks.clear()
+
+# ****************************************************************************************************
+
+## Publishes a file atomically, as a hard link to (or else a copy of) the source file.
+#
+#  @param source The full path to the source file.
+#  @param destination The full path to publish the file to.
+def publish(source,destination):
+    """
+    Publishes a file atomically. A hard link to the source file (or, if hard
+    links are not supported, a copy of it) is made beside the destination,
+    then renamed into place, so a partially written file is never visible.
+    The temporary file is named after this process, so concurrent runs never
+    write to the same temporary file.
+
+    Parameters
+    ----------
+    source : str
+        The full path to the source file.
+    destination : str
+        The full path to publish the file to.
+
+    """
+    temporaryPath = destination + "." + str(os.getpid()) + ".tmp"
+
+    if(os.path.exists(temporaryPath)):
+        os.remove(temporaryPath)
+
+    try:
+        try:
+            os.link(source,temporaryPath)
+        except (AttributeError, OSError):
+            copyfile(source,temporaryPath)
+
+        os.rename(temporaryPath,destination)
+    finally:
+        if(os.path.exists(temporaryPath)):
+            os.remove(temporaryPath)
+
+# ****************************************************************************************************
+
+## Checks if a file has already been published.
+#
+#  @param source The full path to the source file.
+#  @param destination The full path the file is published to.
+#  @returns True if the destination holds the same content as the source, else False.
+def isPublished(source,destination):
+    """
+    Checks if a file has already been published, i.e. if the destination is
+    a hard link to the source, or a copy with the same content.
+
+    Parameters
+    ----------
+    source : str
+        The full path to the source file.
+    destination : str
+        The full path the file is published to.
+
+    Returns
+    -------
+    bool
+        True if the destination holds the same content as the source, else False.
+
+    """
+    if(os.path.exists(destination) == False):
+        return False
+
+    if(os.path.samefile(source,destination)):
+        return True
+
+    return filecmp.cmp(source,destination,shallow=False)
+
+# ****************************************************************************************************
+
+## Generates a single predictor file, natively or by running tempo2 in a scratch directory.
+# Defined at module level so that it can be called by a multiprocessing
+# worker process (see GeneratePredictorFiles.main).
+#
+#  @param job A tuple containing the par name, the par path (None for a par in the pack),
+#   the pack path, the destination path of the predictor file, the -pred argument, the cache path
+#   and the predictor arguments.
+#  @returns a tuple containing the par name, the destination path, True if the predictor was created,
+#   the method used to create it ("native" or "tempo2"), and its phase difference from tempo2's
+#   predictor (None unless validated).
+def generatePredictor(job):
+    """
+    Generates a single predictor file. Tempo2 always writes t2pred.dat to its
+    working directory, so each job runs tempo2 in its own scratch directory,
+    which is removed afterwards. If requested, the predictor is instead built
+    natively (see Predictor.py), falling back to tempo2 for par files that
+    cannot be built natively. When validating, tempo2 is run as well, and its
+    predictor used if the phases differ by more than the tolerance. Tempo2 is
+    not run if its predictor is already in the cache. A par in the pack is
+    extracted into the same scratch directory. The predictor is published
+    atomically to the cache, under the tempo2 cache path if made by tempo2
+    (so a failed native build or validation is never cached as native, and
+    is retried and reported again on the next run), then from the cache to
+    its destination (see publish), so a partially
+    written predictor file is never visible. Defined at module level so that
+    it can be called by a multiprocessing worker process (see
+    GeneratePredictorFiles.main).
+
+    Parameters
+    ----------
+    job : tuple
+        A tuple containing the par name, the par path (None for a par in the
+        pack), the pack path, the destination path of the predictor file, the
+        -pred argument passed to tempo2, the path of the predictor file in
+        the cache, the path of tempo2's predictor file in the cache, and a
+        dictionary of the predictor arguments (native, tolerance, mjd1, mjd2,
+        f1, f2, tcoeff, fcoeff and secs).
+
+    Returns
+    -------
+    tuple
+        The par name, the destination path, True if the predictor file was
+        created (else False), the method used to create it ("native" or
+        "tempo2"), and the largest phase difference (turns) between the
+        native and tempo2 predictors (None unless validated).
+
+    """
+    name, path, packPath, destination, predArgument, cachePath, tempo2CachePath, settings = job
+
+    jobDir = tempfile.mkdtemp(prefix="pred_")
+
+    try:
+        # Packed par files are extracted only when needed.
+        if(path is None):
+            path = openPack(packPath).extract(name,jobDir)
+
+        tempo2Path = os.path.join(jobDir,"t2pred.dat")
+        predictorPath = tempo2Path
+        method = "tempo2"
+        deviation = None
+
+        if(settings["native"]):
+            from Predictor import Predictor
+
+            parFile = open(path,'r')
+
+            try:
+                parText = parFile.read()
+            finally:
+                parFile.close()
+
+            predictor = Predictor()
+
+            # Pars the native builder does not support are left to tempo2.
+            try:
+                predictor.build(parText,settings["mjd1"],settings["mjd2"],settings["f1"],settings["f2"],
+                                settings["tcoeff"],settings["fcoeff"],settings["secs"])
+
+                predictorPath = os.path.join(jobDir,"native.dat")
+                predictor.write(predictorPath)
+                method = "native"
+            except ValueError:
+                pass
+
+        if(method == "tempo2" or settings["tolerance"] > 0):
+            if(os.path.exists(tempo2CachePath)):
+                # Tempo2's predictor is already cached, e.g. by an earlier run.
+                tempo2Path = tempo2CachePath
+            else:
+                tempo2Command = "tempo2 -f " + path + " -pred \"" + predArgument + "\""
+
+                # Now try to execute the tempo2 command...
+                #
+                process = subprocess.Popen(tempo2Command, shell=True, cwd=jobDir)
+                process.wait()
+
+            if(method == "tempo2"):
+                predictorPath = tempo2Path
+
+        # Validate the native predictor against tempo2's, if tempo2 succeeded.
+        if(method == "native" and settings["tolerance"] > 0 and os.path.exists(tempo2Path)):
+            reference = Predictor()
+            reference.read(tempo2Path)
+            deviation = predictor.compare(reference)
+
+            if(deviation > settings["tolerance"]):
+                predictorPath = tempo2Path
+                method = "tempo2"
+
+        # If the expected output file does not exist, tempo2 must have
+        # encountered some problem.
+        if(os.path.exists(predictorPath) == False):
+            return name, destination, False, method, deviation
+
+        # Only native predictors are cached under the native key.
+        if(method == "tempo2"):
+            cachePath = tempo2CachePath
+
+        try:
+            if(predictorPath != cachePath):
+                publish(predictorPath,cachePath)
+
+            publish(cachePath,destination)
+        except (IOError, OSError) as e:
+            print "\tError publishing predictor file: ", destination, "\n\t", e
+            return name, destination, False, method, deviation
+
+        return name, destination, True, method, deviation
+    finally:
+        rmtree(jobDir,ignore_errors=True)
+
+# ****************************************************************************************************
+
 if __name__ == '__main__':
     GeneratePredictorFiles().main()
\ No newline at end of file
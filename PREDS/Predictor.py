@@ -0,0 +1,1258 @@
+## @package PREDS
+# A module used to build, read, write and evaluate Tempo2 predictor files
+# (ChebyModelSet files) natively, via numpy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                         Predictor Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Builds, reads and evaluates Tempo2 predictor files (t2pred.dat) via    |
+    | numpy, without running tempo2. A predictor is a ChebyModelSet, a       |
+    | series of overlapping time segments, each describing pulse phase over  |
+    | a time and frequency range by a 2D Chebyshev series:                   |
+    |                                                                        |
+    | ChebyModel BEGIN                                                       |
+    | PSRNAME J0006+1834                                                     |
+    | SITENAME @                                                             |
+    | TIME_RANGE <start MJD> <end MJD>                                       |
+    | FREQ_RANGE <start MHz> <end MHz>                                       |
+    | DISPERSION_CONSTANT <constant>                                         |
+    | NCOEFF_TIME <n time coefficients>                                      |
+    | NCOEFF_FREQ <n frequency coefficients>                                 |
+    | COEFFS <one line per time coefficient, one value per freq. coeff.>     |
+    | ChebyModel END                                                         |
+    |                                                                        |
+    | Predictor files are parsed into coefficient arrays, with a table of    |
+    | the time range, frequency range and dispersion constant of each        |
+    | segment. Pulse phase and apparent spin frequency can then be evaluated |
+    | over any grid of times and frequencies in a single vectorised call.    |
+    | Times and coefficients are held in extended precision (longdouble),    |
+    | and phases may be evaluated in extended precision when required, e.g.  |
+    | for millisecond pulsars, where a double precision MJD is only accurate |
+    | to around a microsecond.                                               |
+    |                                                                        |
+    | Predictors can also be built natively for isolated pulsars observed at |
+    | the solar system barycentre (site @), whose timing model is a spin     |
+    | frequency and up to two derivatives (F0, F1, F2, PEPOCH and TZRMJD),   |
+    | e.g. the fake pulsars created by PARS/CandidateParGenerator.py. The    |
+    | phase of every segment is sampled at the Chebyshev nodes and fitted    |
+    | for all segments at once, so thousands of predictors can be built per  |
+    | second. Native predictors can be validated against tempo2's.           |
+    |                                                                        |
+    | Run as a script, prints the phase and apparent frequency given by a    |
+    | predictor file, and optionally compares it with another.               |
+    |                                                                        |
+    | Requires numpy.                                                        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (string) full path to a predictor file.                             |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | --mjds (string) comma separated MJDs to evaluate the predictor at      |
+    |                 (default = 5 MJDs spanning the predictor).             |
+    |                                                                        |
+    | --freqs (string) comma separated frequencies (MHz) to evaluate the     |
+    |                  predictor at (default = the start, centre and end     |
+    |                  of the frequency range).                              |
+    |                                                                        |
+    | -c (string) full path to a second predictor file, to compare phases    |
+    |             with.                                                      |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+
+# Numpy Imports:
+from numpy import abs as absolute
+from numpy import arange
+from numpy import argsort
+from numpy import array
+from numpy import asarray
+from numpy import broadcast_arrays
+from numpy import ceil
+from numpy import cos
+from numpy import einsum
+from numpy import empty
+from numpy import full
+from numpy import inf
+from numpy import isnan
+from numpy import linspace
+from numpy import longdouble
+from numpy import minimum
+from numpy import nan
+from numpy import ones
+from numpy import pi
+from numpy import rint
+from numpy import searchsorted
+from numpy import trunc
+from numpy import where
+from numpy import zeros
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Predictor Version 1.0
+#
+# Builds, reads and evaluates Tempo2 predictor files (t2pred.dat) via
+# numpy, without running tempo2. The segments of a predictor are held in
+# a table of numpy arrays, indexed by segment:
+#
+# starts      - the start MJD of each segment (longdouble).
+# ends        - the end MJD of each segment (longdouble).
+# midpoints   - the midpoint MJD of each segment (longdouble), used to
+#               choose the segment evaluated at a given time.
+# freqStarts  - the start frequency (MHz) of each segment.
+# freqEnds    - the end frequency (MHz) of each segment.
+# dispersions - the dispersion constant of each segment.
+# coeffs      - the Chebyshev coefficients of each segment (longdouble),
+#               with shape (segments, time coeffs., frequency coeffs.).
+#               Segments with fewer coefficients are padded with zeros.
+#
+# The phase at a time and frequency within a segment is,
+#
+# sum_ij w_i w_j c_ij T_i(x) T_j(y) + dispersion constant / freq^2
+#
+# where x and y are the time and frequency scaled to [-1,1] over the
+# segment, T_i is the Chebyshev polynomial of the first kind of degree
+# i, and w_0 = 0.5, while w_i = 1 for i > 0 (the tempo2 convention).
+#
+# Predictors can also be built natively, for isolated pulsars observed
+# at the solar system barycentre (site @).
+#
+# Requires numpy.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class Predictor:
+    """
+    Description:
+
+    Builds, reads and evaluates Tempo2 predictor files via numpy. Predictors
+    can be built natively for isolated pulsars observed at the solar system
+    barycentre (site @).
+
+    Examples
+    --------
+
+    >>> predictor = Predictor()
+    >>> predictor.read("/Users/rob/t2pred.dat")
+    >>> phases, frequencies = predictor.grid(mjds,[1350,1510,1670],precise=True)
+    >>> native = Predictor()
+    >>> native.build(parText,"56000","56001",1350,1670,12,2,600)
+    >>> native.write("/Users/rob/preds/FakePulsar_1.dat")
+    >>> print native.compare(predictor)
+    """
+
+    ## The version of the native predictor builder. Increment this when the predictors built change.
+    version = 1
+
+    ## The fraction of each segment overlapping the next, as used by tempo2.
+    overlap = 0.1
+
+    ## The timing model parameters of the pars predictors can be built for.
+    supported = set(["PSRJ","PSRB","PSR","RAJ","DECJ","ELONG","ELAT","LAMBDA","BETA","PMRA","PMDEC","PMELONG",
+                     "PMELAT","PX","POSEPOCH","DM","DMEPOCH","PEPOCH","F0","F1","F2","TZRMJD","TZRFREQ","TZRSITE",
+                     "UNITS","EPHEM","CLK","CLOCK","TIMEEPH","T2CMETHOD","CORRECT_TROPOSPHERE","PLANET_SHAPIRO",
+                     "DILATEFREQ","NTOA","TRES","START","FINISH","NITS","MODE","EPHVER","NE_SW","CHI2R"])
+
+    ## Creates an empty predictor.
+    #
+    #  @param self The object pointer.
+    def __init__(self):
+        """
+        Creates an empty predictor, to be built via build() or read via read().
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        self.name        = ""
+        self.site        = "@"
+        self.starts      = empty(0,dtype=longdouble)
+        self.ends        = empty(0,dtype=longdouble)
+        self.midpoints   = empty(0,dtype=longdouble)
+        self.freqStarts  = empty(0)
+        self.freqEnds    = empty(0)
+        self.dispersions = empty(0)
+        self.coeffs      = empty((0,0,0),dtype=longdouble)
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and evaluates a predictor file.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and evaluates a predictor file.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-p", action="store", dest="predictorPath",help='Path to a predictor file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--mjds", action="store", dest="mjds",help='Comma separated MJDs to evaluate at (optional).',default="")
+        parser.add_option("--freqs", action="store", dest="freqs",help='Comma separated frequencies (MHz) to evaluate at (optional).',default="")
+        parser.add_option("-c", action="store", dest="comparePath",help='Path to a predictor file to compare with (optional).',default="")
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",args.verbose
+        print "\tPredictor file path:",args.predictorPath
+        print "\tMJDs:",args.mjds
+        print "\tFrequencies:",args.freqs
+        print "\tComparison predictor file path:",args.comparePath
+
+        for path in [args.predictorPath,args.comparePath]:
+            if(path and os.path.isfile(path) == False):
+                print "\n\tPredictor file not found at: ", path
+                print "\tExiting..."
+                sys.exit()
+
+        if(not args.predictorPath):
+            print "\n\tYou must supply a valid predictor file via the -p flag."
+            print "\tExiting..."
+            sys.exit()
+
+        self.read(args.predictorPath)
+
+        print "\n\tPulsar: ", self.name, " Site: ", self.site, " Segments: ", len(self)
+        print "\tTime range (MJD): ", self.starts[0], " - ", self.ends[-1]
+
+        if(args.verbose):
+            print "\tCoefficients (time x freq.): ", self.coeffs.shape[1], " x ", self.coeffs.shape[2]
+
+        if(args.mjds):
+            mjds = array([self.parseExtended(mjd) for mjd in args.mjds.split(",")],dtype=longdouble)
+        else:
+            mjds = linspace(self.starts[0],self.ends[-1],5)
+
+        if(args.freqs):
+            freqs = array([float(freq) for freq in args.freqs.split(",")])
+        else:
+            freqs = array([self.freqStarts[0],(self.freqStarts[0] + self.freqEnds[0]) / 2.0,self.freqEnds[0]])
+
+        phases, frequencies = self.grid(mjds,freqs,precise=True)
+
+        print "\n\tMJD\t\t\tFreq. (MHz)\tPhase (turns)\t\tApparent freq. (Hz)"
+
+        for t, mjd in enumerate(mjds):
+            for f, freq in enumerate(freqs):
+                print "\t" + self.formatExtended([mjd])[0][:22] + "\t" + str(freq) + "\t\t" +\
+                      self.formatExtended([phases[t,f]])[0][:22] + "\t" + repr(float(frequencies[t,f]))
+
+        if(args.comparePath):
+            other = Predictor()
+            other.read(args.comparePath)
+
+            print "\n\tLargest phase difference (turns): ", self.compare(other)
+
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Gets the number of segments in the predictor.
+    #
+    #  @param self The object pointer.
+    #  @returns the number of segments.
+    def __len__(self):
+        """
+        Gets the number of segments in the predictor.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of segments.
+
+        """
+        return len(self.starts)
+
+    # ****************************************************************************************************
+
+    ## Parses a decimal number without losing precision.
+    #
+    #  @param self The object pointer.
+    #  @param value The number, as a string.
+    #  @returns the number as a numpy longdouble.
+    def parseExtended(self,value):
+        """
+        Parses a decimal number without losing precision. Python (and numpy)
+        parse numbers as doubles, keeping only ~16 significant digits, whereas
+        MJDs and predictor coefficients are written with 20 or more. So the
+        whole part and the fractional digits are parsed separately, as exact
+        integers, then combined in extended precision. The whole part is
+        exact, and the fraction is divided by an exact power of ten, so whole
+        MJDs (e.g. "56001.00000000000000000000") and short fractions are
+        parsed exactly, and text written by formatExtended() is read back
+        unchanged.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        value : str
+            The number, as a string, e.g. "56000.00694444444444286546".
+
+        Returns
+        -------
+        numpy.longdouble
+            The number in extended precision.
+
+        """
+        value = value.strip().upper().replace("D","E")
+        mantissa, exponent = (value.split("E") + ["0"])[:2]
+
+        sign = -1 if mantissa.startswith("-") else 1
+        whole, fraction = (mantissa.lstrip("+-").split(".") + [""])[:2]
+
+        whole = whole.lstrip("0")
+
+        # Digits beyond the precision of a longdouble are dropped.
+        fraction = fraction.rstrip("0")[:36]
+
+        # Whole parts too long to convert exactly never occur in predictors.
+        if(len(whole) <= 18):
+            number = longdouble(int(whole or "0"))
+        else:
+            number = longdouble(float(whole))
+
+        if(fraction):
+            number += longdouble(int(fraction[:18])) / self.powerOfTen(len(fraction[:18]))
+
+            if(len(fraction) > 18):
+                number += longdouble(int(fraction[18:])) / self.powerOfTen(len(fraction))
+
+        exponent = int(exponent)
+
+        if(exponent > 0):
+            number *= self.powerOfTen(exponent)
+        elif(exponent < 0):
+            number /= self.powerOfTen(-exponent)
+
+        return sign * number
+
+    # ****************************************************************************************************
+
+    ## Computes a power of ten in extended precision.
+    #
+    #  @param self The object pointer.
+    #  @param exponent The (non-negative) power.
+    #  @returns ten to the power, as a numpy longdouble.
+    def powerOfTen(self,exponent):
+        """
+        Computes a power of ten in extended precision, as a product of exact
+        integers, rather than via pow(). The result is exact up to 10^27, the
+        largest power of ten a longdouble holds exactly.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        exponent : int
+            The (non-negative) power.
+
+        Returns
+        -------
+        numpy.longdouble
+            Ten to the power.
+
+        """
+        power = longdouble(1)
+
+        while(exponent > 18):
+            power *= longdouble(10 ** 18)
+            exponent -= 18
+
+        return power * longdouble(10 ** exponent)
+
+    # ****************************************************************************************************
+
+    ## Formats numbers without losing precision.
+    #
+    #  @param self The object pointer.
+    #  @param values The numbers.
+    #  @returns a list containing each number as a string.
+    def formatExtended(self,values):
+        """
+        Formats numbers without losing precision. Python (and numpy) format
+        longdoubles as doubles, so numbers of magnitude one or more are instead
+        written as their whole part and their fraction, which are formatted
+        separately, e.g. 56000.00694444444444286546. Smaller numbers are
+        formatted as doubles.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        values : numpy.ndarray
+            The numbers.
+
+        Returns
+        -------
+        list
+            Each number as a string.
+
+        """
+        values = asarray(values,dtype=longdouble)
+        wholes = trunc(values)
+        fractions = absolute(values - wholes).astype(float).tolist()
+
+        text = []
+
+        for value, whole, fraction in zip(values.tolist(),wholes,fractions):
+            if(not abs(value) >= 1): # Includes NaN.
+                text.append("%.17g" % value)
+            else:
+                text.append(("-" if value < 0 else "") + ("%d" % abs(int(whole))) + ("%.20f" % fraction)[1:])
+
+        return text
+
+    # ****************************************************************************************************
+
+    ## Reads the timing model of a pulsar from the text of its par file.
+    #
+    #  @param self The object pointer.
+    #  @param parText The text of the par file.
+    #  @returns a dictionary mapping each par file parameter to its value, as a string.
+    def readTimingModel(self,parText):
+        """
+        Reads the timing model of a pulsar from the text of its par file, i.e.
+        lines of the form,
+
+        F0              1.44144628165       5.000e-10
+
+        where the value may be followed by a fit flag and an uncertainty.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        parText : str
+            The text of the par file.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each par file parameter to its value, as a
+            string, so no precision is lost.
+
+        """
+        model = {}
+
+        for line in parText.splitlines():
+            components = line.split()
+
+            if(len(components) >= 2 and not line.startswith("#")):
+                model[components[0].upper()] = components[1]
+
+        return model
+
+    # ****************************************************************************************************
+
+    ## Checks if a predictor can be built natively for a timing model.
+    #
+    #  @param self The object pointer.
+    #  @param model The timing model, as returned by readTimingModel().
+    #  @returns None if a predictor can be built, else the reason it cannot.
+    def unsupported(self,model):
+        """
+        Checks if a predictor can be built natively for a timing model, i.e.
+        that the pulsar is isolated, and its spin is described by F0 and at
+        most two derivatives.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        model : dict
+            The timing model, as returned by readTimingModel().
+
+        Returns
+        -------
+        str
+            None if a predictor can be built, else the reason it cannot.
+
+        """
+        if("F0" not in model):
+            return "no F0 parameter"
+
+        if("PEPOCH" not in model):
+            return "no PEPOCH parameter"
+
+        for name in model:
+            if(name not in self.supported and not name.startswith(("JUMP","TNE","TN","EFAC","EQUAD"))):
+                return "unsupported parameter " + name
+
+        return None
+
+    # ****************************************************************************************************
+
+    ## Computes the phase of a timing model at barycentric arrival times.
+    #
+    #  @param self The object pointer.
+    #  @param model The timing model, as returned by readTimingModel().
+    #  @param mjds The arrival times (MJD), as numpy longdoubles.
+    #  @returns the phase (turns) at each time, relative to the phase at TZRMJD, as numpy longdoubles.
+    def modelPhase(self,model,mjds):
+        """
+        Computes the phase of a timing model at barycentric arrival times, in
+        extended precision, i.e.
+
+        phase(t) = F0 dt + F1 dt^2 / 2 + F2 dt^3 / 6, where dt = t - PEPOCH
+
+        relative to the phase at TZRMJD (or PEPOCH if TZRMJD is not given).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        model : dict
+            The timing model, as returned by readTimingModel().
+        mjds : numpy.ndarray
+            The arrival times (MJD), as numpy longdoubles.
+
+        Returns
+        -------
+        numpy.ndarray
+            The phase (turns) at each time, as numpy longdoubles.
+
+        """
+        f0 = self.parseExtended(model["F0"])
+        f1 = self.parseExtended(model.get("F1","0"))
+        f2 = self.parseExtended(model.get("F2","0"))
+
+        pepoch = self.parseExtended(model["PEPOCH"])
+        tzrmjd = self.parseExtended(model.get("TZRMJD",model["PEPOCH"]))
+
+        def spin(mjd):
+            dt = (mjd - pepoch) * longdouble(86400)
+            return dt * (f0 + dt * (f1 / 2 + dt * f2 / 6))
+
+        return spin(asarray(mjds,dtype=longdouble)) - spin(tzrmjd)
+
+    # ****************************************************************************************************
+
+    ## Builds a predictor natively from the text of a par file.
+    #
+    #  @param self The object pointer.
+    #  @param parText The text of the par file.
+    #  @param mjd1 The start MJD of the predictor.
+    #  @param mjd2 The end MJD of the predictor.
+    #  @param freqStart The start frequency (MHz) of the predictor.
+    #  @param freqEnd The end frequency (MHz) of the predictor.
+    #  @param ncoeffTime The number of time coefficients of each segment.
+    #  @param ncoeffFreq The number of frequency coefficients of each segment.
+    #  @param segmentLength The length of each segment (s).
+    def build(self,parText,mjd1,mjd2,freqStart,freqEnd,ncoeffTime,ncoeffFreq,segmentLength):
+        """
+        Builds a predictor natively from the text of a par file, with the same
+        segments as tempo2 -pred "@ mjd1 mjd2 freqStart freqEnd ncoeffTime
+        ncoeffFreq segmentLength". Segments start every segmentLength x (1 -
+        overlap) seconds, and the last is cut short at mjd2. The phase of
+        each segment is sampled at the Chebyshev nodes in time and frequency,
+        and the coefficients of every segment found in one matrix product.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        parText : str
+            The text of the par file.
+        mjd1 : str
+            The start MJD of the predictor (a string, or a number).
+        mjd2 : str
+            The end MJD of the predictor (a string, or a number).
+        freqStart : float
+            The start frequency (MHz) of the predictor.
+        freqEnd : float
+            The end frequency (MHz) of the predictor.
+        ncoeffTime : int
+            The number of time coefficients of each segment.
+        ncoeffFreq : int
+            The number of frequency coefficients of each segment.
+        segmentLength : float
+            The length of each segment (s).
+
+        Raises
+        ------
+        ValueError
+            If a predictor cannot be built natively for the par file.
+
+        """
+        model = self.readTimingModel(parText)
+        reason = self.unsupported(model)
+
+        if(reason is not None):
+            raise ValueError("Cannot build predictor natively: " + reason)
+
+        mjd1, mjd2 = [self.parseExtended(mjd) if isinstance(mjd,basestring) else longdouble(mjd) for mjd in (mjd1,mjd2)]
+
+        length = longdouble(segmentLength) / 86400
+        step = length * longdouble(1.0 - self.overlap)
+        count = max(int(ceil(float((mjd2 - mjd1) / step) - 1e-9)),1)
+
+        self.name        = model.get("PSRJ",model.get("PSRB",model.get("PSR","")))
+        self.site        = "@"
+        self.starts      = mjd1 + arange(count,dtype=longdouble) * step
+        self.ends        = minimum(self.starts + length,mjd2)
+        self.freqStarts  = full(count,float(freqStart))
+        self.freqEnds    = full(count,float(freqEnd))
+        self.dispersions = zeros(count) # Dispersion is not applied at the barycentre.
+
+        # The Chebyshev nodes, and the polynomials evaluated at them.
+        timeNodes, timeBasis = self.chebyshevNodes(ncoeffTime)
+        freqNodes, freqBasis = self.chebyshevNodes(ncoeffFreq) # @UnusedVariable
+
+        # The time of each node in each segment, in extended precision.
+        times = self.starts[:,None] + asarray((timeNodes + 1.0) / 2.0,dtype=longdouble)[None,:] * \
+                (self.ends - self.starts)[:,None]
+
+        phases = self.modelPhase(model,times)
+
+        # Fit relative to the phase at the segment midpoint, so the fit itself
+        # can be done in double precision.
+        reference = phases.mean(axis=1)
+        relative = array(phases - reference[:,None],dtype=float)
+
+        # Phase is the same at every frequency node, as no dispersion is applied.
+        samples = relative[:,:,None] * ones(ncoeffFreq)[None,None,:]
+
+        coeffs = einsum("im,smn,jn->sij",timeBasis,samples,freqBasis) * (4.0 / (ncoeffTime * ncoeffFreq))
+
+        # Under the tempo2 convention, the c_00 term is weighted by 1/4.
+        self.coeffs = coeffs.astype(longdouble)
+        self.coeffs[:,0,0] += 4 * reference
+
+        self.midpoints = (self.starts + self.ends) / 2
+
+    # ****************************************************************************************************
+
+    ## Computes the Chebyshev nodes, and the Chebyshev polynomials evaluated at them.
+    #
+    #  @param self The object pointer.
+    #  @param count The number of nodes (and polynomials).
+    #  @returns the nodes, and a matrix whose element [i,m] is T_i at node m.
+    def chebyshevNodes(self,count):
+        """
+        Computes the Chebyshev nodes, x_m = cos(pi (m + 1/2) / count), and the
+        Chebyshev polynomials evaluated at them, T_i(x_m) = cos(pi i (m + 1/2) / count).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        count : int
+            The number of nodes (and polynomials).
+
+        Returns
+        -------
+        tuple
+            The nodes, and a matrix whose element [i,m] is T_i at node m.
+
+        """
+        angles = pi * (arange(count) + 0.5) / count
+        return cos(angles), cos(arange(count)[:,None] * angles[None,:])
+
+    # ****************************************************************************************************
+
+    ## Evaluates the Chebyshev polynomials, and their derivatives, at points in [-1,1].
+    #
+    #  @param self The object pointer.
+    #  @param x The points, an array of any shape.
+    #  @param count The number of polynomials.
+    #  @returns the polynomials and their derivatives, as arrays whose last axis is the degree.
+    def chebyshevBasis(self,x,count):
+        """
+        Evaluates the Chebyshev polynomials, and their derivatives, at points in
+        [-1,1], via the recurrences,
+
+        T_i+1(x)  = 2x T_i(x) - T_i-1(x)
+        T'_i+1(x) = 2 T_i(x) + 2x T'_i(x) - T'_i-1(x)
+
+        T_0 is then weighted by 1/2, following the tempo2 convention.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        x : numpy.ndarray
+            The points, an array of any shape.
+        count : int
+            The number of polynomials.
+
+        Returns
+        -------
+        tuple
+            The polynomials and their derivatives, as arrays of shape x.shape +
+            (count,), whose element [..., i] is of degree i.
+
+        """
+        basis = empty(x.shape + (count,),dtype=x.dtype)
+        derivative = zeros(x.shape + (count,),dtype=x.dtype)
+        basis[...,0] = 1
+
+        if(count > 1):
+            basis[...,1] = x
+            derivative[...,1] = 1
+
+        for i in range(2,count):
+            basis[...,i] = 2 * x * basis[...,i - 1] - basis[...,i - 2]
+            derivative[...,i] = 2 * basis[...,i - 1] + 2 * x * derivative[...,i - 1] - derivative[...,i - 2]
+
+        basis[...,0] = 0.5
+        return basis, derivative
+
+    # ****************************************************************************************************
+
+    ## Finds the segment used to evaluate the predictor at each time.
+    #
+    #  @param self The object pointer.
+    #  @param mjds The times (MJD).
+    #  @returns the index of the segment whose midpoint is nearest each time.
+    def segmentIndex(self,mjds):
+        """
+        Finds the segment used to evaluate the predictor at each time, i.e. the
+        segment whose midpoint is nearest, as chosen by tempo2. Segments are
+        found by a binary search of the midpoint table.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        mjds : numpy.ndarray
+            The times (MJD).
+
+        Returns
+        -------
+        numpy.ndarray
+            The index of the segment used for each time.
+
+        """
+        midpoints = self.midpoints.astype(mjds.dtype)
+
+        if(len(midpoints) == 1):
+            return zeros(mjds.shape,dtype=int)
+
+        after = searchsorted(midpoints,mjds).clip(1,len(midpoints) - 1)
+        before = after - 1
+
+        return where(mjds - midpoints[before] <= midpoints[after] - mjds,before,after)
+
+    # ****************************************************************************************************
+
+    ## Evaluates the phase and apparent frequency of the predictor.
+    #
+    #  @param self The object pointer.
+    #  @param mjds The times (MJD), as a 1D array.
+    #  @param freqs The frequencies (MHz), as a 2D array with a row per time.
+    #  @param precise True to evaluate in extended precision.
+    #  @returns the phase (turns) and apparent frequency (Hz), as 2D arrays shaped like freqs.
+    def evaluate(self,mjds,freqs,precise=False):
+        """
+        Evaluates the phase and apparent spin frequency of the predictor, for a
+        set of frequencies at each time. Each time is evaluated using the
+        segment whose midpoint is nearest. The Chebyshev polynomials in time
+        are evaluated once per time, and those in frequency once per
+        frequency, before all are combined in a single matrix product. Times
+        outside the predictor are given a NaN phase and frequency.
+
+        The apparent frequency is the derivative of the phase with respect to
+        time, i.e. the series with each T_i(x) replaced by T'_i(x) dx/dt.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        mjds : numpy.ndarray
+            The times (MJD), as a 1D array.
+        freqs : numpy.ndarray
+            The frequencies (MHz), as a 2D array with a row per time.
+        precise : bool
+            True to evaluate in extended precision (longdouble), else double
+            precision. A double precision MJD is only accurate to around a
+            microsecond, so extended precision is needed for the phase of fast
+            pulsars to be accurate to better than ~1e-3 turns.
+
+        Returns
+        -------
+        tuple
+            The phase (turns) and apparent frequency (Hz), as 2D arrays shaped
+            like freqs.
+
+        """
+        dtype = longdouble if precise else float
+
+        mjds = asarray(mjds,dtype=dtype)
+        freqs = asarray(freqs,dtype=float)
+
+        index = self.segmentIndex(mjds)
+        starts = self.starts[index].astype(dtype)
+        spans = (self.ends[index] - self.starts[index]).astype(dtype)
+        coeffs = self.coeffs[index].astype(dtype)
+
+        freqStarts = self.freqStarts[index][:,None]
+        freqEnds = self.freqEnds[index][:,None]
+
+        x = 2 * (mjds - starts) / spans - 1
+        y = 2 * (freqs - freqStarts) / (freqEnds - freqStarts) - 1
+
+        timeBasis, timeDerivative = self.chebyshevBasis(x,coeffs.shape[1])
+        freqBasis, freqDerivative = self.chebyshevBasis(y,coeffs.shape[2]) # @UnusedVariable
+
+        phases = einsum("ti,tij,tfj->tf",timeBasis,coeffs,freqBasis) + self.dispersions[index][:,None] / (freqs * freqs)
+
+        # dx/dt, in turns per second rather than per day.
+        scale = 2 / (spans * 86400)
+        frequencies = einsum("ti,tij,tfj->tf",timeDerivative * scale[:,None],coeffs,freqBasis)
+
+        outside = (mjds < self.starts[0]) | (mjds > self.ends[-1])
+        phases[outside] = nan
+        frequencies[outside] = nan
+
+        return phases, frequencies
+
+    # ****************************************************************************************************
+
+    ## Evaluates the phase of the predictor at pairs of times and frequencies.
+    #
+    #  @param self The object pointer.
+    #  @param mjds The times (MJD).
+    #  @param freqs The frequencies (MHz).
+    #  @param precise True to evaluate in extended precision.
+    #  @returns the phase (turns) at each time and frequency.
+    def phase(self,mjds,freqs,precise=False):
+        """
+        Evaluates the phase of the predictor at pairs of times and frequencies,
+        in a single vectorised call (see evaluate).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        mjds : numpy.ndarray
+            The times (MJD).
+        freqs : numpy.ndarray
+            The frequencies (MHz), broadcast against the times.
+        precise : bool
+            True to evaluate in extended precision.
+
+        Returns
+        -------
+        numpy.ndarray
+            The phase (turns) at each time and frequency.
+
+        """
+        mjds, freqs = broadcast_arrays(asarray(mjds,dtype=longdouble),asarray(freqs,dtype=float))
+        phases, frequencies = self.evaluate(mjds.ravel(),freqs.reshape(-1,1),precise) # @UnusedVariable
+
+        return phases.reshape(mjds.shape)
+
+    # ****************************************************************************************************
+
+    ## Evaluates the apparent frequency of the predictor at pairs of times and frequencies.
+    #
+    #  @param self The object pointer.
+    #  @param mjds The times (MJD).
+    #  @param freqs The frequencies (MHz).
+    #  @returns the apparent spin frequency (Hz) at each time and frequency.
+    def frequency(self,mjds,freqs):
+        """
+        Evaluates the apparent spin frequency of the predictor at pairs of times
+        and frequencies, in a single vectorised call (see evaluate).
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        mjds : numpy.ndarray
+            The times (MJD).
+        freqs : numpy.ndarray
+            The frequencies (MHz), broadcast against the times.
+
+        Returns
+        -------
+        numpy.ndarray
+            The apparent spin frequency (Hz) at each time and frequency.
+
+        """
+        mjds, freqs = broadcast_arrays(asarray(mjds,dtype=longdouble),asarray(freqs,dtype=float))
+        phases, frequencies = self.evaluate(mjds.ravel(),freqs.reshape(-1,1)) # @UnusedVariable
+
+        return frequencies.reshape(mjds.shape)
+
+    # ****************************************************************************************************
+
+    ## Evaluates the phase and apparent frequency of the predictor over a grid of times and frequencies.
+    #
+    #  @param self The object pointer.
+    #  @param mjds The times (MJD).
+    #  @param freqs The frequencies (MHz).
+    #  @param precise True to evaluate in extended precision.
+    #  @returns the phase (turns) and apparent frequency (Hz), as arrays with a row per time and a column per frequency.
+    def grid(self,mjds,freqs,precise=False):
+        """
+        Evaluates the phase and apparent spin frequency of the predictor over a
+        grid of times and frequencies, in a single vectorised call (see
+        evaluate), e.g. for every sample and channel of an observation.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        mjds : numpy.ndarray
+            The times (MJD).
+        freqs : numpy.ndarray
+            The frequencies (MHz).
+        precise : bool
+            True to evaluate in extended precision.
+
+        Returns
+        -------
+        tuple
+            The phase (turns) and apparent frequency (Hz), as arrays with a row
+            per time and a column per frequency.
+
+        """
+        mjds = asarray(mjds,dtype=longdouble).ravel()
+        freqs = asarray(freqs,dtype=float).ravel()
+
+        return self.evaluate(mjds,freqs[None,:].repeat(len(mjds),axis=0),precise)
+
+    # ****************************************************************************************************
+
+    ## Compares the phase of this predictor with that of another.
+    #
+    #  @param self The object pointer.
+    #  @param other The predictor to compare with.
+    #  @param samples The number of times sampled.
+    #  @returns the largest absolute phase difference (turns), ignoring whole turns.
+    def compare(self,other,samples=1000):
+        """
+        Compares the phase of this predictor with that of another, in extended
+        precision, at evenly spaced times spanning the times covered by both
+        predictors, and at the start, middle and end frequencies of this one.
+        Whole turns are ignored, as predictors made with different phase
+        references are equally valid. If the predictors share no times, the
+        difference is infinite.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        other : Predictor
+            The predictor to compare with.
+        samples : int
+            The number of times sampled.
+
+        Returns
+        -------
+        float
+            The largest absolute phase difference (turns), ignoring whole turns.
+
+        """
+        first = max(self.starts[0],other.starts[0])
+        last = min(self.ends[-1],other.ends[-1])
+
+        if(first > last):
+            return inf
+
+        mjds = linspace(first,last,samples)
+        freqs = array([self.freqStarts[0],(self.freqStarts[0] + self.freqEnds[0]) / 2.0,self.freqEnds[0]])
+
+        difference = self.grid(mjds,freqs,precise=True)[0] - other.grid(mjds,freqs,precise=True)[0]
+
+        deviation = absolute(difference - rint(difference))
+        deviation[isnan(deviation)] = inf
+
+        return float(deviation.max())
+
+    # ****************************************************************************************************
+
+    ## Reads a predictor file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the predictor file.
+    def read(self,path):
+        """
+        Reads a predictor file (ChebyModelSet) created by tempo2, or by write().
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the predictor file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a valid predictor file.
+
+        """
+        sourceFile = open(path,'r')
+
+        try:
+            text = sourceFile.read()
+        finally:
+            sourceFile.close()
+
+        self.parse(text)
+
+    # ****************************************************************************************************
+
+    ## Parses the text of a predictor file.
+    #
+    #  @param self The object pointer.
+    #  @param text The text of the predictor file.
+    def parse(self,text):
+        """
+        Parses the text of a predictor file (ChebyModelSet) into the segment
+        table (see the class description). Times and coefficients are parsed in
+        extended precision. Segments with fewer coefficients than others are
+        padded with zeros, which leaves their Chebyshev series unchanged.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        text : str
+            The text of the predictor file.
+
+        Raises
+        ------
+        ValueError
+            If the text is not a valid predictor file, or holds the segments of
+            more than one pulsar.
+
+        """
+        segments = []
+        segment = None
+
+        for line in text.splitlines():
+            components = line.split()
+
+            if(not components):
+                continue
+
+            keyword = components[0]
+
+            if(keyword == "ChebyModel" and components[1:] == ["BEGIN"]):
+                segment = {"COEFFS":[]}
+            elif(keyword == "ChebyModel" and components[1:] == ["END"] and segment is not None):
+                segments.append(segment)
+                segment = None
+            elif(segment is None):
+                continue # The ChebyModelSet header.
+            elif(keyword == "COEFFS"):
+                segment["COEFFS"].append(components[1:])
+            else:
+                segment[keyword] = components[1:]
+
+        if(not segments):
+            raise ValueError("Invalid predictor file: no ChebyModel segments.")
+
+        try:
+            names = set([segment["PSRNAME"][0] for segment in segments])
+
+            if(len(names) != 1):
+                raise ValueError("Invalid predictor file: segments of more than one pulsar.")
+
+            for segment in segments:
+                if(len(segment["COEFFS"]) != int(segment["NCOEFF_TIME"][0])):
+                    raise ValueError("Invalid predictor file: wrong number of COEFFS lines.")
+
+            ncoeffTime = max([len(segment["COEFFS"]) for segment in segments])
+            ncoeffFreq = max([len(row) for segment in segments for row in segment["COEFFS"]])
+
+            coeffs = zeros((len(segments),ncoeffTime,ncoeffFreq),dtype=longdouble)
+
+            for s, segment in enumerate(segments):
+                for i, row in enumerate(segment["COEFFS"]):
+                    coeffs[s,i,:len(row)] = [self.parseExtended(value) for value in row]
+
+            starts = array([self.parseExtended(segment["TIME_RANGE"][0]) for segment in segments],dtype=longdouble)
+            ends   = array([self.parseExtended(segment["TIME_RANGE"][1]) for segment in segments],dtype=longdouble)
+
+            freqStarts  = array([float(segment["FREQ_RANGE"][0]) for segment in segments])
+            freqEnds    = array([float(segment["FREQ_RANGE"][1]) for segment in segments])
+            dispersions = array([float(segment.get("DISPERSION_CONSTANT",["0"])[0]) for segment in segments])
+
+            self.site = segments[0].get("SITENAME",["@"])[0]
+        except (KeyError, IndexError) as e:
+            raise ValueError("Invalid predictor file: missing or incomplete " + str(e) + " line.")
+
+        # The segment table is kept in time order, for binary searching.
+        order = argsort(starts,kind="mergesort")
+
+        self.name        = names.pop()
+        self.starts      = starts[order]
+        self.ends        = ends[order]
+        self.midpoints   = (self.starts + self.ends) / 2
+        self.freqStarts  = freqStarts[order]
+        self.freqEnds    = freqEnds[order]
+        self.dispersions = dispersions[order]
+        self.coeffs      = coeffs[order]
+
+    # ****************************************************************************************************
+
+    ## Renders the predictor as text, in the format written by tempo2.
+    #
+    #  @param self The object pointer.
+    #  @returns the text of the predictor file.
+    def text(self):
+        """
+        Renders the predictor as text, in the ChebyModelSet format written by
+        tempo2 (see the class description). Times, and the c_00 coefficient
+        holding the bulk of the phase, are written in extended precision. The
+        text of every segment is rendered by a single formatting operation.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The text of the predictor file.
+
+        """
+        count, ncoeffTime, ncoeffFreq = self.coeffs.shape
+
+        segment = "ChebyModel BEGIN\n" +\
+                  "PSRNAME " + self.name.replace("%","%%") + "\n" +\
+                  "SITENAME " + self.site.replace("%","%%") + "\n" +\
+                  "TIME_RANGE %s %s\n" +\
+                  "FREQ_RANGE %.17g %.17g\n" +\
+                  "DISPERSION_CONSTANT %.17g\n" +\
+                  "NCOEFF_TIME " + str(ncoeffTime) + "\n" +\
+                  "NCOEFF_FREQ " + str(ncoeffFreq) + "\n" +\
+                  "COEFFS %s" + " %.17g" * (ncoeffFreq - 1) + "\n" +\
+                  ("COEFFS " + " ".join(["%.17g"] * ncoeffFreq) + "\n") * (ncoeffTime - 1) +\
+                  "ChebyModel END\n"
+
+        rows = zip(self.formatExtended(self.starts),self.formatExtended(self.ends),self.freqStarts.tolist(),
+                   self.freqEnds.tolist(),self.dispersions.tolist(),self.formatExtended(self.coeffs[:,0,0]),
+                   self.coeffs.reshape(count,-1)[:,1:].astype(float).tolist())
+
+        values = []
+
+        for row in rows:
+            values.extend(row[:-1])
+            values.extend(row[-1])
+
+        return ("ChebyModelSet %d segments\n" % count) + (segment * count) % tuple(values)
+
+    # ****************************************************************************************************
+
+    ## Writes the predictor to a file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the predictor file to write.
+    def write(self,path):
+        """
+        Writes the predictor to a file, in the format written by tempo2.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the predictor file to write.
+
+        """
+        destinationFile = open(path,'w')
+
+        try:
+            destinationFile.write(self.text())
+        finally:
+            destinationFile.close()
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    Predictor().main()
@@ -0,0 +1,1029 @@
+## @package PREDS
+# A module used to store many Tempo2 predictor files in a single compact,
+# memory mapped, binary pack.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web   : www.scienceguyrob.com
+
+# Start normal non-doxygen docstring...
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      Predictor Pack Version 1.0                        |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Stores many predictor files (t2pred.dat) in a single binary pack,      |
+    | instead of one decimal text file per pulsar. A pack consists of three  |
+    | files, each in numpy .npy format:                                      |
+    |                                                                        |
+    | <name>         - the Chebyshev coefficients of every segment of every  |
+    |                  predictor, as a flat block of float64 (or longdouble) |
+    |                  values.                                               |
+    | <name>.seg.npy - the segment table, giving the time range, frequency   |
+    |                  range and dispersion constant of every segment.       |
+    | <name>.idx.npy - the pulsar index, giving the file name, PSRNAME and   |
+    |                  site of each predictor, its first segment, its number |
+    |                  of segments and coefficients, and the offset of its   |
+    |                  coefficients.                                         |
+    |                                                                        |
+    | All three files are memory mapped, so opening a pack reads nothing     |
+    | but the file headers, and a predictor is read without parsing any      |
+    | text, or reading the rest of the pack. Segment times are stored as a   |
+    | whole MJD plus a double precision fraction, so no precision is lost.   |
+    | Predictors can be exported back to the text format read by tempo2 and  |
+    | inject_pulsar, for tools that require a path.                          |
+    |                                                                        |
+    | Requires numpy, and Predictor.py.                                      |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (string) full path to a predictor pack file.                        |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | -i (string) full path to a directory of predictor files (.dat) to      |
+    |             convert into the pack, replacing its existing content.     |
+    |                                                                        |
+    | -e (boolean) store coefficients in extended precision (longdouble),    |
+    |              rather than double precision, when converting.            |
+    |                                                                        |
+    | -l (boolean) list the names of the predictors in the pack.             |
+    |                                                                        |
+    | -x (string) comma separated names of the predictors to export as text. |
+    |             Use "all" to export every predictor in the pack.           |
+    |                                                                        |
+    | -d (string) full path to the directory to export predictor files to.   |
+    |                                                                        |
+    | -c (boolean) after converting (-i), check every predictor exports back |
+    |              to text with the same PSRNAME and phases as its source.   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys, datetime
+
+# Numpy Imports:
+from numpy import array
+from numpy import dtype
+from numpy import floor
+from numpy import load
+from numpy import longdouble
+from numpy import save
+from numpy import zeros
+from numpy.lib.format import dtype_to_descr
+from numpy.lib.format import write_array_header_1_0
+
+# Other imports
+from shutil import copyfileobj
+
+from Predictor import Predictor
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+## Predictor Pack Version 1.0
+#
+# Stores many predictor files (t2pred.dat) in a single binary pack,
+# instead of one decimal text file per pulsar. A pack consists of three
+# files, each in numpy .npy format:
+#
+# <name>         - the Chebyshev coefficients of every segment of every
+#                  predictor, as a flat block of float64 (or longdouble)
+#                  values.
+# <name>.seg.npy - the segment table, giving the time range, frequency
+#                  range and dispersion constant of every segment.
+# <name>.idx.npy - the pulsar index, giving the file name, PSRNAME and
+#                  site of each predictor, its first segment, its number
+#                  of segments and coefficients, and the offset of its
+#                  coefficients.
+#
+# The coefficients of a predictor form a contiguous block, which is
+# viewed (not copied) with shape (segments, time coeffs., freq. coeffs.).
+# The name of each predictor is its file name without the .dat suffix,
+# e.g. J0006+1834, or FakePulsar_1_0.184466_12.5_9.1
+#
+# Requires numpy, and Predictor.py.
+#
+# Author: Rob Lyon
+# Email : robert.lyon@manchester.ac.uk
+# web : www.scienceguyrob.com
+#
+# Required Command Line Arguments:
+#
+# -p (string) full path to a predictor pack file.
+#
+# Optional Command Line Arguments:
+#
+# -v (boolean) verbose debugging flag.
+#
+# -i (string) full path to a directory of predictor files (.dat) to
+#             convert into the pack, replacing its existing content.
+#
+# -e (boolean) store coefficients in extended precision (longdouble),
+#              rather than double precision, when converting.
+#
+# -l (boolean) list the names of the predictors in the pack.
+#
+# -x (string) comma separated names of the predictors to export as text.
+#             Use "all" to export every predictor in the pack.
+#
+# -d (string) full path to the directory to export predictor files to.
+#
+# -c (boolean) after converting (-i), check every predictor exports back
+#              to text with the same PSRNAME and phases as its source.
+#
+#
+# License:
+#
+# Code made available under the GPLv3 (GNU General Public License), that
+# allows you to copy, modify and redistribute the code as you see fit
+# (http://www.gnu.org/copyleft/gpl.html). Though a mention to the
+# original author using the citation above in derivative works, would be
+# very much appreciated.
+class PredictorPack:
+    """
+    Description:
+
+    Stores many predictor files in a single binary pack, instead of one
+    decimal text file per pulsar. Predictors are read from the pack via
+    memory maps, without parsing any text, and can be exported back to the
+    text format read by tempo2 and inject_pulsar.
+
+    Examples
+    --------
+
+    >>> pack = PredictorPack("/Users/rob/preds/Pulsar.predpack")
+    >>> pack.begin()
+    >>> pack.append("J0006+1834",predictor)
+    >>> pack.finish()
+    >>> predictor = pack.predictor("J0006+1834")
+    >>> phases, frequencies = predictor.grid(mjds,freqs)
+    >>> path = pack.extract("J0006+1834","/tmp")
+    """
+
+    ## The columns stored in the pulsar index, and their numpy types. NAME is
+    # the file name of the predictor, and PSRNAME the name within it. String
+    # columns are sized from the data when the pack is finished, so that no
+    # name is ever truncated.
+    columns = [("NAME","S"),("PSRNAME","S"),("SITE","S"),("FIRST","i8"),("SEGMENTS","i8"),("NCOEFF_TIME","i4"),
+               ("NCOEFF_FREQ","i4"),("OFFSET","i8")]
+
+    ## The largest phase difference (turns) allowed between an exported predictor and its source file (see check).
+    checkTolerance = 1e-6
+
+    ## The columns stored in the segment table, and their numpy types. START
+    # and END are relative to the whole MJD DAY, so keep full precision.
+    segmentColumns = [("DAY","i8"),("START","f8"),("END","f8"),("FREQ_START","f8"),("FREQ_END","f8"),
+                      ("DISPERSION","f8")]
+
+    ## The suffix of the pulsar index file.
+    indexSuffix = ".idx.npy"
+
+    ## The suffix of the segment table file.
+    segmentSuffix = ".seg.npy"
+
+    ## Creates a new pack object for the specified pack file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the pack file.
+    #  @param verbose The verbose debugging flag.
+    def __init__(self,path="",verbose=False):
+        """
+        Creates a new pack object for the specified pack file. The pack is
+        memory mapped the first time a predictor is requested.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the pack file.
+        verbose : bool
+            The verbose debugging flag.
+
+        """
+        self.path         = path
+        self.verbose      = verbose
+        self.index        = None
+        self.segments     = None
+        self.coefficients = None
+        self.rows         = None
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    ## The main method for the class.
+    # Main entry point for the Application. Processes command line
+    # input and converts, lists or exports the predictors in a pack.
+    #
+    #  @param self The object pointer.
+    #  @param argv The unused arguments.
+    def main(self,argv=None):
+        """Main method.
+
+        Main entry point for the Application. Processes command line
+        input and converts, lists or exports the predictors in a pack.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        argv : str
+            The unused arguments.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-p", action="store", dest="packPath",help='Path to a predictor pack file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("-i", action="store", dest="inputDir",help='Path to a directory of predictor files to convert (optional).',default="")
+        parser.add_option("-e", action="store_true", dest="extended",help='Store coefficients in extended precision (optional).',default=False)
+        parser.add_option("-l", action="store_true", dest="list",help='List the predictors in the pack (optional).',default=False)
+        parser.add_option("-x", action="store", dest="extract",help='Comma separated names of predictors to export, or all (optional).',default="")
+        parser.add_option("-d", action="store", dest="outputDir",help='Path to the directory to export predictor files to (optional).',default="")
+        parser.add_option("-c", action="store_true", dest="check",help='Check converted predictors export back unchanged (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.verbose = args.verbose
+        self.path    = args.packPath
+
+        print "\n\t**************************"
+        print "\t| Command Line Arguments |"
+        print "\t**************************"
+        print "\tDebug:",self.verbose
+        print "\tPredictor pack file path:",self.path
+        print "\tPredictor file directory to convert:",args.inputDir
+        print "\tExtended precision:",args.extended
+        print "\tList predictors:",args.list
+        print "\tPredictors to export:",args.extract
+        print "\tExport directory:",args.outputDir
+        print "\tCheck converted predictors:",args.check
+
+        if(not self.path):
+            print "\n\tYou must supply a predictor pack file via the -p flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(args.inputDir and os.path.isdir(args.inputDir) == False):
+            print "\n\tPredictor file directory not found at: ", args.inputDir
+            print "\tExiting..."
+            sys.exit()
+
+        if(args.extract and not args.outputDir):
+            print "\n\tYou must supply an export directory via the -d flag."
+            print "\tExiting..."
+            sys.exit()
+
+        if(args.inputDir):
+            start = datetime.datetime.now()
+            textBytes = self.convert(args.inputDir,args.extended)
+            end = datetime.datetime.now()
+
+            print "\n\tPredictor files converted: ", len(self)
+            print "\tText size (bytes): ", textBytes, " Pack size (bytes): ", self.size()
+            print "\tConversion time: ", str(end - start)
+
+            if(args.check):
+                checked, failures, deviation = self.check(args.inputDir)
+
+                print "\tPredictors checked: ", checked, " failures: ", failures,\
+                      " (largest phase difference: ", deviation, " turns)"
+
+        if(os.path.isfile(self.path) == False or os.path.isfile(self.indexPath()) == False):
+            print "\n\tYou must supply a valid predictor pack file via the -p flag."
+            print "\tExiting..."
+            sys.exit()
+
+        print "\n\tPredictors in pack: ", len(self)
+
+        if(args.list):
+            for name in self.names():
+                print "\t", name
+
+        if(args.extract):
+            if(os.path.exists(args.outputDir) == False):
+                os.makedirs(args.outputDir)
+
+            if(args.extract == "all"):
+                names = self.names()
+            else:
+                names = args.extract.split(",")
+
+            for name in names:
+                if(self.contains(name) == False):
+                    print "\tPredictor not found in pack: ", name
+                    continue
+
+                path = self.extract(name,args.outputDir)
+
+                if(self.verbose):
+                    print "\tExported: ", path
+
+        print "\n\tDone."
+        print "\t**************************************************************************" # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+    ## Converts a directory of predictor files into the pack, replacing any existing content.
+    #
+    #  @param self The object pointer.
+    #  @param directory The directory containing the predictor files (.dat), searched recursively.
+    #  @param extended True to store coefficients in extended precision, else double precision.
+    #  @returns the total size (bytes) of the predictor files converted.
+    def convert(self,directory,extended=False):
+        """
+        Converts a directory of predictor files into the pack, replacing any
+        existing content. Each predictor file is parsed and appended in turn,
+        so memory use does not grow with the number of predictor files.
+        Predictor files that cannot be parsed are reported and skipped.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The directory containing the predictor files (.dat), searched
+            recursively.
+        extended : bool
+            True to store coefficients in extended precision (longdouble),
+            else double precision (float64).
+
+        Returns
+        -------
+        int
+            The total size (bytes) of the predictor files converted.
+
+        """
+        textBytes = 0
+
+        self.begin(extended)
+
+        for root, subFolders, filenames in os.walk(directory): # @UnusedVariable
+            for filename in sorted(filenames):
+                if(filename.endswith(".dat") == False):
+                    continue
+
+                path = os.path.join(root,filename)
+                predictor = Predictor()
+
+                try:
+                    predictor.read(path)
+                except ValueError as e:
+                    print "\tError converting predictor file: ", path, "\n\t", e
+                    continue
+
+                self.append(filename[:-len(".dat")],predictor)
+                textBytes += os.path.getsize(path)
+
+        self.finish()
+
+        return textBytes
+
+    # ****************************************************************************************************
+
+    ## Checks that the predictors in the pack export back to text unchanged.
+    #
+    #  @param self The object pointer.
+    #  @param directory The directory containing the source predictor files (.dat), searched recursively.
+    #  @returns a tuple containing the number of predictors checked, the number of failures, and the largest phase difference (turns).
+    def check(self,directory):
+        """
+        Checks that the predictors in the pack export back to text unchanged,
+        i.e. that the text exported for each predictor (see extract) parses to
+        a predictor with the same PSRNAME and site as its source file, whose
+        phases differ from the source by at most checkTolerance turns (see
+        Predictor.compare). Failures are reported.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        directory : str
+            The directory containing the source predictor files (.dat),
+            searched recursively.
+
+        Returns
+        -------
+        tuple
+            The number of predictors checked, the number of failures, and the
+            largest phase difference (turns).
+
+        """
+        checked, failures, largest = 0, 0, 0.0
+
+        for root, subFolders, filenames in os.walk(directory): # @UnusedVariable
+            for filename in sorted(filenames):
+                name = filename[:-len(".dat")]
+
+                if(filename.endswith(".dat") == False or self.contains(name) == False):
+                    continue
+
+                source = Predictor()
+                source.read(os.path.join(root,filename))
+
+                exported = Predictor()
+                exported.parse(self.predictor(name).text())
+
+                deviation = exported.compare(source)
+                largest = max(largest,deviation)
+                checked += 1
+
+                if(exported.name != source.name or exported.site != source.site or not deviation <= self.checkTolerance):
+                    failures += 1
+                    print "\tPredictor does not export back unchanged: ", name, " (turns: ", deviation, ")"
+
+        return checked, failures, largest
+
+    # ****************************************************************************************************
+
+    ## Starts writing a new pack, replacing any existing content.
+    #
+    #  @param self The object pointer.
+    #  @param extended True to store coefficients in extended precision, else double precision.
+    def begin(self,extended=False):
+        """
+        Starts writing a new pack, replacing any existing content. Predictors
+        are then added via append(), and the pack completed via finish().
+        Coefficients and segments are streamed to temporary files as they are
+        added, so memory use does not grow with the number of predictors.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        extended : bool
+            True to store coefficients in extended precision (longdouble),
+            else double precision (float64).
+
+        """
+        self.close()
+
+        # Remove the old index first, so that an interrupted write leaves no
+        # usable (but wrong) pack behind.
+        if(os.path.exists(self.indexPath())):
+            os.remove(self.indexPath())
+
+        self.coefficientType = dtype(longdouble if extended else "f8")
+
+        self.coefficientFile = open(self.path + ".tmp",'wb')
+        self.segmentFile     = open(self.segmentPath() + ".tmp",'wb')
+        self.newIndex        = []
+        self.segmentCount    = 0
+        self.offset          = 0
+
+    # ****************************************************************************************************
+
+    ## Adds a predictor to a pack started with begin().
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the predictor, i.e. its file name without the .dat suffix.
+    #  @param predictor The predictor (see Predictor.py).
+    def append(self,name,predictor):
+        """
+        Adds a predictor to a pack started with begin(). Its coefficients and
+        segments are each written with a single call.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the predictor, i.e. its file name without the .dat suffix.
+        predictor : Predictor
+            The predictor (see Predictor.py).
+
+        """
+        count, ncoeffTime, ncoeffFreq = predictor.coeffs.shape
+
+        days = floor(predictor.starts)
+
+        segments = zeros(count,dtype=self.segmentColumns)
+        segments["DAY"]        = days
+        segments["START"]      = predictor.starts - days
+        segments["END"]        = predictor.ends - days
+        segments["FREQ_START"] = predictor.freqStarts
+        segments["FREQ_END"]   = predictor.freqEnds
+        segments["DISPERSION"] = predictor.dispersions
+
+        self.segmentFile.write(segments.tostring())
+        self.coefficientFile.write(predictor.coeffs.astype(self.coefficientType).tostring())
+
+        self.newIndex.append((name,predictor.name,predictor.site,self.segmentCount,count,ncoeffTime,ncoeffFreq,self.offset))
+
+        self.segmentCount += count
+        self.offset       += count * ncoeffTime * ncoeffFreq
+
+    # ****************************************************************************************************
+
+    ## Completes a pack started with begin().
+    #
+    #  @param self The object pointer.
+    #  @returns the number of predictors written.
+    def finish(self):
+        """
+        Completes a pack started with begin(). The coefficient and segment
+        files are completed first, and only then is the index moved into place.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of predictors written.
+
+        """
+        self.coefficientFile.close()
+        self.segmentFile.close()
+
+        self.publishArray(self.path,self.coefficientType,self.offset)
+        self.publishArray(self.segmentPath(),dtype(self.segmentColumns),self.segmentCount)
+
+        destinationFile = open(self.indexPath() + ".tmp",'wb')
+
+        # Size each string column to its longest value.
+        columns = []
+
+        for column, columnType in self.columns:
+            if(columnType == "S"):
+                position = [c for c, t in self.columns].index(column)
+                columnType = "S" + str(max([len(row[position]) for row in self.newIndex] + [1]))
+
+            columns.append((column,columnType))
+
+        try:
+            save(destinationFile,array(self.newIndex,dtype=columns))
+        finally:
+            destinationFile.close()
+
+        os.rename(self.indexPath() + ".tmp",self.indexPath())
+
+        written = len(self.newIndex)
+        del self.newIndex
+
+        if(self.verbose):
+            print "\tPredictors written to pack: ", written, " (", self.path, ")"
+
+        return written
+
+    # ****************************************************************************************************
+
+    ## Moves a streamed temporary file into place as a numpy .npy file.
+    #
+    #  @param self The object pointer.
+    #  @param path The full path to the .npy file. The data was streamed to <path>.tmp.
+    #  @param dataType The numpy type of the data.
+    #  @param count The number of values (or rows) in the data.
+    def publishArray(self,path,dataType,count):
+        """
+        Moves a streamed temporary file into place as a numpy .npy file. The
+        size of the data is only known once streaming ends, so the .npy header
+        is written then, followed by the data, before the file is renamed into
+        place.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        path : str
+            The full path to the .npy file. The data was streamed to <path>.tmp.
+        dataType : numpy.dtype
+            The numpy type of the data.
+        count : int
+            The number of values (or rows) in the data.
+
+        """
+        destinationFile = open(path + ".npy.tmp",'wb')
+
+        try:
+            write_array_header_1_0(destinationFile,{"descr":dtype_to_descr(dataType),"fortran_order":False,"shape":(count,)})
+
+            sourceFile = open(path + ".tmp",'rb')
+
+            try:
+                copyfileobj(sourceFile,destinationFile,1048576)
+            finally:
+                sourceFile.close()
+        finally:
+            destinationFile.close()
+
+        os.remove(path + ".tmp")
+        os.rename(path + ".npy.tmp",path)
+
+    # ****************************************************************************************************
+
+    ## Memory maps the pack, if not already mapped.
+    #
+    #  @param self The object pointer.
+    #  @returns the pulsar index, a numpy structured array (see columns).
+    def loadIndex(self):
+        """
+        Memory maps the pack, i.e. the pulsar index, the segment table and the
+        coefficients, if not already mapped. Only the pages describing
+        requested predictors are then read.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        numpy.ndarray
+            The pulsar index, a structured array with the columns NAME, PSRNAME, SITE,
+            FIRST, SEGMENTS, NCOEFF_TIME, NCOEFF_FREQ and OFFSET.
+
+        """
+        if(self.index is None):
+            self.index        = load(self.indexPath(),mmap_mode='r')
+            self.segments     = load(self.segmentPath(),mmap_mode='r')
+            self.coefficients = load(self.path,mmap_mode='r')
+
+        return self.index
+
+    # ****************************************************************************************************
+
+    ## Gets the names of the predictors in the pack.
+    #
+    #  @param self The object pointer.
+    #  @returns a list containing the names of the predictors, in pack order.
+    def names(self):
+        """
+        Gets the names of the predictors in the pack, in the order they were written.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        list
+            The names of the predictors, in pack order.
+
+        """
+        return self.loadIndex()["NAME"].tolist()
+
+    # ****************************************************************************************************
+
+    ## Checks if the pack contains a predictor.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the predictor.
+    #  @returns True if the pack contains the predictor, else False.
+    def contains(self,name):
+        """
+        Checks if the pack contains a predictor.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the predictor.
+
+        Returns
+        -------
+        bool
+            True if the pack contains the predictor, else False.
+
+        """
+        return name in self.rowIndex()
+
+    # ****************************************************************************************************
+
+    ## Gets the hash index mapping each predictor name to its row in the pulsar index.
+    #
+    #  @param self The object pointer.
+    #  @returns a dictionary mapping each predictor name to its row.
+    def rowIndex(self):
+        """
+        Gets the hash index mapping each predictor name to its row in the pulsar
+        index. The hash index is built the first time it is needed, since
+        reading predictors by position does not require it.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each predictor name to its row.
+
+        """
+        if(self.rows is None):
+            self.rows = dict((name,row) for row, name in enumerate(self.names()))
+
+        return self.rows
+
+    # ****************************************************************************************************
+
+    ## Reads a predictor from the pack, by name.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the predictor.
+    #  @returns the predictor (see Predictor.py).
+    def predictor(self,name):
+        """
+        Reads a predictor from the pack, by name.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the predictor.
+
+        Returns
+        -------
+        Predictor
+            The predictor (see Predictor.py).
+
+        Raises
+        ------
+        KeyError
+            If the pack does not contain the predictor.
+
+        """
+        return self.predictorRow(self.rowIndex()[name])
+
+    # ****************************************************************************************************
+
+    ## Reads a predictor from the pack, by position.
+    #
+    #  @param self The object pointer.
+    #  @param row The position of the predictor in the pack.
+    #  @returns the predictor (see Predictor.py).
+    def predictorRow(self,row):
+        """
+        Reads a predictor from the pack, by its position in the pack. The
+        coefficients of the predictor are a view of the memory mapped pack,
+        not a copy, so only the pages of the segments evaluated are read.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        row : int
+            The position of the predictor in the pack.
+
+        Returns
+        -------
+        Predictor
+            The predictor (see Predictor.py).
+
+        """
+        entry = self.loadIndex()[row]
+
+        first, count = int(entry["FIRST"]), int(entry["SEGMENTS"])
+        ncoeffTime, ncoeffFreq = int(entry["NCOEFF_TIME"]), int(entry["NCOEFF_FREQ"])
+        offset = int(entry["OFFSET"])
+
+        segments = self.segments[first:first + count]
+        days = segments["DAY"].astype(longdouble)
+
+        predictor = Predictor()
+        predictor.name        = str(entry["PSRNAME"])
+        predictor.site        = str(entry["SITE"])
+        predictor.starts      = days + segments["START"]
+        predictor.ends        = days + segments["END"]
+        predictor.midpoints   = (predictor.starts + predictor.ends) / 2
+        predictor.freqStarts  = array(segments["FREQ_START"])
+        predictor.freqEnds    = array(segments["FREQ_END"])
+        predictor.dispersions = array(segments["DISPERSION"])
+        predictor.coeffs      = self.coefficients[offset:offset + count * ncoeffTime * ncoeffFreq].reshape(count,ncoeffTime,ncoeffFreq)
+
+        return predictor
+
+    # ****************************************************************************************************
+
+    ## Iterates over the predictors in the pack.
+    #
+    #  @param self The object pointer.
+    #  @returns a generator yielding a (name, predictor) tuple for each predictor, in pack order.
+    def iterPredictors(self):
+        """
+        Iterates over the predictors in the pack, in the order they were written.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        generator
+            Yields a (name, predictor) tuple for each predictor.
+
+        """
+        for row, name in enumerate(self.names()):
+            yield name, self.predictorRow(row)
+
+    # ****************************************************************************************************
+
+    ## Exports a predictor from the pack into a predictor file.
+    #
+    #  @param self The object pointer.
+    #  @param name The name of the predictor.
+    #  @param directory The directory to export the predictor file to.
+    #  @returns the full path to the exported predictor file.
+    def extract(self,name,directory):
+        """
+        Exports a predictor from the pack into a predictor file, in the text
+        format read by tempo2 and inject_pulsar, i.e. <directory>/<name>.dat.
+        Any existing file with the same path is overwritten.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+        name : str
+            The name of the predictor.
+        directory : str
+            The directory to export the predictor file to.
+
+        Returns
+        -------
+        str
+            The full path to the exported predictor file.
+
+        Examples
+        --------
+
+        >>> print extract("J0006+1834","/tmp")
+        /tmp/J0006+1834.dat
+
+        """
+        path = os.path.join(directory,name + ".dat")
+
+        self.predictor(name).write(path)
+
+        return path
+
+    # ****************************************************************************************************
+
+    ## Gets the total size of the pack files.
+    #
+    #  @param self The object pointer.
+    #  @returns the total size (bytes) of the coefficient, segment and index files.
+    def size(self):
+        """
+        Gets the total size of the pack files, i.e. the coefficient file, the
+        segment table and the pulsar index.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The total size (bytes) of the pack files.
+
+        """
+        return sum([os.path.getsize(path) for path in [self.path,self.segmentPath(),self.indexPath()]])
+
+    # ****************************************************************************************************
+
+    ## Gets the path of the pulsar index file.
+    #
+    #  @param self The object pointer.
+    #  @returns the full path to the index file.
+    def indexPath(self):
+        """
+        Gets the path of the pulsar index file, i.e. <pack path>.idx.npy
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The full path to the index file.
+
+        """
+        return self.path + self.indexSuffix
+
+    # ****************************************************************************************************
+
+    ## Gets the path of the segment table file.
+    #
+    #  @param self The object pointer.
+    #  @returns the full path to the segment table file.
+    def segmentPath(self):
+        """
+        Gets the path of the segment table file, i.e. <pack path>.seg.npy
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        str
+            The full path to the segment table file.
+
+        """
+        return self.path + self.segmentSuffix
+
+    # ****************************************************************************************************
+
+    ## Closes the pack, if memory mapped.
+    #
+    #  @param self The object pointer.
+    def close(self):
+        """
+        Closes the pack, if memory mapped. Predictors read from the pack keep
+        their own reference to the mapped coefficients, so remain usable.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        """
+        self.index        = None
+        self.segments     = None
+        self.coefficients = None
+        self.rows         = None
+
+    # ****************************************************************************************************
+
+    ## Gets the number of predictors in the pack.
+    #
+    #  @param self The object pointer.
+    #  @returns the number of predictors in the pack.
+    def __len__(self):
+        """
+        Gets the number of predictors in the pack.
+
+        Parameters
+        ----------
+        self : object
+            The object pointer.
+
+        Returns
+        -------
+        int
+            The number of predictors in the pack.
+
+        """
+        return len(self.loadIndex())
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    PredictorPack().main()